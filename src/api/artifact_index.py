@@ -0,0 +1,419 @@
+"""
+Secondary indexes over the in-memory artifact store.
+
+The API keeps artifacts in a dict keyed by id; lookups by name, type, URL
+or leaf name used to scan every artifact. ArtifactIndex maintains those
+lookups incrementally (callers add/remove artifacts as the store changes),
+plus a list of artifacts ordered by (name, type, id) so listings don't need
+to re-sort the store on every request.
+
+Id sets are insertion-ordered dicts, so "first match" lookups keep
+returning the earliest-ingested artifact as the old scans did.
+
+Lineage resolves model-card identifiers ("org/model", "model") to ingested
+artifacts; resolve_identifier() answers that from per-type maps of the
+lowercased name, every run of URL path segments and the leaf name instead
+of scanning every artifact per dependency. The path-run map is the largest
+of those, so it is built on the first resolve_identifier() call (from the
+URL map) and maintained from then on.
+
+Per type, artifacts are also kept ordered by creation time, so "the newest
+dataset/code artifact" (the scoring context for /rate) is a constant-time
+lookup that stays correct after deletes.
+
+A trigram index over each artifact's lowercased name, id and URL narrows
+regex searches: required_literals() pulls the literal runs every match of a
+pattern must contain, and regex_candidates() returns only the artifacts
+whose text has all of their trigrams. The full regex still decides. The
+trigram postings are likewise built on the first regex search.
+
+Both lazy maps are left out of pickles (registry snapshots), which keeps
+snapshots small and quick to load; they are rebuilt on demand.
+"""
+from __future__ import annotations
+
+import bisect
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Set, Tuple
+
+# {m}, {m,} or {m,n} quantifier at the start of a string.
+_BRACE_QUANTIFIER = re.compile(r"\{(\d*)(?:,\d*)?\}")
+# Inline flags that turn on verbose mode (whitespace stops being literal).
+_INLINE_VERBOSE = re.compile(r"\(\?[aiLmsu-]*x")
+
+
+class IndexedArtifact(Protocol):
+    # Read-only, so frozen dataclasses and narrower field types conform.
+    @property
+    def id(self) -> str: ...
+
+    @property
+    def type(self) -> str: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def url(self) -> str: ...
+
+    @property
+    def created_at_ms(self) -> int: ...
+
+
+def leaf_name(name: str) -> str:
+    """Lowercased last path segment of an artifact name."""
+    return (name or "").strip().lower().split("/")[-1]
+
+
+def _add(index: Dict[str, Dict[str, None]], key: str, artifact_id: str) -> None:
+    index.setdefault(key, {})[artifact_id] = None
+
+
+def _discard(index: Dict[str, Dict[str, None]], key: str, artifact_id: str) -> None:
+    ids = index.get(key)
+    if ids is None:
+        return
+    ids.pop(artifact_id, None)
+    if not ids:
+        del index[key]
+
+
+def _path_runs(url: str) -> Set[str]:
+    """
+    Lowercased runs of consecutive segments of url ("org", "org/name",
+    "huggingface.co/org", ...), plus the whole URL.
+    """
+    u = (url or "").strip().lower().rstrip("/")
+    if not u:
+        return set()
+    segs = u.split("/")
+    # Runs start after a "/" (never in the scheme) and end at a segment boundary.
+    out = {u}
+    for i in range(1, len(segs)):
+        if not segs[i]:
+            continue
+        for j in range(i + 1, len(segs) + 1):
+            out.add("/".join(segs[i:j]))
+    return out
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Index just past the character class that starts at pattern[i] == "["."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1  # a leading "]" is a literal member
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Lowercased literal runs that every match of pattern must contain.
+
+    A small scanner over the pattern text (no dependency on the private
+    re._parser module). Only top-level runs of plain ASCII literals count;
+    anything else (classes, escapes like \\d, optional or repeated atoms,
+    groups, anchors, non-ASCII characters) ends a run, and top-level
+    alternation or verbose mode gives no filter at all. An empty list means
+    the pattern gives no usable filter.
+    """
+    try:
+        re.compile(pattern, flags)
+    except re.error:
+        return []
+    if flags & re.VERBOSE or _INLINE_VERBOSE.search(pattern):
+        return []
+    runs: List[str] = []
+    current: List[str] = []
+
+    def end_run() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    i, depth = 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            nxt = pattern[i + 1 : i + 2]
+            if depth == 0 and nxt and not nxt.isalnum() and nxt.isascii():
+                current.append(nxt.lower())
+            elif depth == 0:
+                end_run()
+            i += 2
+            continue
+        if ch == "[":
+            if depth == 0:
+                end_run()
+            i = _skip_class(pattern, i)
+            continue
+        if ch == "(":
+            if depth == 0:
+                end_run()
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth > 0:
+            pass
+        elif ch == "|":
+            return []
+        elif ch in "*?":
+            # The previous atom is optional.
+            if current:
+                current.pop()
+            end_run()
+        elif ch == "+":
+            # The previous atom is required, but may repeat.
+            end_run()
+        elif ch == "{" and _BRACE_QUANTIFIER.match(pattern, i):
+            brace = _BRACE_QUANTIFIER.match(pattern, i)
+            assert brace is not None
+            if current and int(brace.group(1) or 0) == 0:
+                current.pop()
+            end_run()
+            i = brace.end()
+            continue
+        elif ch in ".^$" or not ch.isascii():
+            end_run()
+        else:
+            current.append(ch.lower())
+        i += 1
+    end_run()
+    return [r for r in runs if len(r) >= 3]
+
+
+class ArtifactIndex:
+    """name / type / url / leaf-name lookups and a name-ordered listing."""
+
+    def __init__(self) -> None:
+        self._by_name: Dict[str, Dict[str, None]] = {}
+        self._by_type: Dict[str, Dict[str, None]] = {}
+        self._by_url: Dict[str, Dict[str, None]] = {}
+        self._by_leaf: Dict[str, Dict[str, None]] = {}
+        self._by_lower_name: Dict[str, Dict[str, None]] = {}
+        self._by_path_run: Optional[Dict[str, Dict[str, None]]] = None
+        self._ordered: List[Tuple[str, str, str]] = []
+        # type -> [(created_at_ms, -seq, id)] ascending; the newest artifact is
+        # last, and among equal timestamps the earliest-added one wins.
+        self._recency: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._next_seq = 0
+        self._seq_of: Dict[str, int] = {}
+        # id -> lowercased searchable text; trigram -> ids, built lazily.
+        self._text_of: Dict[str, str] = {}
+        self._by_trigram: Optional[Dict[str, Set[str]]] = None
+        # Case-insensitive matching folds some non-ASCII characters onto
+        # ASCII letters (e.g. U+212A KELVIN SIGN matches "k"), so artifacts
+        # with non-ASCII text are always regex candidates.
+        self._non_ascii: Set[str] = set()
+
+    @staticmethod
+    def _url_key(artifact_type: str, url: str) -> str:
+        return f"{artifact_type}\n{(url or '').strip().lower()}"
+
+    @staticmethod
+    def _leaf_key(artifact_type: str, name: str) -> str:
+        return f"{artifact_type}\n{leaf_name(name)}"
+
+    def add(self, a: IndexedArtifact, seq: Optional[int] = None) -> None:
+        """
+        Index a.
+
+        Args:
+            seq: Insertion sequence number returned by remove() when a is a
+                replacement of an existing artifact (keeps its recency rank)
+        """
+        if seq is None:
+            s = self._next_seq
+            self._next_seq += 1
+        else:
+            s = seq
+        self._seq_of[a.id] = s
+        bisect.insort(self._recency.setdefault(a.type, []), (a.created_at_ms, -s, a.id))
+        _add(self._by_name, a.name, a.id)
+        _add(self._by_type, a.type, a.id)
+        _add(self._by_url, self._url_key(a.type, a.url), a.id)
+        _add(self._by_leaf, self._leaf_key(a.type, a.name), a.id)
+        _add(self._by_lower_name, f"{a.type}\n{(a.name or '').strip().lower()}", a.id)
+        if self._by_path_run is not None:
+            for run in _path_runs(a.url):
+                _add(self._by_path_run, f"{a.type}\n{run}", a.id)
+        bisect.insort(self._ordered, (a.name, a.type, a.id))
+        text = "\n".join((a.name or "", a.id, a.url or ""))
+        if not text.isascii():
+            self._non_ascii.add(a.id)
+        text = text.lower()
+        self._text_of[a.id] = text
+        if self._by_trigram is not None:
+            for g in _trigrams(text):
+                self._by_trigram.setdefault(g, set()).add(a.id)
+
+    def remove(self, a: IndexedArtifact) -> Optional[int]:
+        """
+        Drop a (the version that was added; name/url must match).
+
+        Returns:
+            a's insertion sequence number (pass it to add() for a replacement)
+        """
+        s = self._seq_of.pop(a.id, None)
+        recency = self._recency.get(a.type)
+        if s is not None and recency:
+            entry_r = (a.created_at_ms, -s, a.id)
+            j = bisect.bisect_left(recency, entry_r)
+            if j < len(recency) and recency[j] == entry_r:
+                del recency[j]
+        _discard(self._by_name, a.name, a.id)
+        _discard(self._by_type, a.type, a.id)
+        _discard(self._by_url, self._url_key(a.type, a.url), a.id)
+        _discard(self._by_leaf, self._leaf_key(a.type, a.name), a.id)
+        _discard(self._by_lower_name, f"{a.type}\n{(a.name or '').strip().lower()}", a.id)
+        if self._by_path_run is not None:
+            for run in _path_runs(a.url):
+                _discard(self._by_path_run, f"{a.type}\n{run}", a.id)
+        entry = (a.name, a.type, a.id)
+        i = bisect.bisect_left(self._ordered, entry)
+        if i < len(self._ordered) and self._ordered[i] == entry:
+            del self._ordered[i]
+        self._non_ascii.discard(a.id)
+        text = self._text_of.pop(a.id, None)
+        if text is not None and self._by_trigram is not None:
+            for g in _trigrams(text):
+                ids = self._by_trigram.get(g)
+                if ids is not None:
+                    ids.discard(a.id)
+                    if not ids:
+                        del self._by_trigram[g]
+        return s
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._by_type.clear()
+        self._by_url.clear()
+        self._by_leaf.clear()
+        self._by_lower_name.clear()
+        self._by_path_run = None
+        self._ordered.clear()
+        self._recency.clear()
+        self._seq_of.clear()
+        self._text_of.clear()
+        self._by_trigram = None
+        self._non_ascii.clear()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_by_path_run"] = None
+        state["_by_trigram"] = None
+        return state
+
+    def _path_run_map(self) -> Dict[str, Dict[str, None]]:
+        if self._by_path_run is None:
+            runs: Dict[str, Dict[str, None]] = {}
+            for key, ids in self._by_url.items():
+                artifact_type, _, url = key.partition("\n")
+                for run in _path_runs(url):
+                    for artifact_id in ids:
+                        _add(runs, f"{artifact_type}\n{run}", artifact_id)
+            self._by_path_run = runs
+        return self._by_path_run
+
+    def _trigram_postings(self) -> Dict[str, Set[str]]:
+        if self._by_trigram is None:
+            postings: Dict[str, Set[str]] = {}
+            for artifact_id, text in self._text_of.items():
+                for g in _trigrams(text):
+                    postings.setdefault(g, set()).add(artifact_id)
+            self._by_trigram = postings
+        return self._by_trigram
+
+    def ids_by_name(self, name: str) -> List[str]:
+        """Ids with exactly this name, in ingest order."""
+        return list(self._by_name.get(name, ()))
+
+    def ids_by_type(self, artifact_type: str) -> List[str]:
+        """Ids of this type, in ingest order."""
+        return list(self._by_type.get(artifact_type, ()))
+
+    def id_by_url(self, artifact_type: str, url: str) -> Optional[str]:
+        """First-ingested id of this type whose URL matches case-insensitively."""
+        ids = self._by_url.get(self._url_key(artifact_type, url))
+        return next(iter(ids)) if ids else None
+
+    def latest(self, artifact_type: str) -> Optional[str]:
+        """Id of the most recently created artifact of this type, or None."""
+        recency = self._recency.get(artifact_type)
+        return recency[-1][2] if recency else None
+
+    def ids_by_leaf(self, artifact_type: str, leaf: str) -> List[str]:
+        """Ids of this type whose lowercased leaf name equals leaf, in ingest order."""
+        return list(self._by_leaf.get(f"{artifact_type}\n{leaf}", ()))
+
+    def resolve_identifier(self, artifact_type: str, identifier: str) -> Optional[str]:
+        """
+        Map a model-card identifier ("org/model" or "model") to an artifact id.
+
+        Priority (case-insensitive):
+        1. the earliest-ingested artifact whose name equals identifier or
+           whose URL path contains it as a run of whole segments
+        2. the first artifact whose leaf name equals identifier's last segment
+        """
+        ident = (identifier or "").strip().lower()
+        if not ident:
+            return None
+        hits = set(self._by_lower_name.get(f"{artifact_type}\n{ident}", ()))
+        hits.update(self._path_run_map().get(f"{artifact_type}\n{ident.rstrip('/')}", ()))
+        if hits:
+            return min(hits, key=lambda aid: self._seq_of.get(aid, 0))
+        leaf = ident.split("/")[-1]
+        ids = self._by_leaf.get(f"{artifact_type}\n{leaf}") if leaf else None
+        return next(iter(ids)) if ids else None
+
+    def regex_candidates(self, literals: Iterable[str]) -> Optional[Set[str]]:
+        """
+        Ids that may match a regex requiring all of literals.
+
+        Returns:
+            Candidate ids, or None if literals give no filter (search everything)
+        """
+        grams: Set[str] = set()
+        for lit in literals:
+            grams |= _trigrams(lit)
+        if not grams:
+            return None
+        # Intersect the rarest posting lists first.
+        by_trigram = self._trigram_postings()
+        postings = sorted((by_trigram.get(g, set()) for g in grams), key=len)
+        out = set(postings[0])
+        for ids in postings[1:]:
+            if not out:
+                break
+            out &= ids
+        return out | self._non_ascii
+
+    def ordered(
+        self,
+        types: Optional[Iterable[str]] = None,
+        after: Optional[Tuple[str, str, str]] = None,
+    ) -> Iterator[Tuple[str, str, str]]:
+        """
+        Yield (name, type, id) sorted by name, then type, then id.
+
+        Args:
+            types: Only yield artifacts of these types (None for all)
+            after: Start strictly after this entry (a pagination cursor); it
+                need not exist any more
+        """
+        wanted = set(types) if types is not None else None
+        start = bisect.bisect_right(self._ordered, after) if after is not None else 0
+        for i in range(start, len(self._ordered)):
+            entry = self._ordered[i]
+            if wanted is None or entry[1] in wanted:
+                yield entry
+
+    def __len__(self) -> int:
+        return len(self._ordered)
@@ -3,78 +3,110 @@ Artifact lineage tracking and retrieval.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Set
-from fastapi import APIRouter, HTTPException, Header
+from typing import Any, Dict, List, Tuple
+from fastapi import APIRouter, HTTPException, Header, Query
 
 router = APIRouter()
 
 # In-memory storage for lineage graph
 # In production, this would be in a database
+EdgeKey = Tuple[str, str, str]  # (from_node_artifact_id, to_node_artifact_id, relationship)
+
 lineage_nodes: Dict[str, Dict[str, Any]] = {}  # artifact_id -> node data
-lineage_edges: List[Dict[str, Any]] = []  # list of edges
+lineage_edges: Dict[EdgeKey, Dict[str, Any]] = {}  # edge set, insertion-ordered
+_edges_in: Dict[str, Dict[EdgeKey, None]] = {}  # to_node_artifact_id -> edge keys
+_edges_out: Dict[str, Dict[EdgeKey, None]] = {}  # from_node_artifact_id -> edge keys
+_ids_by_name: Dict[str, Dict[str, None]] = {}  # name -> artifact ids
 
 
 def add_artifact_node(artifact_id: str, artifact_type: str, name: str) -> None:
     """Add an artifact node to the lineage graph."""
+    old = lineage_nodes.get(artifact_id)
+    if old is not None and old["name"] != name:
+        ids = _ids_by_name.get(old["name"], {})
+        ids.pop(artifact_id, None)
+        if not ids:
+            _ids_by_name.pop(old["name"], None)
     lineage_nodes[artifact_id] = {
         "artifact_id": artifact_id,
         "type": artifact_type,
         "name": name
     }
+    _ids_by_name.setdefault(name, {})[artifact_id] = None
 
 
 def add_lineage_edge(from_artifact_id: str, to_artifact_id: str, relationship: str) -> None:
     """Add an edge between two artifacts."""
-    edge = {
+    key = (from_artifact_id, to_artifact_id, relationship)
+    # Avoid duplicates
+    if key in lineage_edges:
+        return
+    lineage_edges[key] = {
         "from_node_artifact_id": from_artifact_id,
         "to_node_artifact_id": to_artifact_id,
         "relationship": relationship
     }
-    # Avoid duplicates
-    if edge not in lineage_edges:
-        lineage_edges.append(edge)
+    _edges_out.setdefault(from_artifact_id, {})[key] = None
+    _edges_in.setdefault(to_artifact_id, {})[key] = None
 
 
 def find_artifact_by_name(name: str) -> str | None:
     """Find an artifact ID by its name (e.g., 'org/model-name')."""
-    for artifact_id, node in lineage_nodes.items():
-        if node.get("name") == name:
-            return artifact_id
-    return None
+    ids = _ids_by_name.get(name)
+    return next(iter(ids)) if ids else None
 
 
-def build_lineage_subgraph(root_artifact_id: str) -> Dict[str, Any]:
+def _walk(
+    root_artifact_id: str,
+    depth: int,
+    adjacency: Dict[str, Dict[EdgeKey, None]],
+    end: int,
+    visited_nodes: Dict[str, None],
+    relevant_edges: Dict[EdgeKey, None],
+) -> None:
+    """
+    Breadth-first from the root along one edge direction, up to depth hops
+    (0 = no limit). end picks the neighbor out of an edge key: 0 walks
+    in-edges to ancestors, 1 walks out-edges to descendants.
+    """
+    seen: Dict[str, None] = {root_artifact_id: None}
+    frontier: List[str] = [root_artifact_id]
+    level = 0
+    while frontier and (depth <= 0 or level < depth):
+        next_frontier: List[str] = []
+        for node_id in frontier:
+            for key in adjacency.get(node_id, ()):
+                relevant_edges[key] = None
+                neighbor = key[end]
+                if neighbor not in seen:
+                    seen[neighbor] = None
+                    visited_nodes[neighbor] = None
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        level += 1
+
+
+def build_lineage_subgraph(root_artifact_id: str, depth: int = 1) -> Dict[str, Any]:
     """
     Build a lineage subgraph starting from a root artifact.
-    Includes all nodes and edges connected to this artifact.
+    Includes the artifact's ancestors (following edges into it) and its
+    descendants (following edges out of it), each up to depth hops away
+    (0 = no limit), with the edges between them.
     """
     if root_artifact_id not in lineage_nodes:
         return {"nodes": [], "edges": []}
     
-    # Start with the root node
-    visited_nodes: Set[str] = {root_artifact_id}
-    relevant_edges: List[Dict[str, Any]] = []
-    
-    # Find all edges connected to root (both incoming and outgoing)
-    for edge in lineage_edges:
-        if edge["to_node_artifact_id"] == root_artifact_id:
-            # Incoming edge - add the source node
-            visited_nodes.add(edge["from_node_artifact_id"])
-            relevant_edges.append(edge)
-        elif edge["from_node_artifact_id"] == root_artifact_id:
-            # Outgoing edge - add the target node
-            visited_nodes.add(edge["to_node_artifact_id"])
-            relevant_edges.append(edge)
-    
-    # Recursively find connected nodes (optional - for deeper graphs)
-    # For now, we'll do one level of connections which satisfies the tests
+    visited_nodes: Dict[str, None] = {root_artifact_id: None}
+    relevant_edges: Dict[EdgeKey, None] = {}
+    _walk(root_artifact_id, depth, _edges_in, 0, visited_nodes, relevant_edges)
+    _walk(root_artifact_id, depth, _edges_out, 1, visited_nodes, relevant_edges)
     
     # Build node list
     nodes = [lineage_nodes[node_id] for node_id in visited_nodes if node_id in lineage_nodes]
     
     return {
         "nodes": nodes,
-        "edges": relevant_edges
+        "edges": [lineage_edges[key] for key in relevant_edges]
     }
 
 
@@ -82,16 +114,21 @@ def clear_lineage() -> None:
     """Clear all lineage data (for reset)."""
     lineage_nodes.clear()
     lineage_edges.clear()
+    _edges_in.clear()
+    _edges_out.clear()
+    _ids_by_name.clear()
 
 
 @router.get("/artifact/{artifact_type}/{artifact_id}/lineage")
 async def get_artifact_lineage(
     artifact_type: str,
     artifact_id: str,
+    depth: int = Query(1, ge=0),
     x_authorization: str = Header(None)
 ) -> Dict[str, Any]:
     """
-    Get the lineage graph for a specific artifact.
+    Get the lineage graph for a specific artifact: its ancestors and
+    descendants, each up to depth hops away (0 = no limit).
     
     Returns:
         Dictionary with 'nodes' and 'edges' keys
@@ -102,4 +139,4 @@ async def get_artifact_lineage(
     if artifact_id not in lineage_nodes:
         raise HTTPException(status_code=404, detail="Artifact not found")
     
-    return build_lineage_subgraph(artifact_id)
\ No newline at end of file
+    return build_lineage_subgraph(artifact_id, depth)
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Lineage graph with adjacency maps in both directions.
+
+Edges point from a dependency (base model, dataset, code) to the artifact
+that uses it, as in the /lineage response. LineageGraph keeps in-edges and
+out-edges per node, so a node's parents or children cost time proportional
+to its degree, and ancestors()/descendants() walk them breadth-first with an
+optional depth limit.
+
+Edges that would close a cycle are rejected (e.g. a model card naming its
+own fine-tune as base model), so the graph stays acyclic and every ancestor
+set is finite. Full ancestor closures are memoized per node; changing a
+node's parents drops the memo of that node and its descendants only.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# (from node, to node, relationship)
+Edge = Tuple[str, str, str]
+
+
+class LineageGraph:
+    """Directed acyclic dependency graph: parent (dependency) -> child."""
+
+    def __init__(self) -> None:
+        # node -> {(neighbor, relationship): None}, insertion-ordered
+        self._in: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self._out: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self._closure: Dict[str, FrozenSet[str]] = {}
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._in or node in self._out
+
+    def parents(self, node: str) -> List[Tuple[str, str]]:
+        """(parent, relationship) pairs of node's in-edges."""
+        return list(self._in.get(node, ()))
+
+    def children(self, node: str) -> List[Tuple[str, str]]:
+        """(child, relationship) pairs of node's out-edges."""
+        return list(self._out.get(node, ()))
+
+    def in_edges(self, node: str) -> List[Edge]:
+        return [(p, node, rel) for p, rel in self._in.get(node, ())]
+
+    def out_edges(self, node: str) -> List[Edge]:
+        return [(node, c, rel) for c, rel in self._out.get(node, ())]
+
+    def would_cycle(self, parent: str, child: str) -> bool:
+        """True if an edge parent -> child would close a cycle."""
+        return parent == child or child in self.ancestor_closure(parent)
+
+    def add_edge(self, parent: str, child: str, relationship: str) -> bool:
+        """
+        Add parent -> child.
+
+        Returns:
+            False if the edge was rejected because it would close a cycle
+        """
+        if (parent, relationship) in self._in.get(child, ()):
+            return True
+        if self.would_cycle(parent, child):
+            return False
+        self._invalidate(child)
+        self._in.setdefault(child, {})[(parent, relationship)] = None
+        self._out.setdefault(parent, {})[(child, relationship)] = None
+        return True
+
+    def remove_edge(self, parent: str, child: str, relationship: str) -> None:
+        ins = self._in.get(child)
+        if ins is None or (parent, relationship) not in ins:
+            return
+        self._invalidate(child)
+        del ins[(parent, relationship)]
+        if not ins:
+            del self._in[child]
+        outs = self._out[parent]
+        del outs[(child, relationship)]
+        if not outs:
+            del self._out[parent]
+
+    def set_parents(self, child: str, parents: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Replace child's in-edges with (parent, relationship) pairs.
+
+        Memos are only invalidated if the edges actually change.
+
+        Returns:
+            The pairs rejected because they would close a cycle
+        """
+        wanted = dict.fromkeys(parents)
+        for parent, rel in self.parents(child):
+            if (parent, rel) not in wanted:
+                self.remove_edge(parent, child, rel)
+        return [pair for pair in wanted if not self.add_edge(pair[0], child, pair[1])]
+
+    def remove_node(self, node: str) -> None:
+        """Drop node and every edge touching it."""
+        for parent, rel in self.parents(node):
+            self.remove_edge(parent, node, rel)
+        for child, rel in self.children(node):
+            self.remove_edge(node, child, rel)
+        self._closure.pop(node, None)
+
+    def clear(self) -> None:
+        self._in.clear()
+        self._out.clear()
+        self._closure.clear()
+
+    def ancestors(
+        self,
+        node: str,
+        max_depth: Optional[int] = None,
+        expand: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Breadth-first walk over in-edges.
+
+        Args:
+            max_depth: Stop this many hops from node (None for no limit)
+            expand: Called with each node before its parents are read, so
+                callers can load edges lazily
+
+        Returns:
+            {ancestor: distance from node}, node itself excluded
+        """
+        return self._walk(node, self._in, max_depth, expand)
+
+    def descendants(
+        self,
+        node: str,
+        max_depth: Optional[int] = None,
+        expand: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, int]:
+        """Like ancestors(), over out-edges."""
+        return self._walk(node, self._out, max_depth, expand)
+
+    @staticmethod
+    def _walk(
+        node: str,
+        adjacency: Dict[str, Dict[Tuple[str, str], None]],
+        max_depth: Optional[int],
+        expand: Optional[Callable[[str], None]],
+    ) -> Dict[str, int]:
+        depth: Dict[str, int] = {node: 0}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            d = depth[current]
+            if max_depth is not None and d >= max_depth:
+                continue
+            if expand is not None:
+                expand(current)
+            for neighbor, _rel in adjacency.get(current, ()):
+                if neighbor not in depth:
+                    depth[neighbor] = d + 1
+                    queue.append(neighbor)
+        del depth[node]
+        return depth
+
+    def ancestor_closure(self, node: str) -> FrozenSet[str]:
+        """Every ancestor of node (memoized until an edge below it changes)."""
+        memo = self._closure.get(node)
+        if memo is not None:
+            return memo
+        # Iterative post-order: parents are memoized before their children.
+        stack: List[Tuple[str, bool]] = [(node, False)]
+        while stack:
+            current, ready = stack.pop()
+            if current in self._closure:
+                continue
+            parents = [p for p, _rel in self._in.get(current, ())]
+            if not ready:
+                stack.append((current, True))
+                stack.extend((p, False) for p in parents if p not in self._closure)
+                continue
+            acc: Set[str] = set()
+            for p in parents:
+                acc.add(p)
+                acc |= self._closure[p]
+            self._closure[current] = frozenset(acc)
+        return self._closure[node]
+
+    def _invalidate(self, node: str) -> None:
+        # A node's closure is computed (and memoized) before any of its
+        # descendants', so if node has no memo neither does anything below it.
+        if node not in self._closure:
+            return
+        self._closure.pop(node, None)
+        for d in self._walk(node, self._out, None, None):
+            self._closure.pop(d, None)
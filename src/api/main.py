@@ -988,13 +988,31 @@ State is kept in-memory and is resettable via `/reset`.
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import concurrent.futures
+import functools
 import hashlib
+import heapq
+import itertools
 import json
+import os
 import re
 import secrets
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from fastapi import Body, FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.exceptions import RequestValidationError
@@ -1003,10 +1021,34 @@ from fastapi.responses import HTMLResponse
 from mangum import Mangum
 from pydantic import BaseModel, Field
 
-from src.registry.scorer import score_model
-from src.registry.url_parser import parse_url
+from src.api.artifact_index import ArtifactIndex, leaf_name, required_literals
+from src.api.lineage_graph import LineageGraph
+from src.api.rating_executor import RatingQueueFull
+from src.api.rating_jobs import RatingJob, RatingJobs
+from src.api.regex_sandbox import (
+    RegexCatalog,
+    RegexTimeout,
+    RegexWorkerError,
+    get_regex_sandbox,
+)
+from src.api.snapshot import (
+    detached,
+    read_snapshot,
+    snapshot_interval_s,
+    snapshot_path,
+    write_snapshot,
+)
+from src.api.storage import (
+    ArtifactType,
+    DuplicateArtifact,
+    StoredArtifact,
+    open_artifact_store,
+)
+from src.registry.hf_snapshot import get_hf_snapshot, peek_hf_snapshot
+from src.registry.url_parser import fetch_repo_size, hf_model_ref
 
-ArtifactType = Literal["model", "dataset", "code"]
+if TYPE_CHECKING:
+    from src.registry.models import ModelScore
 
 
 app = FastAPI(
@@ -1021,25 +1063,55 @@ app = FastAPI(
 # ----------------------------
 
 
-@dataclass(frozen=True)
-class _StoredArtifact:
-    id: str
-    type: ArtifactType
-    name: str
-    url: str
-    created_at_ms: int
-    metadata: Dict[str, Any]
-
+_StoredArtifact = StoredArtifact
 
-_artifacts_by_id: Dict[str, _StoredArtifact] = {}
+# Backend selected by REGISTRY_STORE (see src/api/storage.py). Reads go to its
+# in-process cache; writes go through _store_put/_store_remove/_store_clear.
+_store = open_artifact_store()
+_artifacts_by_id: Dict[str, _StoredArtifact] = _store.by_id
 _artifact_id_by_type_and_url: Dict[Tuple[ArtifactType, str], str] = {}
-_auth_tokens: Set[str] = set()
+_artifact_index = ArtifactIndex()
+# Texts /artifact/byRegEx searches, mirrored into the sandbox workers.
+_regex_catalog = RegexCatalog()
+# Lineage edges resolved so far, shared across requests; see _ensure_lineage_parents.
+_lineage_graph = LineageGraph()
+_lineage_nodes: Dict[str, "ArtifactLineageNode"] = {}
+# Ingested models whose direct dependencies must be (re)resolved, in ingest order.
+_lineage_stale: Dict[str, None] = {}
+# (dependency type, identifier leaf) -> models whose resolution looked it up, and back.
+_lineage_waiting: Dict[Tuple[str, str], Set[str]] = {}
+_lineage_lookups: Dict[str, Set[Tuple[str, str]]] = {}
+# Background task resolving _lineage_stale; see _schedule_lineage_resolution.
+_lineage_resolver: Optional["asyncio.Task[None]"] = None
+# /cost memos: standalone cost per node, and total cost with the ancestor closure it covers.
+_standalone_cost_mb: Dict[str, float] = {}
+_total_cost_mb: Dict[str, Tuple[FrozenSet[str], float]] = {}
+_rating_jobs: RatingJobs[ModelRating] = RatingJobs()
+# Store writes so far, and the (writes, rating changes) last saved to the snapshot.
+_store_writes = 0
+_snapshot_saved: Tuple[int, int] = (0, 0)
+# Background snapshot writer, its write in flight, and when that write started.
+_snapshot_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="snapshot"
+)
+_snapshot_write: Optional["concurrent.futures.Future[None]"] = None
+_snapshot_started = float("-inf")
 
 # Spec default credential (Phase 2)
 _DEFAULT_ADMIN_USER = "ece30861defaultadminuser"
 _DEFAULT_ADMIN_PASSWORD = "correcthorsebatterystaple123(!__+@**(A'\"`;DROP TABLE artifacts;"
 
 
+@app.middleware("http")
+async def _sync_store_middleware(request: Request, call_next: Any) -> Response:
+    _sync_store()
+    response = await call_next(request)
+    if _lineage_stale:
+        _schedule_lineage_resolution()
+    _save_snapshot(force=False)
+    return response  # type: ignore[no-any-return]
+
+
 @app.exception_handler(RequestValidationError)
 async def _validation_error_to_400(_request: Request, _exc: RequestValidationError) -> JSONResponse:
     # Spec uses HTTP 400 for malformed/missing fields; FastAPI defaults to 422.
@@ -1061,6 +1133,235 @@ def _hash_id(seed: str) -> str:
     return str(int(h[:16], 16) % 10_000_000_000).zfill(10)
 
 
+def _index_put(old: Optional[_StoredArtifact], a: _StoredArtifact) -> None:
+    """Update the derived indexes for a stored artifact that replaced old (None if new)."""
+    seq: Optional[int] = None
+    if old is not None:
+        _artifact_id_by_type_and_url.pop((old.type, old.url), None)
+        seq = _artifact_index.remove(old)
+        _lineage_invalidate_for(old)
+        _cost_invalidate(a.id)
+    _artifact_id_by_type_and_url[(a.type, a.url)] = a.id
+    _artifact_index.add(a, seq=seq)
+    _regex_catalog.put(a.id, _regex_texts(a))
+    _lineage_invalidate_for(a)
+    if a.type == "model":
+        _lineage_stale[a.id] = None
+
+
+def _regex_texts(a: _StoredArtifact) -> Tuple[str, ...]:
+    """Texts /artifact/byRegEx matches an artifact by."""
+    return (a.name, a.id, a.url)
+
+
+def _index_remove(a: _StoredArtifact) -> None:
+    _artifact_id_by_type_and_url.pop((a.type, a.url), None)
+    _artifact_index.remove(a)
+    _regex_catalog.remove(a.id)
+    _lineage_invalidate_for(a)
+    _cost_invalidate(a.id)
+    _lineage_graph.remove_node(a.id)
+    _lineage_nodes.pop(a.id, None)
+    _lineage_stale.pop(a.id, None)
+    _lineage_forget_lookups(a.id)
+
+
+def _store_put(a: _StoredArtifact) -> None:
+    """Insert or replace an artifact, keeping the lookup indexes in sync."""
+    global _store_writes
+    _store_writes += 1
+    old = _artifacts_by_id.get(a.id)
+    _store.put(a)
+    _index_put(old, a)
+
+
+def _store_remove(artifact_id: str) -> Optional[_StoredArtifact]:
+    """Remove an artifact and its index entries; returns it (None if unknown)."""
+    global _store_writes
+    if artifact_id not in _artifacts_by_id:
+        return None
+    _store_writes += 1
+    a = _store.remove(artifact_id)
+    if a is not None:
+        _index_remove(a)
+    return a
+
+
+def _store_clear() -> None:
+    global _store_writes
+    _store_writes += 1
+    _store.clear()
+    _index_clear()
+
+
+def _index_clear() -> None:
+    _artifact_id_by_type_and_url.clear()
+    _artifact_index.clear()
+    _regex_catalog.reset()
+    _lineage_graph.clear()
+    _lineage_nodes.clear()
+    _lineage_stale.clear()
+    _lineage_waiting.clear()
+    _lineage_lookups.clear()
+    _standalone_cost_mb.clear()
+    _total_cost_mb.clear()
+
+
+def _rebuild_indexes() -> None:
+    """Rebuild every derived index from the store, in ingest order."""
+    _index_clear()
+    for a in sorted(_artifacts_by_id.values(), key=lambda x: x.created_at_ms):
+        _index_put(None, a)
+
+
+def _sync_store() -> None:
+    """Apply artifacts written by other processes sharing the store."""
+    changes = _store.sync()
+    if changes is None:
+        _rebuild_indexes()
+        return
+    for old, new in changes:
+        if new is None:
+            if old is not None:
+                _index_remove(old)
+        else:
+            _index_put(old, new)
+
+
+def _snapshot_state(copy: bool = False) -> Dict[str, Any]:
+    """
+    Everything a warm start restores (see src/api/snapshot.py).
+
+    Args:
+        copy: Detach the state from the live structures, so another thread
+            can pickle it while requests keep changing them
+    """
+    keep: Callable[[Any], Any] = detached if copy else (lambda value: value)
+    return {
+        # Plain tuples unpickle several times faster than dataclass instances.
+        "artifacts": [
+            (a.id, a.type, a.name, a.url, a.created_at_ms, keep(a.metadata))
+            for a in _artifacts_by_id.values()
+        ],
+        "artifact_id_by_type_and_url": keep(_artifact_id_by_type_and_url),
+        "artifact_index": keep(_artifact_index),
+        "lineage_graph": keep(_lineage_graph),
+        "lineage_nodes": keep(_lineage_nodes),
+        "lineage_stale": keep(_lineage_stale),
+        "lineage_waiting": keep(_lineage_waiting),
+        "lineage_lookups": keep(_lineage_lookups),
+        "standalone_cost_mb": keep(_standalone_cost_mb),
+        "total_cost_mb": keep(_total_cost_mb),
+        "ratings": _rating_jobs.export(),
+    }
+
+
+def _write_snapshot_copy(path: str, state: Dict[str, Any], version: Tuple[int, int]) -> None:
+    global _snapshot_saved
+    write_snapshot(path, state)
+    _snapshot_saved = version
+
+
+def _wait_for_snapshot() -> None:
+    """Block until the background snapshot write in flight, if any, is done."""
+    if _snapshot_write is not None:
+        concurrent.futures.wait([_snapshot_write])
+
+
+def _save_snapshot(force: bool) -> None:
+    """
+    Write a snapshot if one is configured and the state changed since the
+    last one.
+
+    Forced (at shutdown), it is written in process once any background
+    write has finished. Otherwise, at most once per snapshot interval, the
+    state is copied here (on the event loop, where it is only ever changed)
+    and pickled and written on the snapshot thread; the call returns at once.
+    """
+    global _snapshot_saved, _snapshot_write, _snapshot_started
+    path = snapshot_path()
+    if path is None:
+        return
+    version = (_store_writes, _rating_jobs.changes)
+    if force:
+        _wait_for_snapshot()
+        if version != _snapshot_saved:
+            write_snapshot(path, _snapshot_state())
+            _snapshot_saved = version
+        return
+    if version == _snapshot_saved or (_snapshot_write is not None and not _snapshot_write.done()):
+        return
+    now = time.monotonic()
+    if now - _snapshot_started < snapshot_interval_s():
+        return
+    _snapshot_started = now
+    _snapshot_write = _snapshot_executor.submit(
+        _write_snapshot_copy, path, _snapshot_state(copy=True), version
+    )
+
+
+def _restore_snapshot() -> bool:
+    """
+    Load the configured snapshot into an empty store.
+
+    Returns:
+        True if state was restored (indexes included), False otherwise
+    """
+    global _artifact_index, _lineage_graph, _snapshot_saved
+    path = snapshot_path()
+    if path is None or _artifacts_by_id:
+        return False
+    state = read_snapshot(path)
+    if state is None:
+        return False
+    _store.put_many(_StoredArtifact(*row) for row in state["artifacts"])
+    _artifact_id_by_type_and_url.update(state["artifact_id_by_type_and_url"])
+    _artifact_index = state["artifact_index"]
+    _regex_catalog.reset((a.id, _regex_texts(a)) for a in _artifacts_by_id.values())
+    _lineage_graph = state["lineage_graph"]
+    _lineage_nodes.update(state["lineage_nodes"])
+    _lineage_stale.update(state["lineage_stale"])
+    _lineage_waiting.update(state["lineage_waiting"])
+    _lineage_lookups.update(state["lineage_lookups"])
+    _standalone_cost_mb.update(state["standalone_cost_mb"])
+    _total_cost_mb.update(state["total_cost_mb"])
+    _rating_jobs.restore(state["ratings"])
+    _snapshot_saved = (_store_writes, _rating_jobs.changes)
+    return True
+
+
+def _lineage_key(artifact_type: str, identifier: str) -> Tuple[str, str]:
+    """Bucket of a dependency lookup: its type and last non-empty path segment."""
+    segments = [s for s in (identifier or "").strip().lower().split("/") if s]
+    return (artifact_type, segments[-1] if segments else "")
+
+
+def _lineage_invalidate_for(a: _StoredArtifact) -> None:
+    """
+    Mark stale every model whose resolved dependencies a may change: models
+    that depend on a, and models that looked up an identifier a could match
+    (its name or a segment of its URL), e.g. an "hf:model:<name>" external
+    node that a now resolves.
+    """
+    keys = {(a.type, leaf_name(a.name))}
+    keys.update((a.type, s) for s in (a.url or "").strip().lower().split("/") if s)
+    affected: Set[str] = {child for child, _rel in _lineage_graph.children(a.id)}
+    for key in keys:
+        affected |= _lineage_waiting.get(key, set())
+    for model_id in affected:
+        if model_id in _artifacts_by_id:
+            _lineage_stale[model_id] = None
+
+
+def _lineage_forget_lookups(model_id: str) -> None:
+    for key in _lineage_lookups.pop(model_id, ()):
+        waiting = _lineage_waiting.get(key)
+        if waiting is not None:
+            waiting.discard(model_id)
+            if not waiting:
+                del _lineage_waiting[key]
+
+
 def _new_artifact_id(artifact_type: ArtifactType, url: str) -> str:
     candidate = _hash_id(f"{artifact_type}:{url}:{_now_ms()}:{secrets.token_hex(4)}")
     while candidate in _artifacts_by_id:
@@ -1120,21 +1421,49 @@ def _download_url(request: Request, artifact_id: str) -> str:
     return str(request.base_url).rstrip("/") + f"/download/{artifact_id}"
 
 
-def _paginate(items: List[Dict[str, Any]], offset: int, page_size: int = 10) -> Tuple[List[Dict[str, Any]], str]:
-    if offset < 0 or offset > len(items):
-        offset = 0
-    page = items[offset : offset + page_size]
-    next_offset = offset + len(page)
-    if next_offset >= len(items):
-        return page, "0"
-    return page, str(next_offset)
+_ListEntry = Tuple[str, str, str]  # (name, type, id): the /artifacts sort key
+
+# Default page size: the autograder expects wildcard enumeration to return
+# all artifacts without requiring pagination.
+_DEFAULT_PAGE_SIZE = 10_000
+
 
+def _artifacts_page_size() -> int:
+    try:
+        return max(1, int(os.environ.get("ARTIFACTS_PAGE_SIZE", _DEFAULT_PAGE_SIZE)))
+    except ValueError:
+        return _DEFAULT_PAGE_SIZE
+
+
+def _encode_cursor(entry: _ListEntry) -> str:
+    """Opaque cursor for the position just after entry."""
+    raw = json.dumps(list(entry), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-def _regex_compile(pattern: str) -> re.Pattern[str]:
+
+def _decode_cursor(cursor: str) -> _ListEntry:
+    """Inverse of _encode_cursor (raises ValueError on anything else)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        entry = json.loads(raw)
+    except Exception as e:
+        raise ValueError("bad cursor") from e
+    if not (isinstance(entry, list) and len(entry) == 3 and all(isinstance(x, str) for x in entry)):
+        raise ValueError("bad cursor")
+    return entry[0], entry[1], entry[2]
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_search(pattern: str) -> Tuple[re.Pattern[str], Tuple[str, ...]]:
+    """Compile pattern and extract its required literals (raises re.error)."""
+    return re.compile(pattern, re.IGNORECASE), tuple(required_literals(pattern, re.IGNORECASE))
+
+
+def _regex_compile(pattern: str) -> Tuple[re.Pattern[str], Tuple[str, ...]]:
     if len(pattern) > 500:
         raise HTTPException(status_code=400, detail="There is missing field(s) in the artifact_regex or it is formed improperly, or is invalid")
     try:
-        return re.compile(pattern, re.IGNORECASE)
+        return _compile_search(pattern)
     except re.error:
         raise HTTPException(status_code=400, detail="There is missing field(s) in the artifact_regex or it is formed improperly, or is invalid")
 
@@ -1296,9 +1625,7 @@ async def authenticate(
     if req.user.name != _DEFAULT_ADMIN_USER or req.secret.password != _DEFAULT_ADMIN_PASSWORD:
         raise HTTPException(status_code=401, detail="The user or password is invalid.")
 
-    tok = f"bearer {secrets.token_urlsafe(24)}"
-    _auth_tokens.add(tok)
-    return tok
+    return f"bearer {secrets.token_urlsafe(24)}"
 
 
 # ----------------------------
@@ -1309,8 +1636,8 @@ async def authenticate(
 @app.delete("/reset")
 async def reset(x_authorization: Optional[str] = Header(default=None, alias="X-Authorization")) -> Dict[str, str]:
     _require_token(x_authorization)
-    _artifacts_by_id.clear()
-    _artifact_id_by_type_and_url.clear()
+    _store_clear()
+    _rating_jobs.clear()
     return {"status": "reset"}
 
 
@@ -1319,10 +1646,41 @@ async def reset(x_authorization: Optional[str] = Header(default=None, alias="X-A
 # ----------------------------
 
 
+# Registered before POST /artifact/{artifact_type}, which would otherwise
+# capture "byRegEx" as an (invalid) artifact type.
+@app.post("/artifact/byRegEx")
+async def artifact_by_regex(
+    req: ArtifactRegEx = Body(...),
+    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
+) -> List[Dict[str, Any]]:
+    _require_token(x_authorization)
+
+    _compiled, literals = _regex_compile(req.regex)
+    candidates = _artifact_index.regex_candidates(literals)
+    # Evaluated in a sandbox process: a backtracking pattern only costs this request.
+    try:
+        hit_ids = await asyncio.to_thread(
+            get_regex_sandbox().search, req.regex, re.IGNORECASE, _regex_catalog, candidates
+        )
+    except (RegexTimeout, re.error):
+        raise HTTPException(
+            status_code=400,
+            detail="There is missing field(s) in the artifact_regex or it is formed improperly, "
+            "or is invalid",
+        )
+    except RegexWorkerError:
+        raise HTTPException(status_code=503, detail="Regex search is temporarily unavailable.")
+    matches = [_artifact_meta(_artifacts_by_id[aid]) for aid in hit_ids if aid in _artifacts_by_id]
+    if not matches:
+        raise HTTPException(status_code=404, detail="No artifact found under this regex.")
+    return sorted(matches, key=lambda m: (m["name"], m["type"], m["id"]))
+
+
 @app.post("/artifact/{artifact_type}", status_code=201)
 async def artifact_create(
     artifact_type: ArtifactType,
     request: Request,
+    response: Response,
     body: ArtifactCreateRequest = Body(...),
     x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
 ) -> Artifact:
@@ -1360,15 +1718,32 @@ async def artifact_create(
         if v is not None:
             stored_metadata[k] = v
 
-    _artifacts_by_id[artifact_id] = _StoredArtifact(
-        id=artifact_id,
-        type=artifact_type,
-        name=name,
-        url=url,
-        created_at_ms=_now_ms(),
-        metadata=stored_metadata,
-    )
-    _artifact_id_by_type_and_url[key] = artifact_id
+    try:
+        _store_put(
+            _StoredArtifact(
+                id=artifact_id,
+                type=artifact_type,
+                name=name,
+                url=url,
+                created_at_ms=_now_ms(),
+                metadata=stored_metadata,
+            )
+        )
+    except DuplicateArtifact:
+        # Ingested concurrently by another process sharing the store.
+        raise HTTPException(status_code=409, detail="Artifact exists already.")
+
+    if artifact_type == "model" and _rate_on_ingest():
+        job = _submit_rating_job(artifact_id)
+        if _rating_deferred():
+            if job is None:
+                # Nothing would ever rate it; don't keep an artifact /rate can't serve.
+                _store_remove(artifact_id)
+                raise HTTPException(
+                    status_code=503, detail="The rating system is busy; retry later."
+                )
+            # Spec: 202 = stored, rating deferred; /rate is 404 until it exists.
+            response.status_code = 202
 
     return Artifact(
         metadata=ArtifactMetadata(name=name, id=artifact_id, type=artifact_type),
@@ -1387,31 +1762,71 @@ async def artifacts_list(
     if not queries:
         raise HTTPException(status_code=400, detail="There is missing field(s) in the artifact_query or it is formed improperly, or is invalid.")
 
-    results: Dict[str, Dict[str, Any]] = {}
-    all_artifacts = list(_artifacts_by_id.values())
+    wildcard_types: Set[str] = set()
+    wildcard_all = False
+    named: Set[Tuple[str, str, str]] = set()
 
     for q in queries:
         q_types = set(q.types or []) if q.types else None
-        for a in all_artifacts:
-            if q_types is not None and a.type not in q_types:
-                continue
-            if q.name == "*" or a.name == q.name:
-                results[a.id] = _artifact_meta(a)
-
-    ordered = sorted(results.values(), key=lambda m: (m["name"], m["type"], m["id"]))
-
-    off = 0
+        if q.name == "*":
+            if q_types is None:
+                wildcard_all = True
+            else:
+                wildcard_types |= q_types
+            continue
+        for aid in _artifact_index.ids_by_name(q.name):
+            a = _artifacts_by_id[aid]
+            if q_types is None or a.type in q_types:
+                named.add((a.name, a.type, a.id))
+
+    # The offset is an opaque cursor (the last entry of the previous page);
+    # plain integers are still accepted as legacy positional offsets.
+    after: Optional[_ListEntry] = None
+    skip = 0
     if offset:
         try:
-            off = int(offset)
-        except Exception:
-            off = 0
+            skip = max(0, int(offset))
+        except ValueError:
+            try:
+                after = _decode_cursor(offset)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="There is missing field(s) in the artifact_query or it is formed "
+                    "improperly, or is invalid.",
+                )
 
-    # Autograder expects wildcard enumeration to return all artifacts without requiring pagination.
-    page, next_offset = _paginate(ordered, off, page_size=10_000)
-    resp = Response(content=json.dumps(page), media_type="application/json")
-    resp.headers["offset"] = next_offset
-    return resp
+    # Wildcards walk the name-ordered index from the cursor; named queries
+    # only sort their own hits. Nothing beyond one page is materialized.
+    named_sorted = sorted(e for e in named if after is None or e > after)
+
+    def matches() -> Iterator[_ListEntry]:
+        if not (wildcard_all or wildcard_types):
+            return iter(named_sorted)
+        types = None if wildcard_all else wildcard_types
+        walk = _artifact_index.ordered(types, after=after)
+        return (e for e, _ in itertools.groupby(heapq.merge(walk, named_sorted)))
+
+    page_size = _artifacts_page_size()
+    merged = matches()
+    if skip and sum(1 for _ in itertools.islice(merged, skip)) < skip:
+        # Legacy semantics: an integer offset past the end restarts at 0.
+        merged, skip = matches(), 0
+    page = list(itertools.islice(merged, page_size + 1))
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    if not has_more:
+        next_offset = "0"
+    elif after is None and offset:
+        next_offset = str(skip + len(page))
+    else:
+        next_offset = _encode_cursor(page[-1])
+    return Response(
+        content=json.dumps([{"name": n, "id": aid, "type": t} for n, t, aid in page]),
+        media_type="application/json",
+        headers={"offset": next_offset},
+    )
 
 
 @app.get("/artifact/byName/{name}")
@@ -1421,29 +1836,12 @@ async def artifact_by_name(
 ) -> List[Dict[str, Any]]:
     _require_token(x_authorization)
 
-    matches = [_artifact_meta(a) for a in _artifacts_by_id.values() if a.name == name]
+    matches = [_artifact_meta(_artifacts_by_id[aid]) for aid in _artifact_index.ids_by_name(name)]
     if not matches:
         raise HTTPException(status_code=404, detail="No such artifact.")
     return sorted(matches, key=lambda m: (m["type"], m["id"]))
 
 
-@app.post("/artifact/byRegEx")
-async def artifact_by_regex(
-    req: ArtifactRegEx = Body(...),
-    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
-) -> List[Dict[str, Any]]:
-    _require_token(x_authorization)
-
-    compiled = _regex_compile(req.regex)
-    matches = []
-    for a in _artifacts_by_id.values():
-        if compiled.search(a.name) or compiled.search(a.id) or compiled.search(a.url):
-            matches.append(_artifact_meta(a))
-    if not matches:
-        raise HTTPException(status_code=404, detail="No artifact found under this regex.")
-    return sorted(matches, key=lambda m: (m["name"], m["type"], m["id"]))
-
-
 @app.get("/artifacts/{artifact_type}/{id}")
 async def artifact_retrieve(
     artifact_type: ArtifactType,
@@ -1487,16 +1885,20 @@ async def artifact_update(
     if new_key != old_key and new_key in _artifact_id_by_type_and_url:
         raise HTTPException(status_code=409, detail="Artifact exists already.")
 
-    _artifact_id_by_type_and_url.pop(old_key, None)
-    _artifact_id_by_type_and_url[new_key] = id
-    _artifacts_by_id[id] = _StoredArtifact(
-        id=id,
-        type=artifact_type,
-        name=body.metadata.name,
-        url=new_url,
-        created_at_ms=existing.created_at_ms,
-        metadata=existing.metadata,
-    )
+    try:
+        _store_put(
+            _StoredArtifact(
+                id=id,
+                type=artifact_type,
+                name=body.metadata.name,
+                url=new_url,
+                created_at_ms=existing.created_at_ms,
+                metadata=existing.metadata,
+            )
+        )
+    except DuplicateArtifact:
+        raise HTTPException(status_code=409, detail="Artifact exists already.")
+    _rating_jobs.discard(id)
     return {"status": "updated"}
 
 
@@ -1512,8 +1914,8 @@ async def artifact_delete(
     if not a or a.type != artifact_type:
         raise HTTPException(status_code=404, detail="Artifact does not exist.")
 
-    _artifacts_by_id.pop(id, None)
-    _artifact_id_by_type_and_url.pop((a.type, a.url), None)
+    _store_remove(id)
+    _rating_jobs.discard(id)
     return {"status": "deleted"}
 
 
@@ -1531,29 +1933,54 @@ async def download_artifact(artifact_id: str) -> Response:
 # ----------------------------
 
 
-@app.get("/artifact/model/{id}/rate")
-async def model_rate(
-    id: str,
-    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
-) -> ModelRating:
-    _require_token(x_authorization)
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+def _rate_on_ingest() -> bool:
+    """RATE_ON_INGEST (default on): queue a background rating when a model is ingested."""
+    return _env_flag("RATE_ON_INGEST", True)
+
+
+def _rating_deferred() -> bool:
+    """RATE_DEFERRED (default off): ingest answers 202 and /rate is 404 until rated."""
+    return _env_flag("RATE_DEFERRED", False)
 
-    a = _artifacts_by_id.get(id)
-    if not a or a.type != "model":
-        raise HTTPException(status_code=404, detail="Artifact does not exist.")
 
+def _scoring_context() -> Dict[str, str]:
     # Provide context from most recently ingested dataset/code (helps dataset_and_code_score).
-    dataset_url = ""
-    code_url = ""
-    for other in sorted(_artifacts_by_id.values(), key=lambda x: x.created_at_ms, reverse=True):
-        if not dataset_url and other.type == "dataset":
-            dataset_url = other.url
-        if not code_url and other.type == "code":
-            code_url = other.url
-        if dataset_url and code_url:
-            break
-
-    ms = score_model(a.url, {"dataset_link": dataset_url, "code_link": code_url})
+    dataset_id = _artifact_index.latest("dataset")
+    code_id = _artifact_index.latest("code")
+    return {
+        "dataset_link": _artifacts_by_id[dataset_id].url if dataset_id else "",
+        "code_link": _artifacts_by_id[code_id].url if code_id else "",
+    }
+
+
+def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+    """
+    Run the Phase-1 scorer on url.
+
+    The scorer and its metrics are imported on the first rating, not with
+    this module, so requests that never rate don't pay for them.
+    """
+    from src.registry.scorer import score_model as _score_model
+
+    return _score_model(url, related_context)
+
+
+def _scorer_version() -> str:
+    from src.registry.scorer import SCORER_VERSION
+
+    return SCORER_VERSION
+
+
+def _rate_model(url: str, context: Dict[str, str]) -> ModelRating:
+    """Blocking: score a model and convert it to the API rating shape."""
+    ms = score_model(url, context)
 
     # The Phase-1 scorer doesn't compute the Phase-2-only metrics, so return safe defaults.
     return ModelRating(
@@ -1586,6 +2013,174 @@ async def model_rate(
     )
 
 
+def _rating_key(a: _StoredArtifact, context: Dict[str, str]) -> Tuple[str, str, str, str]:
+    """Cache key of a rating: everything it depends on besides the upstream revision."""
+    return (a.url, context["dataset_link"], context["code_link"], _scorer_version())
+
+
+def _upstream_revision(url: str) -> Optional[str]:
+    """Commit sha of a model's HF repo if its metadata is cached; never fetches."""
+    if "huggingface.co/" not in url.lower():
+        return None
+    try:
+        snapshot = peek_hf_snapshot(*hf_model_ref(url))
+    except Exception:
+        return None
+    return snapshot.sha if snapshot is not None else None
+
+
+def _fetch_upstream_revision(url: str) -> Optional[str]:
+    """
+    Commit sha of a model's HF repo, fetching its metadata if needed (None on
+    failure). Throttled by the snapshot and metadata caches, so a repo's Hub
+    entry is requested at most once per TTL.
+    """
+    if "huggingface.co/" not in url.lower():
+        return None
+    try:
+        return get_hf_snapshot(*hf_model_ref(url)).sha
+    except Exception:
+        return None
+
+
+async def _rating_is_current(
+    job: RatingJob[ModelRating], a: _StoredArtifact, context: Dict[str, str]
+) -> bool:
+    """
+    True if a finished rating was computed from the artifact's current inputs.
+
+    The upstream revision is checked against cached metadata, fetched off the
+    event loop once that expires. A rating recorded without a revision, or
+    whose repo can't be reached, is served as-is.
+    """
+    if job.state != "done" or job.key != _rating_key(a, context):
+        return False
+    if job.revision is None:
+        return True
+    revision = _upstream_revision(a.url)
+    if revision is None:
+        revision = await asyncio.to_thread(_fetch_upstream_revision, a.url)
+    return revision is None or revision == job.revision
+
+
+def _drop_unrated_artifact(artifact_id: str) -> None:
+    # Spec: in deferred mode the artifact is dropped silently if rating fails.
+    job = _rating_jobs.get(artifact_id)
+    if job is not None and job.state == "failed":
+        _store_remove(artifact_id)
+
+
+def _submit_rating_job(artifact_id: str) -> Optional[RatingJob[ModelRating]]:
+    """
+    Queue (or join) the background rating job; None if the queue is full.
+
+    Must be called on the event loop: a failed deferred rating is dropped
+    from the store there, not on the rating worker thread.
+    """
+    a = _artifacts_by_id.get(artifact_id)
+    if a is None:
+        return None
+    context = _scoring_context()
+    on_failed: Optional[Callable[[str], None]] = None
+    if _rating_deferred():
+        loop = asyncio.get_running_loop()
+
+        def _drop_on_failure(failed_id: str) -> None:
+            loop.call_soon_threadsafe(_drop_unrated_artifact, failed_id)
+
+        on_failed = _drop_on_failure
+    try:
+        return _rating_jobs.submit(
+            artifact_id,
+            _rate_model,
+            a.url,
+            context,
+            key=_rating_key(a, context),
+            revision_of=lambda: _upstream_revision(a.url),
+            on_failed=on_failed,
+        )
+    except RatingQueueFull:
+        return None
+
+
+@app.get("/artifact/model/{id}/rate")
+async def model_rate(
+    id: str,
+    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
+) -> ModelRating:
+    _require_token(x_authorization)
+
+    a = _artifacts_by_id.get(id)
+    if not a or a.type != "model":
+        raise HTTPException(status_code=404, detail="Artifact does not exist.")
+
+    # A finished job is the cached rating; serve it while its inputs (URL,
+    # dataset/code context, scorer version, upstream revision) are unchanged.
+    context = _scoring_context()
+    job = _rating_jobs.get(id)
+    if job is not None and job.state == "done" and job.result is not None:
+        if _rating_deferred() or await _rating_is_current(job, a, context):
+            return job.result
+        _rating_jobs.discard(id)
+        job = None
+
+    if _rating_deferred():
+        # Deferred path: nothing is computed on demand, but an artifact whose
+        # job was lost (cancelled, or never admitted) is queued again.
+        if job is None:
+            _submit_rating_job(id)
+        raise HTTPException(status_code=404, detail="Artifact does not exist.")
+
+    # Join the pending job, or start one; score_model blocks on git/HF I/O so
+    # it runs on the bounded rating pool and the event loop keeps serving.
+    while True:
+        if job is None or job.state == "failed" or job.key != _rating_key(a, context):
+            job = _submit_rating_job(id)
+            if job is None:
+                raise HTTPException(
+                    status_code=503, detail="The rating system is busy; retry later."
+                )
+        assert job.future is not None
+        try:
+            # Shielded: a client disconnecting must not cancel the shared job.
+            return await asyncio.shield(asyncio.wrap_future(job.future))
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                raise
+        except Exception:
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    "The artifact rating system encountered an error while computing at "
+                    "least one metric."
+                ),
+            )
+        # The job was superseded (artifact updated) or dropped (deleted, reset)
+        # while we waited: follow the artifact to its current job, if any.
+        a = _artifacts_by_id.get(id)
+        if not a or a.type != "model":
+            raise HTTPException(status_code=404, detail="Artifact does not exist.")
+        context = _scoring_context()
+        job = _rating_jobs.get(id)
+
+
+@app.get("/artifact/model/{id}/rate/status")
+async def model_rate_status(
+    id: str,
+    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
+) -> Dict[str, Any]:
+    _require_token(x_authorization)
+
+    a = _artifacts_by_id.get(id)
+    if not a or a.type != "model":
+        raise HTTPException(status_code=404, detail="Artifact does not exist.")
+
+    job = _rating_jobs.get(id)
+    if job is None:
+        return {"id": id, "state": "none"}
+    return job.status()
+
+
 # ----------------------------
 # Lineage (improved implementation)
 # ----------------------------
@@ -1608,13 +2203,9 @@ def _external_lineage_id(kind: str, name: str) -> str:
 
 
 def _find_ingested_artifact_id_by_url(artifact_type: ArtifactType, url: str) -> Optional[str]:
-    wanted = (url or "").strip().lower()
-    if not wanted:
+    if not (url or "").strip():
         return None
-    for a in _artifacts_by_id.values():
-        if a.type == artifact_type and (a.url or "").strip().lower() == wanted:
-            return a.id
-    return None
+    return _artifact_index.id_by_url(artifact_type, url)
 
 
 def _find_ingested_artifact_id_by_identifier(artifact_type: ArtifactType, identifier: str) -> Optional[str]:
@@ -1624,46 +2215,10 @@ def _find_ingested_artifact_id_by_identifier(artifact_type: ArtifactType, identi
 
     Matching strategy (case-insensitive):
     - exact full identifier match against artifact name
-    - exact full identifier match against artifact URL
+    - full identifier as whole path segments of the artifact URL
     - leaf name match (after last '/')
     """
-    if not identifier:
-        return None
-    
-    identifier_lower = identifier.strip().lower()
-    identifier_leaf = identifier_lower.split("/")[-1]
-    
-    # First pass: exact matches
-    for a in _artifacts_by_id.values():
-        if a.type != artifact_type:
-            continue
-        
-        a_name_lower = (a.name or "").strip().lower()
-        a_url_lower = (a.url or "").strip().lower()
-        
-        # Exact name match (highest priority)
-        if a_name_lower == identifier_lower:
-            return a.id
-        
-        # Full identifier in URL
-        if identifier_lower in a_url_lower:
-            # Make sure it's a meaningful match (not just a substring)
-            if f"/{identifier_lower}" in a_url_lower or a_url_lower.endswith(identifier_lower):
-                return a.id
-    
-    # Second pass: leaf matches
-    for a in _artifacts_by_id.values():
-        if a.type != artifact_type:
-            continue
-        
-        a_name_lower = (a.name or "").strip().lower()
-        a_name_leaf = a_name_lower.split("/")[-1]
-        
-        # Leaf name match
-        if a_name_leaf == identifier_leaf and identifier_leaf:
-            return a.id
-    
-    return None
+    return _artifact_index.resolve_identifier(artifact_type, identifier)
 
 
 def _as_list(v: Any) -> List[Any]:
@@ -1710,7 +2265,21 @@ def _lineage_for_model_url(
     root_name: str,
     url: str,
     stored_metadata: Dict[str, Any],
+    card: Dict[str, Any],
+    lookups: Optional[Set[Tuple[str, str]]] = None,
 ) -> Tuple[List[ArtifactLineageNode], List[ArtifactLineageEdge]]:
+    """
+    Direct dependencies of a model as lineage nodes and edges.
+
+    Args:
+        card: The model's HF card data (see _lineage_card)
+        lookups: If given, receives the _lineage_key of every dependency
+            identifier resolved against the registry
+    """
+    def _note(dep_type: str, dep: str) -> None:
+        if lookups is not None:
+            lookups.add(_lineage_key(dep_type, dep))
+
     nodes: Dict[str, ArtifactLineageNode] = {}
     edges: List[ArtifactLineageEdge] = []
 
@@ -1731,6 +2300,7 @@ def _lineage_for_model_url(
         dep_id: Optional[str] = None
         dep_name = dep
         dep_identifier = dep.lower().strip()
+        _note(dep_type, dep)
 
         # Try to find as URL first
         if dep.startswith("http://") or dep.startswith("https://"):
@@ -1776,14 +2346,8 @@ def _lineage_for_model_url(
             )
         )
 
-    # 2) Try to fetch from HuggingFace card data
+    # 2) Dependencies declared in the HuggingFace card data
     try:
-        from huggingface_hub import model_info
-
-        model_id = url.split("huggingface.co/", 1)[1].strip("/")
-        meta = model_info(model_id).to_dict()
-        card = meta.get("cardData", {}) if isinstance(meta, dict) else {}
-
         base_model = card.get("base_model") or card.get("base_model_name") or card.get("base_model_id")
         datasets = card.get("datasets") or card.get("dataset") or []
 
@@ -1807,6 +2371,7 @@ def _lineage_for_model_url(
                 continue
             
             # Try to find in registry
+            _note("model", bm)
             bm_real = _find_ingested_artifact_id_by_identifier("model", bm)
             if bm_real:
                 bm_id = bm_real
@@ -1842,6 +2407,7 @@ def _lineage_for_model_url(
                 continue
             
             # Try to find in registry
+            _note("dataset", ds)
             ds_real = _find_ingested_artifact_id_by_identifier("dataset", ds)
             if ds_real:
                 ds_id = ds_real
@@ -1886,31 +2452,263 @@ def _lineage_for_model_url(
     return node_list, edge_list
 
 
+def _lineage_card(url: str) -> Dict[str, Any]:
+    """
+    Card data of a model's HF repo ({} if it is not on the Hub or can't be
+    fetched). Blocks on the Hub; call it off the event loop.
+    """
+    try:
+        return dict(get_hf_snapshot(*hf_model_ref(url)).card_data or {})
+    except Exception:
+        return {}
+
+
+def _ensure_lineage_parents(artifact_id: str, card: Dict[str, Any]) -> None:
+    """
+    Load an ingested model's direct dependencies into _lineage_graph.
+
+    Resolved parents are reused until the model is marked stale (it is
+    updated, or an artifact its identifiers may now resolve to is ingested,
+    changed or deleted), so ancestry shared by several models is only
+    resolved once. Non-model and external nodes have no parents to load.
+    """
+    if artifact_id not in _lineage_stale:
+        return
+    a = _artifacts_by_id[artifact_id]
+    lookups: Set[Tuple[str, str]] = set()
+    nodes, edges = _lineage_for_model_url(
+        root_artifact_id=a.id,
+        root_name=a.name,
+        url=a.url,
+        stored_metadata=a.metadata,
+        card=card,
+        lookups=lookups,
+    )
+    for n in nodes:
+        _lineage_nodes[n.artifact_id] = n
+    # Edges that would close a cycle (inconsistent model cards) are dropped.
+    _lineage_graph.set_parents(a.id, [(e.from_node_artifact_id, e.relationship) for e in edges])
+    _lineage_forget_lookups(artifact_id)
+    _lineage_lookups[artifact_id] = lookups
+    for key in lookups:
+        _lineage_waiting.setdefault(key, set()).add(artifact_id)
+    _lineage_stale.pop(artifact_id, None)
+
+
+def _pending_lineage(model_ids: Iterable[str]) -> List[str]:
+    """The models among model_ids whose dependencies need resolving."""
+    return [m for m in model_ids if m in _lineage_stale and m in _artifacts_by_id]
+
+
+async def _resolve_lineage(model_ids: Iterable[str]) -> None:
+    """
+    Resolve the direct dependencies of stale models: their card data is
+    fetched concurrently off the event loop, and the graph updated on it.
+    """
+    batch = [(m, _artifacts_by_id[m].url) for m in _pending_lineage(model_ids)]
+    cards = await asyncio.gather(*(asyncio.to_thread(_lineage_card, url) for _m, url in batch))
+    for (model_id, url), card in zip(batch, cards):
+        a = _artifacts_by_id.get(model_id)
+        # A model whose URL changed meanwhile stays stale for the next pass.
+        if a is not None and a.url == url:
+            _ensure_lineage_parents(model_id, card)
+
+
+async def _resolve_stale_lineage() -> None:
+    while True:
+        pending = _pending_lineage(list(_lineage_stale))
+        if not pending:
+            return
+        await _resolve_lineage(pending)
+
+
+def _schedule_lineage_resolution() -> "asyncio.Task[None]":
+    """
+    The background task resolving every stale model, started if none is
+    running on this loop. Ingests start it, so queries rarely wait for it.
+    """
+    global _lineage_resolver
+    loop = asyncio.get_running_loop()
+    if (
+        _lineage_resolver is None
+        or _lineage_resolver.done()
+        or _lineage_resolver.get_loop() is not loop
+    ):
+        _lineage_resolver = loop.create_task(_resolve_stale_lineage())
+    return _lineage_resolver
+
+
+async def _settle_ancestry(artifact_id: str, max_depth: Optional[int] = None) -> None:
+    """Resolve the stale models within max_depth hops of artifact_id's ancestry."""
+    while True:
+        pending: List[str] = []
+        _lineage_graph.ancestors(artifact_id, max_depth=max_depth, expand=pending.append)
+        pending = _pending_lineage(pending)
+        if not pending:
+            return
+        await _resolve_lineage(pending)
+
+
 @app.get("/artifact/model/{id}/lineage")
 async def model_lineage(
     id: str,
+    depth: int = Query(default=1, ge=0),
     x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
 ) -> ArtifactLineageGraph:
+    """
+    Lineage graph of a model: its dependencies up to depth hops away
+    (1 = direct dependencies only, 0 = the full ancestry).
+    """
     _require_token(x_authorization)
 
     a = _artifacts_by_id.get(id)
     if not a or a.type != "model":
         raise HTTPException(status_code=404, detail="Artifact does not exist.")
 
-    nodes, edges = _lineage_for_model_url(
-        root_artifact_id=id,
-        root_name=a.name,
-        url=a.url,
-        stored_metadata=a.metadata,
+    max_depth = depth or None
+    await _settle_ancestry(id, max_depth)
+    levels = _lineage_graph.ancestors(id, max_depth=max_depth)
+
+    nodes = [ArtifactLineageNode(artifact_id=id, name=a.name, source="config_json", metadata=None)]
+    nodes.extend(
+        _lineage_nodes.get(n) or ArtifactLineageNode(artifact_id=n, name=n, source="config_json")
+        for n in levels
     )
+    edges = [
+        ArtifactLineageEdge(from_node_artifact_id=p, to_node_artifact_id=c, relationship=rel)
+        for n, d in [(id, 0), *levels.items()]
+        if max_depth is None or d < max_depth
+        for p, c, rel in _lineage_graph.in_edges(n)
+    ]
+    nodes.sort(key=lambda n: n.artifact_id)
+    edges.sort(key=lambda e: (e.from_node_artifact_id, e.to_node_artifact_id, e.relationship))
     return ArtifactLineageGraph(nodes=nodes, edges=edges)
 
 
+@app.get("/artifact/{artifact_type}/{id}/impact")
+async def artifact_impact(
+    artifact_type: ArtifactType,
+    id: str,
+    depth: int = Query(default=0, ge=0),
+    x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
+) -> Dict[str, Any]:
+    """
+    Registered artifacts that depend on this one, directly or transitively
+    (up to depth hops; 0 = no limit), e.g. every model affected if a dataset
+    or base model is withdrawn.
+    """
+    _require_token(x_authorization)
+
+    a = _artifacts_by_id.get(id)
+    if not a or a.type != artifact_type:
+        raise HTTPException(status_code=404, detail="Artifact does not exist.")
+
+    # Models ingested or invalidated since the last resolution are resolved
+    # by the background task (off the event loop); the rest of the
+    # reverse-edge index is reused as is.
+    while _pending_lineage(list(_lineage_stale)):
+        await asyncio.shield(_schedule_lineage_resolution())
+
+    levels = _lineage_graph.descendants(id, max_depth=depth or None)
+    dependents = [
+        {"artifact_id": d, "name": dep.name, "type": dep.type, "depth": levels[d]}
+        for d, dep in ((d, _artifacts_by_id.get(d)) for d in levels)
+        if dep is not None
+    ]
+    dependents.sort(key=lambda x: (x["depth"], x["name"], x["artifact_id"]))
+    return {"artifact_id": id, "dependents": dependents}
+
+
 # ----------------------------
 # Cost
 # ----------------------------
 
 
+_BYTES_PER_MB = 1024 * 1024
+# Cost of an unregistered dependency whose size can't be looked up.
+_EXTERNAL_DEPENDENCY_MB = 25.0
+
+
+def _pseudo_size_mb(url: str) -> float:
+    # Deterministic pseudo-size in MB based on URL hash (hosts we can't size).
+    h = int(hashlib.sha256(url.encode("utf-8")).hexdigest()[:8], 16)
+    return float(50 + (h % 1000))  # 50..1049
+
+
+def _size_url(node_id: str) -> Optional[str]:
+    """
+    URL whose files make up a lineage node's download: a registered
+    artifact, or an external hf:<kind>:<name> (None if it has no URL).
+    """
+    a = _artifacts_by_id.get(node_id)
+    if a is not None:
+        return a.url
+    _prefix, kind, name = (node_id.split(":", 2) + ["", ""])[:3]
+    if name.startswith(("http://", "https://")):
+        return name
+    if kind == "dataset":
+        return f"https://huggingface.co/datasets/{name}"
+    if kind == "model":
+        return f"https://huggingface.co/{name}"
+    return None
+
+
+async def _fetch_size_mb(url: Optional[str]) -> Optional[float]:
+    """Size of url's files in MB, looked up off the event loop (None if unknown)."""
+    if url is None:
+        return None
+    size = await asyncio.to_thread(fetch_repo_size, url)
+    return size / _BYTES_PER_MB if size is not None else None
+
+
+async def _standalone_costs(node_ids: List[str]) -> Dict[str, float]:
+    """
+    Standalone cost of each node. Missing sizes are looked up concurrently
+    and memoized; a node whose size is unknown is costed at a fallback
+    estimate that is not memoized, so a later query retries the lookup.
+    """
+    costs = {n: _standalone_cost_mb[n] for n in node_ids if n in _standalone_cost_mb}
+    missing = [(n, _size_url(n)) for n in dict.fromkeys(node_ids) if n not in costs]
+    sizes = await asyncio.gather(*(_fetch_size_mb(url) for _n, url in missing))
+    for (node_id, url), size in zip(missing, sizes):
+        a = _artifacts_by_id.get(node_id)
+        if size is None or (a is None and not size):
+            costs[node_id] = _pseudo_size_mb(a.url) if a is not None else _EXTERNAL_DEPENDENCY_MB
+            continue
+        costs[node_id] = size
+        # Not memoized if the artifact changed while its size was looked up.
+        if _size_url(node_id) == url:
+            _standalone_cost_mb[node_id] = size
+    return costs
+
+
+def _total_cost(node_id: str, costs: Dict[str, float]) -> float:
+    """
+    Standalone cost of node_id plus each transitive dependency, counted once.
+
+    Args:
+        costs: Standalone costs covering node_id and its ancestors
+    """
+    closure = _lineage_graph.ancestor_closure(node_id)
+    hit = _total_cost_mb.get(node_id)
+    # A new closure object means the lineage below node_id changed.
+    if hit is not None and hit[0] is closure:
+        return hit[1]
+    total = costs[node_id] + sum(costs[n] for n in closure)
+    # Totals that include a fallback estimate are recomputed next time.
+    if node_id in _standalone_cost_mb and all(n in _standalone_cost_mb for n in closure):
+        _total_cost_mb[node_id] = (closure, total)
+    return total
+
+
+def _cost_invalidate(artifact_id: str) -> None:
+    """Forget an artifact's size and every total that includes it."""
+    _standalone_cost_mb.pop(artifact_id, None)
+    _total_cost_mb.pop(artifact_id, None)
+    for d in _lineage_graph.descendants(artifact_id):
+        _total_cost_mb.pop(d, None)
+
+
 @app.get("/artifact/{artifact_type}/{id}/cost")
 async def artifact_cost(
     artifact_type: ArtifactType,
@@ -1918,31 +2716,34 @@ async def artifact_cost(
     dependency: bool = Query(default=False),
     x_authorization: Optional[str] = Header(default=None, alias="X-Authorization"),
 ) -> Dict[str, Any]:
+    """
+    Download cost in MB. With dependency=true, total_cost adds every
+    transitive dependency once, and each dependency gets its own entry.
+    """
     _require_token(x_authorization)
 
     a = _artifacts_by_id.get(id)
     if not a or a.type != artifact_type:
         raise HTTPException(status_code=404, detail="Artifact does not exist.")
 
-    # Deterministic pseudo-size in MB based on URL hash.
-    h = int(hashlib.sha256(a.url.encode("utf-8")).hexdigest()[:8], 16)
-    standalone = float(50 + (h % 1000))  # 50..1049
-
     if not dependency:
-        return {id: {"total_cost": standalone}}
-
-    total = standalone
-    if artifact_type == "model":
-        nodes, _edges = _lineage_for_model_url(
-            root_artifact_id=id,
-            root_name=a.name,
-            url=a.url,
-            stored_metadata=a.metadata,
-        )
-        # Nodes without an explicit URL represent external deps; count them as small fixed costs.
-        total += float(max(0, len(nodes) - 1) * 25)
-
-    return {id: {"standalone_cost": standalone, "total_cost": total}}
+        costs = await _standalone_costs([id])
+        return {id: {"total_cost": round(costs[id], 2)}}
+
+    closure = _lineage_graph.ancestor_closure(id)
+    if id in _lineage_stale or not _lineage_stale.keys().isdisjoint(closure):
+        await _settle_ancestry(id)
+        closure = _lineage_graph.ancestor_closure(id)
+
+    nodes = [id, *sorted(closure)]
+    costs = await _standalone_costs(nodes)
+    out: Dict[str, Any] = {}
+    for node_id in nodes:
+        out[node_id] = {
+            "standalone_cost": round(costs[node_id], 2),
+            "total_cost": round(_total_cost(node_id, costs), 2),
+        }
+    return out
 
 
 # ----------------------------
@@ -2028,5 +2829,23 @@ async def frontend() -> str:
 </html>"""
 
 
-# AWS Lambda handler
-lambda_handler = Mangum(app, lifespan="off")
\ No newline at end of file
+# Warm start from a snapshot, or index whatever a persistent store already holds.
+if not _restore_snapshot():
+    _rebuild_indexes()
+app.router.on_shutdown.append(lambda: _save_snapshot(force=True))
+
+_mangum = Mangum(app, lifespan="off")
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    AWS Lambda handler.
+
+    Mangum runs without lifespan events, so the shutdown snapshot never
+    happens on Lambda, and the container may be frozen or retired as soon as
+    an invocation returns. A snapshot write the invocation started is
+    finished before returning.
+    """
+    response: Dict[str, Any] = _mangum(event, context)
+    _wait_for_snapshot()
+    return response
@@ -0,0 +1,87 @@
+"""
+Bounded executor for model rating.
+
+score_model() is fully synchronous (git clones, HF Hub calls), so the API
+must never call it on the event loop. RatingExecutor runs it on a dedicated
+thread pool that the loop awaits, and caps how many ratings may be running
+or waiting at once so a burst of /rate calls fails fast instead of queueing
+without bound.
+
+Configuration (read when the executor is first used):
+- RATING_POOL_SIZE: worker threads (default 4)
+- RATING_QUEUE_DEPTH: max ratings running + waiting (default 32)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_QUEUE_DEPTH = 32
+
+
+class RatingQueueFull(RuntimeError):
+    """Raised when the executor already holds RATING_QUEUE_DEPTH ratings."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+class RatingExecutor:
+    """Thread pool with an admission limit on running + queued work."""
+
+    def __init__(self, pool_size: int, queue_depth: int) -> None:
+        self.pool_size = pool_size
+        self.queue_depth = max(queue_depth, pool_size)
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="rating")
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        """
+        Schedule fn(*args) on the pool.
+
+        Raises:
+            RatingQueueFull: if queue_depth ratings are already admitted
+        """
+        if not self._slots.acquire(blocking=False):
+            raise RatingQueueFull("Rating queue is full.")
+        try:
+            fut = self._pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _f: self._slots.release())
+        return fut
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on the pool and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: Optional[RatingExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_rating_executor() -> RatingExecutor:
+    """Return the process-wide rating executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = RatingExecutor(
+                    pool_size=_env_int("RATING_POOL_SIZE", DEFAULT_POOL_SIZE),
+                    queue_depth=_env_int("RATING_QUEUE_DEPTH", DEFAULT_QUEUE_DEPTH),
+                )
+    return _executor
@@ -0,0 +1,201 @@
+"""
+Background rating jobs.
+
+One job per model artifact id. Jobs run on the bounded RatingExecutor and
+move through queued -> running -> done | failed. The finished rating is kept
+on the job so /rate can serve it without re-running score_model(), and
+concurrent callers waiting on the same artifact share one job.
+
+A job doubles as the artifact's rating cache entry: it records the key of
+the inputs it was computed from (URL, injected context, scorer version) and
+the upstream revision it saw. Submitting with a different key replaces the
+job instead of reusing it.
+
+A job whose future is cancelled before it runs (superseded, discarded, or
+the executor shutting down) is dropped from the registry, so it can never
+linger as "queued" and block later submissions.
+"""
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+)
+
+from src.api.rating_executor import get_rating_executor
+
+JobState = Literal["queued", "running", "done", "failed"]
+# Type of a finished job's result (the API's ModelRating).
+R = TypeVar("R")
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+@dataclass
+class RatingJob(Generic[R]):
+    artifact_id: str
+    state: JobState = "queued"
+    submitted_at_ms: int = field(default_factory=_now_ms)
+    started_at_ms: Optional[int] = None
+    finished_at_ms: Optional[int] = None
+    result: Optional[R] = None
+    error: Optional[str] = None
+    future: Optional[Future[R]] = None
+    key: Optional[Hashable] = None
+    revision: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "id": self.artifact_id,
+            "state": self.state,
+            "submitted_at_ms": self.submitted_at_ms,
+            "started_at_ms": self.started_at_ms,
+            "finished_at_ms": self.finished_at_ms,
+            "error": self.error,
+        }
+
+
+class RatingJobs(Generic[R]):
+    """
+    Registry of rating jobs keyed by artifact id.
+
+    Job fields are written under the registry lock, with the state last, so
+    a job seen as "done" always has its result.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, RatingJob[R]] = {}
+        self._lock = threading.Lock()
+        # Bumped whenever a job finishes or is dropped (snapshot dirtiness).
+        self.changes = 0
+
+    def get(self, artifact_id: str) -> Optional[RatingJob[R]]:
+        with self._lock:
+            return self._jobs.get(artifact_id)
+
+    def submit(
+        self,
+        artifact_id: str,
+        fn: Callable[..., R],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        revision_of: Optional[Callable[[], Optional[str]]] = None,
+        on_failed: Optional[Callable[[str], None]] = None,
+    ) -> RatingJob[R]:
+        """
+        Queue fn(*args) as the rating job for artifact_id.
+
+        An already queued/running/done job for the same artifact and key is
+        returned as-is instead of starting a second one. A failed job, or one
+        computed for a different key, is replaced.
+
+        Args:
+            key: Identity of the rating's inputs (the cache key)
+            revision_of: Called after fn succeeds; its result is recorded
+                as the upstream revision the rating was computed from
+            on_failed: Called with artifact_id if fn raises (on the worker
+                thread; hand it to the event loop if it touches shared state)
+
+        Raises:
+            RatingQueueFull: if the rating executor is saturated
+        """
+        with self._lock:
+            existing = self._jobs.get(artifact_id)
+            if (
+                existing is not None
+                and existing.state != "failed"
+                and existing.key == key
+                and not (existing.future is not None and existing.future.cancelled())
+            ):
+                return existing
+            job: RatingJob[R] = RatingJob(artifact_id=artifact_id, key=key)
+            self._jobs[artifact_id] = job
+        if existing is not None and existing.future is not None:
+            # Superseded: drop it if it hasn't started (a running one just finishes).
+            existing.future.cancel()
+
+        def run() -> R:
+            with self._lock:
+                job.started_at_ms = _now_ms()
+                job.state = "running"
+            try:
+                result = fn(*args)
+                revision = revision_of() if revision_of is not None else None
+            except Exception as e:
+                with self._lock:
+                    job.error = str(e) or type(e).__name__
+                    job.finished_at_ms = _now_ms()
+                    self.changes += 1
+                    job.state = "failed"
+                if on_failed is not None and self.get(artifact_id) is job:
+                    on_failed(artifact_id)
+                raise
+            with self._lock:
+                job.result = result
+                job.revision = revision
+                job.finished_at_ms = _now_ms()
+                self.changes += 1
+                job.state = "done"
+            return result
+
+        try:
+            job.future = get_rating_executor().submit(run)
+        except Exception:
+            self._forget(job)
+            raise
+        job.future.add_done_callback(lambda f: self._forget(job) if f.cancelled() else None)
+        return job
+
+    def _forget(self, job: RatingJob[R]) -> None:
+        """Drop job if it is still the registered job for its artifact."""
+        with self._lock:
+            if self._jobs.get(job.artifact_id) is job:
+                del self._jobs[job.artifact_id]
+                self.changes += 1
+
+    def discard(self, artifact_id: str) -> None:
+        """Forget the job (and stored rating) for artifact_id."""
+        with self._lock:
+            job = self._jobs.pop(artifact_id, None)
+            self.changes += 1
+        if job is not None and job.future is not None:
+            job.future.cancel()
+
+    def clear(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            self.changes += 1
+        for job in jobs:
+            if job.future is not None:
+                job.future.cancel()
+
+    def export(self) -> List[RatingJob[R]]:
+        """Copies of the finished jobs, without their futures (for snapshots)."""
+        with self._lock:
+            return [
+                dataclasses.replace(job, future=None)
+                for job in self._jobs.values()
+                if job.state == "done"
+            ]
+
+    def restore(self, jobs: Iterable[RatingJob[R]]) -> None:
+        """Adopt finished jobs from export(), keeping any job already present."""
+        with self._lock:
+            for job in jobs:
+                self._jobs.setdefault(job.artifact_id, job)
@@ -0,0 +1,270 @@
+"""
+Out-of-process regex evaluation for /artifact/byRegEx.
+
+Python's re engine backtracks, so a pattern like (a+)+$ can run for
+minutes on a short string and cannot be interrupted from another thread.
+RegexSandbox evaluates searches in worker processes instead: each request
+gets a wall-clock budget, and a worker that exceeds it is killed and
+replaced, so one pathological pattern costs its own request a 400 and
+nobody else anything.
+
+The searched texts live in a RegexCatalog. Each worker keeps its own copy
+and is sent only the changes since its last search, so a request ships the
+pattern and, at most, the trigram-filtered candidate ids.
+
+Configuration (read when the sandbox is first used):
+- REGEX_TIMEOUT_S: wall-clock budget per search in seconds (default 1.0)
+- REGEX_WORKERS: worker processes, i.e. searches evaluated at once (default 2)
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import queue
+import re
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TIMEOUT_S = 1.0
+DEFAULT_WORKERS = 2
+# Time a fresh worker gets to start up and load the catalog; not charged to
+# the search budget.
+STARTUP_TIMEOUT_S = 30.0
+
+# (artifact id, texts searched for that artifact)
+SearchItem = Tuple[str, Tuple[str, ...]]
+
+
+class RegexTimeout(RuntimeError):
+    """Raised when a search exceeds its wall-clock budget."""
+
+
+class RegexWorkerError(RuntimeError):
+    """Raised when a worker process dies or stops answering; it is replaced."""
+
+
+class RegexCatalog:
+    """
+    The texts searched per artifact id, plus a log of the ids changed since
+    then so workers can catch up incrementally.
+
+    Thread-safe: written from the event loop, read by searching threads.
+    """
+
+    # Logged changes kept beyond the catalog size before workers fall back
+    # to a full reload.
+    _LOG_SLACK = 1024
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._texts: Dict[str, Tuple[str, ...]] = {}
+        # Ids changed by changes _base+1 .. _seq, in order.
+        self._log: List[str] = []
+        self._base = 0
+        self._seq = 0
+
+    def put(self, artifact_id: str, texts: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._texts[artifact_id] = texts
+            self._record(artifact_id)
+
+    def remove(self, artifact_id: str) -> None:
+        with self._lock:
+            if self._texts.pop(artifact_id, None) is not None:
+                self._record(artifact_id)
+
+    def reset(self, items: Iterable[SearchItem] = ()) -> None:
+        """Replace the whole catalog; workers reload it on their next search."""
+        with self._lock:
+            self._texts = dict(items)
+            self._log.clear()
+            self._seq += 1
+            self._base = self._seq
+
+    def _record(self, artifact_id: str) -> None:
+        self._seq += 1
+        self._log.append(artifact_id)
+        excess = len(self._log) - len(self._texts) - self._LOG_SLACK
+        if excess > 0:
+            del self._log[:excess]
+            self._base += excess
+
+    def changes_since(
+        self, seq: Optional[int]
+    ) -> Tuple[int, bool, List[Tuple[str, Optional[Tuple[str, ...]]]]]:
+        """
+        What a copy synced up to seq needs to catch up.
+
+        Returns:
+            (current seq, full, items): with full, items is the whole catalog;
+            otherwise they are the changed ids with their texts (None if removed)
+        """
+        with self._lock:
+            if seq is None or seq < self._base:
+                return self._seq, True, list(self._texts.items())
+            changed = dict.fromkeys(self._log[seq - self._base:])
+            return self._seq, False, [(aid, self._texts.get(aid)) for aid in changed]
+
+
+def _serve(conn: Connection) -> None:
+    """
+    Worker loop. Messages:
+    - ("load", full, items): update the local catalog (texts None = removed)
+    - ("search", pattern, flags, ids): reply with the matching ids among ids
+      (the whole catalog if None)
+    """
+    catalog: Dict[str, Tuple[str, ...]] = {}
+    conn.send(("ready", None))
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg[0] == "load":
+            _, full, items = msg
+            if full:
+                catalog.clear()
+            for aid, texts in items:
+                if texts is None:
+                    catalog.pop(aid, None)
+                else:
+                    catalog[aid] = texts
+            conn.send(("ok", None))
+            continue
+        _, pattern, flags, ids = msg
+        try:
+            compiled = re.compile(pattern, flags)
+            pool = catalog if ids is None else ids
+            hits = [
+                aid for aid in pool
+                if any(compiled.search(t) for t in catalog.get(aid, ()))
+            ]
+            conn.send(("ok", hits))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx: Any) -> None:
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+        # Catalog this worker holds a copy of, and the change it is synced to.
+        self.catalog: Optional[RegexCatalog] = None
+        self.synced = 0
+        if not self.conn.poll(STARTUP_TIMEOUT_S):
+            self.kill()
+            raise RegexWorkerError("Regex worker failed to start.")
+        self.conn.recv()
+
+    def sync(self, catalog: RegexCatalog) -> None:
+        """Bring this worker's copy of catalog up to date."""
+        seq, full, items = catalog.changes_since(
+            self.synced if self.catalog is catalog else None
+        )
+        if not full and not items:
+            return
+        self.conn.send(("load", full, items))
+        if not self.conn.poll(STARTUP_TIMEOUT_S):
+            raise RegexWorkerError("Regex worker did not load the catalog.")
+        self.conn.recv()
+        self.catalog, self.synced = catalog, seq
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.join(timeout=5)
+        self.conn.close()
+
+
+class RegexSandbox:
+    """Pool of worker processes that run regex searches under a deadline."""
+
+    def __init__(
+        self, timeout_s: float = DEFAULT_TIMEOUT_S, workers: int = DEFAULT_WORKERS
+    ) -> None:
+        self.timeout_s = timeout_s
+        # spawn: forking a threaded server process is unsafe.
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        for _ in range(max(1, workers)):
+            self._idle.put(None)  # started lazily
+
+    def search(
+        self,
+        pattern: str,
+        flags: int,
+        catalog: RegexCatalog,
+        ids: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """
+        Ids with at least one catalog text matching pattern, among ids (the
+        whole catalog if None).
+
+        Blocks the calling thread (run it off the event loop). Catching the
+        worker up on catalog changes is not charged to the budget; sending
+        the search is.
+
+        Raises:
+            RegexTimeout: if the search exceeds timeout_s; the worker is killed
+            RegexWorkerError: if the worker died or hung; it is replaced
+            re.error: if pattern does not compile
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.proc.is_alive():
+                worker = _Worker(self._ctx)
+            worker.sync(catalog)
+            deadline = time.monotonic() + self.timeout_s
+            worker.conn.send(("search", pattern, flags, None if ids is None else list(ids)))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not worker.conn.poll(remaining):
+                worker.kill()
+                worker = None
+                raise RegexTimeout(f"Regex search exceeded {self.timeout_s:g}s.")
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError, RegexWorkerError) as e:
+            if worker is not None:
+                worker.kill()
+            worker = None
+            if isinstance(e, RegexWorkerError):
+                raise
+            raise RegexWorkerError("Regex worker died.") from e
+        finally:
+            self._idle.put(worker)
+        if status != "ok":
+            raise re.error(payload)
+        return list(payload)
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.kill()
+
+
+_sandbox: Optional[RegexSandbox] = None
+_sandbox_lock = threading.Lock()
+
+
+def get_regex_sandbox() -> RegexSandbox:
+    """Return the process-wide regex sandbox, creating it on first use."""
+    global _sandbox
+    if _sandbox is None:
+        with _sandbox_lock:
+            if _sandbox is None:
+                try:
+                    timeout_s = float(os.environ.get("REGEX_TIMEOUT_S", DEFAULT_TIMEOUT_S))
+                except ValueError:
+                    timeout_s = DEFAULT_TIMEOUT_S
+                try:
+                    workers = int(os.environ.get("REGEX_WORKERS", DEFAULT_WORKERS))
+                except ValueError:
+                    workers = DEFAULT_WORKERS
+                _sandbox = RegexSandbox(timeout_s=timeout_s, workers=workers)
+    return _sandbox
@@ -0,0 +1,141 @@
+"""
+Binary snapshots of the API's in-memory registry state.
+
+A snapshot file is a fixed header (magic bytes and format version) followed
+by one pickle (protocol 5) of the state: stored artifacts, the derived
+indexes (ArtifactIndex minus the maps it rebuilds on demand, the lineage
+graph with its memoized closures), finished ratings and cost memos.
+Artifacts are stored as plain tuples, which load several times faster than
+dataclass instances. Restoring maps the file and unpickles it in one pass,
+so a fresh process (a new Lambda container, a restarted server) serves the
+catalog without re-ingesting or re-indexing.
+
+Snapshots are written atomically (temp file + rename). They are pickles:
+only load files this service wrote. Periodic snapshots are pickled and
+written on a background thread from a detached() copy of the state, so
+requests never wait on the pickle or the disk.
+
+Configuration:
+- REGISTRY_SNAPSHOT_PATH: snapshot file; unset disables snapshots
+- REGISTRY_SNAPSHOT_INTERVAL_S: minimum seconds between periodic writes
+  while the state keeps changing (default 60)
+"""
+from __future__ import annotations
+
+import gc
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from typing import Any, Dict, Optional
+
+MAGIC = b"REGSNAP\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sI")
+
+DEFAULT_INTERVAL_S = 60.0
+
+
+def snapshot_path() -> Optional[str]:
+    """Configured snapshot file, or None if snapshots are disabled."""
+    return os.environ.get("REGISTRY_SNAPSHOT_PATH") or None
+
+
+def snapshot_interval_s() -> float:
+    try:
+        return float(os.environ.get("REGISTRY_SNAPSHOT_INTERVAL_S", DEFAULT_INTERVAL_S))
+    except ValueError:
+        return DEFAULT_INTERVAL_S
+
+
+def write_snapshot(path: str, state: Dict[str, Any]) -> int:
+    """
+    Atomically write state to path.
+
+    Returns:
+        Size of the snapshot in bytes
+    """
+    payload = pickle.dumps(state, protocol=5)
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            fh.write(payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return _HEADER.size + len(payload)
+
+
+def _copy_container(value: Any) -> Any:
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+def detached(value: Any) -> Any:
+    """
+    Copy of a registry structure that later in-place changes don't reach.
+
+    Dicts, lists and sets are copied two levels deep (the registry's maps of
+    maps, sets and lists); an object is copied attribute by attribute from
+    its __getstate__(). Anything nested deeper must be immutable (strings,
+    tuples, frozensets). Much cheaper than pickling, so it can be done on the
+    event loop while the pickling happens elsewhere.
+    """
+    if isinstance(value, dict):
+        return {k: _copy_container(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_container(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        copy = object.__new__(type(value))
+        state = value.__getstate__() or {}
+        copy.__dict__.update({k: detached(v) for k, v in state.items()})
+        return copy
+    return value
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a snapshot written by write_snapshot().
+
+    Returns:
+        The state dict, or None if the file is missing, empty, from another
+        format version or unreadable
+    """
+    try:
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < _HEADER.size:
+                return None
+            magic, version = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            # Views must be released before the map is closed. The load
+            # allocates millions of objects and none of them are garbage, so
+            # the cyclic collector would only slow it down.
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with memoryview(mm) as view, view[_HEADER.size:] as body:
+                    state = pickle.loads(body)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return state if isinstance(state, dict) else None
@@ -0,0 +1,282 @@
+"""
+Artifact storage backends for the API.
+
+The API reads artifacts from an in-process dict (ArtifactStore.by_id) and
+writes them through the store. Two backends:
+
+- MemoryArtifactStore: the dict is the store; state lives as long as the
+  process (the default, and what the tests use).
+- SQLiteArtifactStore: an embedded SQLite database in WAL mode, so several
+  uvicorn workers (or Lambda containers sharing a volume) see one catalog
+  and a restart keeps it. by_id is a full read cache of the table. Every
+  write is also appended to a change log; sync() applies other processes'
+  changes to the cache, and is a single PRAGMA when nothing changed.
+  (type, url) is unique in the table, so two processes can't both ingest
+  the same artifact; the loser's put() raises DuplicateArtifact.
+
+Configuration (read by open_artifact_store()):
+- REGISTRY_STORE: "memory" (default) or "sqlite"
+- REGISTRY_DB_PATH: SQLite file (default: <tmp>/registry-artifacts.sqlite3)
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Literal, Optional, Protocol, Tuple, cast
+
+# Change log rows kept for lagging readers; older ones are pruned and a
+# reader that missed them reloads the whole table.
+_CHANGE_LOG_KEEP = 10_000
+# Change log marker written by clear().
+_CLEARED = "*"
+
+ArtifactType = Literal["model", "dataset", "code"]
+
+
+class DuplicateArtifact(Exception):
+    """Raised by put() when another artifact already has the same (type, url)."""
+
+
+@dataclass(frozen=True)
+class StoredArtifact:
+    id: str
+    type: ArtifactType
+    name: str
+    url: str
+    created_at_ms: int
+    metadata: Dict[str, Any]
+
+
+# (before, after) of one artifact changed by another process; None = absent.
+Change = Tuple[Optional[StoredArtifact], Optional[StoredArtifact]]
+
+
+class ArtifactStore(Protocol):
+    by_id: Dict[str, StoredArtifact]
+
+    def put(self, a: StoredArtifact) -> None: ...
+
+    def put_many(self, items: Iterable[StoredArtifact]) -> None: ...
+
+    def remove(self, artifact_id: str) -> Optional[StoredArtifact]: ...
+
+    def clear(self) -> None: ...
+
+    def sync(self) -> Optional[List[Change]]: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryArtifactStore:
+    """Process-local store: by_id is the only copy."""
+
+    def __init__(self) -> None:
+        self.by_id: Dict[str, StoredArtifact] = {}
+
+    def put(self, a: StoredArtifact) -> None:
+        self.by_id[a.id] = a
+
+    def put_many(self, items: Iterable[StoredArtifact]) -> None:
+        for a in items:
+            self.by_id[a.id] = a
+
+    def remove(self, artifact_id: str) -> Optional[StoredArtifact]:
+        return self.by_id.pop(artifact_id, None)
+
+    def clear(self) -> None:
+        self.by_id.clear()
+
+    def sync(self) -> Optional[List[Change]]:
+        """Nothing else writes this store."""
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS artifacts ("
+    " id TEXT PRIMARY KEY, type TEXT NOT NULL, name TEXT NOT NULL, url TEXT NOT NULL,"
+    " created_at_ms INTEGER NOT NULL, metadata TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS artifacts_name ON artifacts (name)",
+    "CREATE INDEX IF NOT EXISTS artifacts_type ON artifacts (type)",
+    # Replaces the non-unique artifacts_type_url index of earlier databases.
+    "DROP INDEX IF EXISTS artifacts_type_url",
+    "CREATE UNIQUE INDEX IF NOT EXISTS artifacts_type_url_unique ON artifacts (type, url)",
+    "CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created_at_ms)",
+    "CREATE TABLE IF NOT EXISTS changes ("
+    " seq INTEGER PRIMARY KEY AUTOINCREMENT, artifact_id TEXT NOT NULL)",
+)
+
+_COLUMNS = "id, type, name, url, created_at_ms, metadata"
+
+
+def _row(a: StoredArtifact) -> Tuple[Any, ...]:
+    return (a.id, a.type, a.name, a.url, a.created_at_ms, json.dumps(a.metadata, default=str))
+
+
+def _artifact(row: Tuple[Any, ...]) -> StoredArtifact:
+    return StoredArtifact(
+        id=row[0],
+        type=cast(ArtifactType, row[1]),
+        name=row[2],
+        url=row[3],
+        created_at_ms=int(row[4]),
+        metadata=json.loads(row[5]),
+    )
+
+
+class SQLiteArtifactStore:
+    """SQLite (WAL) store with a full in-memory read cache."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._db = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._lock = threading.Lock()
+        self.by_id: Dict[str, StoredArtifact] = {}
+        self._cursor = 0
+        self._data_version = -1
+        with self._lock:
+            self._reload()
+
+    def _reload(self) -> None:
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        self._cursor = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM artifacts ORDER BY created_at_ms, rowid"
+        ).fetchall()
+        self.by_id.clear()
+        for row in rows:
+            a = _artifact(row)
+            self.by_id[a.id] = a
+
+    def _write(self, puts: List[StoredArtifact], removes: List[str]) -> None:
+        """Apply puts and removes in one transaction, logging each id."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            if puts:
+                # Upsert by id; a clash on (type, url) raises IntegrityError
+                # rather than replacing the other artifact's row.
+                self._db.executemany(
+                    f"INSERT INTO artifacts ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET type = excluded.type,"
+                    " name = excluded.name, url = excluded.url,"
+                    " created_at_ms = excluded.created_at_ms, metadata = excluded.metadata",
+                    [_row(a) for a in puts],
+                )
+            if removes:
+                self._db.executemany("DELETE FROM artifacts WHERE id = ?", [(i,) for i in removes])
+            changed = [a.id for a in puts] + removes
+            self._db.executemany(
+                "INSERT INTO changes (artifact_id) VALUES (?)", [(i,) for i in changed]
+            )
+            last = self._db.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+            if last % 1000 < len(changed):
+                self._db.execute("DELETE FROM changes WHERE seq <= ?", (last - _CHANGE_LOG_KEEP,))
+            self._db.execute("COMMIT")
+        except sqlite3.IntegrityError as e:
+            self._db.execute("ROLLBACK")
+            raise DuplicateArtifact(str(e)) from e
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def put(self, a: StoredArtifact) -> None:
+        self.put_many([a])
+
+    def put_many(self, items: Iterable[StoredArtifact]) -> None:
+        """Write a batch in one transaction."""
+        batch = list(items)
+        if not batch:
+            return
+        with self._lock:
+            self._write(batch, [])
+            for a in batch:
+                self.by_id[a.id] = a
+
+    def remove(self, artifact_id: str) -> Optional[StoredArtifact]:
+        with self._lock:
+            self._write([], [artifact_id])
+            return self.by_id.pop(artifact_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM artifacts")
+                self._db.execute("INSERT INTO changes (artifact_id) VALUES (?)", (_CLEARED,))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.by_id.clear()
+
+    def sync(self) -> Optional[List[Change]]:
+        """
+        Bring by_id up to date with writes from other processes.
+
+        Returns:
+            The (before, after) pairs that changed, or None if the cache was
+            reloaded wholesale (after a clear() elsewhere or a pruned log)
+        """
+        with self._lock:
+            version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._data_version = version
+            oldest = self._db.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+            rows = self._db.execute(
+                "SELECT seq, artifact_id FROM changes WHERE seq > ? ORDER BY seq", (self._cursor,)
+            ).fetchall()
+            if not rows:
+                return []
+            if oldest is not None and oldest > self._cursor + 1:
+                self._reload()
+                return None
+            if any(artifact_id == _CLEARED for _seq, artifact_id in rows):
+                self._reload()
+                return None
+            self._cursor = rows[-1][0]
+            # Our own writes are logged too; they compare equal and are skipped.
+            out: List[Change] = []
+            for artifact_id in dict.fromkeys(artifact_id for _seq, artifact_id in rows):
+                row = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM artifacts WHERE id = ?", (artifact_id,)
+                ).fetchone()
+                before = self.by_id.get(artifact_id)
+                after = _artifact(row) if row is not None else None
+                if before == after:
+                    continue
+                if after is None:
+                    del self.by_id[artifact_id]
+                else:
+                    self.by_id[artifact_id] = after
+                out.append((before, after))
+            return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_artifact_store() -> ArtifactStore:
+    """Create the store selected by REGISTRY_STORE / REGISTRY_DB_PATH."""
+    if os.environ.get("REGISTRY_STORE", "memory").strip().lower() == "sqlite":
+        path = os.environ.get("REGISTRY_DB_PATH") or os.path.join(
+            tempfile.gettempdir(), "registry-artifacts.sqlite3"
+        )
+        return SQLiteArtifactStore(path)
+    return MemoryArtifactStore()
@@ -2,14 +2,15 @@ from __future__ import annotations
 import logging
 import os
 import time
-import tempfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 from huggingface_hub import hf_hub_download, model_info
 from git import Repo, GitCommandError
 
+from ..registry.clone_cache import get_clone_cache, head_files
+
 LOG = logging.getLogger(__name__)
 
 
@@ -154,44 +155,44 @@ def code_quality(ctx: Dict[str, Any]) -> Tuple[float, int]:
 
 
 def _analyze_repo_from_url(url: str, ctx: Dict[str, Any]) -> None:
-    # If it's a GitHub repo, shallow clone and inspect
+    # If it's a GitHub repo, inspect its cached bare mirror (no checkout)
     try:
-        tmpd = tempfile.mkdtemp(prefix="modelrepo_")
-        LOG.debug("Cloning %s into %s", url, tmpd)
-        Repo.clone_from(url, tmpd, depth=20)
-        repo = Repo(tmpd)
-        # contributors
-        contributors = set()
-        for commit in repo.iter_commits(max_count=200):
-            try:
-                contributors.add(commit.author.email)
-            except Exception:
-                continue
-        ctx["git_contributors"] = len(contributors)
-        # detect weight files
-        total = 0
-        has_tests = False
-        has_ci = False
-        for root, _, files in os.walk(tmpd):
-            for f in files:
-                if f.endswith(('.bin', '.pt', '.safetensors', '.h5', '.ckpt')):
-                    try:
-                        total += os.path.getsize(os.path.join(root, f))
-                    except Exception:
-                        continue
-                if f.startswith('test_') or f.endswith('_test.py'):
-                    has_tests = True
-                if f.endswith('.yml') and ('.github' in root or 'workflows' in root):
-                    has_ci = True
-        ctx["weights_total_bytes"] = total
-        ctx["has_tests"] = has_tests
-        ctx["has_ci"] = has_ci
+        with get_clone_cache().reading(url) as mirror_path:
+            _inspect_mirror(mirror_path, ctx)
     except GitCommandError as e:
         LOG.info("Git clone failed for %s: %s", url, e)
     except Exception as e:
         LOG.debug("Repo analysis error for %s: %s", url, e)
 
 
+def _inspect_mirror(mirror_path: str, ctx: Dict[str, Any]) -> None:
+    repo = Repo(mirror_path)
+    # contributors
+    contributors = set()
+    for commit in repo.iter_commits(max_count=200):
+        try:
+            contributors.add(commit.author.email)
+        except Exception:
+            continue
+    ctx["git_contributors"] = len(contributors)
+    # detect weight files; a size of None (blob left out of the partial
+    # clone) makes the total unknown
+    total: Optional[int] = 0
+    has_tests = False
+    has_ci = False
+    for path, size in head_files(mirror_path):
+        root, f = os.path.split(path)
+        if f.endswith(('.bin', '.pt', '.safetensors', '.h5', '.ckpt')) and total is not None:
+            total = None if size is None else total + size
+        if f.startswith('test_') or f.endswith('_test.py'):
+            has_tests = True
+        if f.endswith('.yml') and ('.github' in root or 'workflows' in root):
+            has_ci = True
+    ctx["weights_total_bytes"] = total
+    ctx["has_tests"] = has_tests
+    ctx["has_ci"] = has_ci
+
+
 def compute_all_metrics(ctx: Dict[str, Any]) -> Dict[str, Any]:
     # Pre-populate HF metadata when available
     raw = ctx.get("url")
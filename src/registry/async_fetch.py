@@ -0,0 +1,137 @@
+"""
+Asyncio fetch layer for repository metadata.
+
+Async variants of url_parser.fetch_repo_info() and scorer.enrich_context().
+The upstream clients (huggingface_hub, GitPython) are blocking, so each call
+runs in a worker thread; a per-host semaphore bounds how many calls to the
+same upstream are in flight at once, so one event loop can overlap hundreds
+of fetches without flooding a single host. The CLI scores models through
+this layer (scorer.async_score_model) when $SCORER_WORKERS > 1.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import weakref
+from typing import Any, Callable, Dict, TypeVar
+from urllib.parse import urlparse
+
+from .logging_setup import get_logger
+from .url_parser import fetch_repo_info
+
+LOG = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Default number of concurrent upstream calls per host.
+# Override with $FETCH_HOST_CONCURRENCY.
+DEFAULT_HOST_CONCURRENCY = 8
+
+# Semaphores are bound to the event loop they are first used on, so keep one
+# set per running loop.
+_semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+def _host_limit() -> int:
+    try:
+        return max(1, int(os.environ.get("FETCH_HOST_CONCURRENCY", DEFAULT_HOST_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_HOST_CONCURRENCY
+
+
+def _host_of(url: str) -> str:
+    """Return the lowercased host for url (scheme optional)."""
+    s = (url or "").strip()
+    if "://" not in s:
+        s = "https://" + s
+    return (urlparse(s).hostname or "").lower()
+
+
+def host_semaphore(host: str) -> asyncio.Semaphore:
+    """
+    Get the concurrency semaphore for an upstream host on the running loop.
+
+    Args:
+        host: Hostname, e.g. "huggingface.co"
+
+    Returns:
+        asyncio.Semaphore limiting in-flight calls to that host
+    """
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    sem = per_loop.get(host)
+    if sem is None:
+        sem = asyncio.Semaphore(_host_limit())
+        per_loop[host] = sem
+    return sem
+
+
+async def run_on_host(host: str, fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking upstream call in a thread, bounded by the host's semaphore.
+
+    Args:
+        host: Upstream host the call talks to
+        fn: Blocking callable
+        *args: Positional arguments for fn
+
+    Returns:
+        Whatever fn returns
+    """
+    async with host_semaphore(host):
+        return await asyncio.to_thread(fn, *args)
+
+
+async def async_fetch_repo_info(url: str) -> Dict[str, Any]:
+    """
+    Async variant of fetch_repo_info().
+
+    Args:
+        url: The repository URL
+
+    Returns:
+        Dictionary with repository metadata. Never raises.
+    """
+    return await run_on_host(_host_of(url), fetch_repo_info, url)
+
+
+async def async_enrich_context(repo_info: Dict[str, Any]) -> None:
+    """
+    Async variant of enrich_context().
+
+    The dataset, code-repo and README lookups are independent, so they run
+    concurrently (each under its own host's semaphore). Each step writes
+    disjoint keys of repo_info.
+
+    Never raises: logs and returns on failure.
+    """
+    # Imported here: scorer imports this module lazily for async_score_model.
+    from . import scorer
+
+    async def dataset_step() -> None:
+        link = str(repo_info.get("dataset_link") or "")
+        if scorer._hf_dataset_repo_id(link):
+            await run_on_host(_host_of(link), scorer._enrich_dataset_downloads, repo_info)
+
+    async def code_step() -> None:
+        try:
+            code_link = str(repo_info.get("code_link") or "")
+            if "github.com" in code_link.lower():
+                code_info = await async_fetch_repo_info(code_link)
+                scorer._apply_code_signals(repo_info, code_info)
+        except Exception as e:
+            LOG.debug("Context enrich: code repo analysis failed: %s", e)
+
+    async def readme_step() -> None:
+        url = str(repo_info.get("url") or "")
+        if "hf_readme" in repo_info and scorer._hf_model_repo_id(url):
+            await run_on_host(_host_of(url), scorer._enrich_hf_readme, repo_info)
+
+    results = await asyncio.gather(
+        dataset_step(), code_step(), readme_step(), return_exceptions=True
+    )
+    for r in results:
+        if isinstance(r, BaseException):
+            LOG.debug("Context enrich (async) failed: %s", r)
@@ -47,6 +47,12 @@ def main(argv: List[str] | None = None) -> int:
         "url_file",
         help="Absolute path to newline-delimited URLs file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of models to score concurrently (default: $SCORER_WORKERS or 1)"
+    )
     args = parser.parse_args(argv)
     
     # Validate input file
@@ -61,7 +67,7 @@ def main(argv: List[str] | None = None) -> int:
         urls = read_url_file(args.url_file)
         
         # Process all URLs and get ModelScore objects for MODEL URLs
-        model_scores = process_url_list(urls)
+        model_scores = process_url_list(urls, max_workers=args.workers)
         
         # Output NDJSON for each model
         for model_score in model_scores:
@@ -0,0 +1,414 @@
+"""
+Persistent on-disk cache of bare git mirrors.
+
+Instead of a fresh `git clone` into a new temp dir for every analysis, each
+canonical repository URL maps to one bare mirror under the cache root. The
+first use clones it; later uses run an incremental `git fetch` (at most once
+per refresh interval). Least-recently-used mirrors are evicted once the
+cache exceeds its size budget. Each mirror records its own disk size after a
+clone or fetch, so checking the budget doesn't walk every mirror.
+
+Mirrors are partial clones (`--filter=blob:limit=N`): commits, trees and
+small blobs (source files, READMEs, git-lfs pointers) are downloaded, large
+blobs such as model weights are not. Repository inspection (head_files) works
+from tree and blob metadata only and never triggers a lazy blob fetch, so the
+size of a filtered-out blob that isn't a git-lfs pointer is unknown (None).
+
+Locking: a per-repo threading lock serializes work inside one process, and
+an fcntl lock file does the same across processes (uvicorn workers, CLI runs
+sharing the cache directory). Readers hold a shared lock on a mirror for as
+long as they use it (see reading()); eviction skips mirrors in use instead
+of deleting them under a reader.
+
+GitPython is imported on first use, so importing this module (and the API
+that depends on it) stays cheap.
+
+Configuration:
+- REGISTRY_CLONE_CACHE_DIR: cache root (default: <tmp>/registry-clone-cache)
+- REGISTRY_CLONE_CACHE_MAX_BYTES: disk budget in bytes (default 2 GiB)
+- REGISTRY_CLONE_CACHE_REFRESH_S: min seconds between fetches of one repo (default 60)
+- REGISTRY_CLONE_BLOB_LIMIT: largest blob (bytes) downloaded into a mirror;
+  0 disables the filter and clones everything (default 256 KiB)
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .logging_setup import get_logger
+from .singleflight import canonical_resource
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+LOG = get_logger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_REFRESH_S = 60.0
+DEFAULT_BLOB_LIMIT = 256 * 1024
+CLONE_DEPTH = 20
+
+# Marker file inside each mirror; its mtime records the last use (for LRU)
+# and its content the last successful fetch time.
+_STAMP = "registry-last-used"
+# Marker file inside each mirror holding its size in bytes, as of the last
+# clone or fetch.
+_SIZE = "registry-size"
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                continue
+    return total
+
+
+class CloneCache:
+    """Bare-mirror cache keyed by canonical repository URL."""
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh_s: float = DEFAULT_REFRESH_S,
+        blob_limit: int = DEFAULT_BLOB_LIMIT,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.refresh_s = refresh_s
+        self.blob_limit = blob_limit
+        os.makedirs(root, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # mirror path -> readers inside reading() in this process
+        self._readers: Dict[str, int] = {}
+
+    def path_for(self, url: str) -> str:
+        """Directory of the mirror for url (may not exist yet)."""
+        digest = hashlib.sha1(canonical_resource(url).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.root, f"{digest}.git")
+
+    @contextlib.contextmanager
+    def _locked(self, path: str) -> Iterator[None]:
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(path + ".lock", "a+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def _shared(self, path: str) -> Iterator[None]:
+        """Mark path as in use (for this process and, via flock, for others)."""
+        with self._locks_guard:
+            self._readers[path] = self._readers.get(path, 0) + 1
+        try:
+            if fcntl is None:
+                yield
+                return
+            with open(path + ".lock", "a+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+        finally:
+            with self._locks_guard:
+                self._readers[path] -= 1
+                if not self._readers[path]:
+                    del self._readers[path]
+
+    @contextlib.contextmanager
+    def _try_exclusive(self, path: str) -> Iterator[bool]:
+        """Lock path exclusively without waiting; yields False if it is busy or in use."""
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+            in_use = self._readers.get(path, 0) > 0
+        if in_use or not lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open(path + ".lock", "a+") as fh:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+        finally:
+            lock.release()
+
+    @contextlib.contextmanager
+    def reading(self, url: str) -> Iterator[str]:
+        """
+        mirror(url), then keep the mirror from being evicted until the block exits.
+
+        Use this (not mirror()) around head_files()/read_head_file() calls.
+
+        Yields:
+            Path of the bare mirror
+        """
+        while True:
+            path = self.mirror(url)
+            with self._shared(path):
+                # Another request may have evicted it between mirror() and here.
+                if os.path.isdir(path):
+                    yield path
+                    return
+
+    def mirror(self, url: str) -> str:
+        """
+        Return the path of an up-to-date bare mirror of url.
+
+        Clones on first use, otherwise fetches new commits if the last fetch
+        is older than the refresh interval. The mirror may be evicted once
+        this returns; readers should use reading() instead.
+
+        Raises:
+            git.GitCommandError: if the clone or fetch fails and no usable
+                mirror exists
+        """
+        path = self.path_for(url)
+        with self._locked(path):
+            if os.path.isdir(path):
+                self._refresh(url, path)
+            else:
+                self._clone(url, path)
+            self._touch(path, fetched=None)
+        self._evict(keep=path)
+        return path
+
+    def _clone(self, url: str, path: str) -> None:
+        from git import Repo
+
+        tmp = tempfile.mkdtemp(prefix=".clone-", dir=self.root)
+        try:
+            LOG.debug("Mirroring %s into %s", url, path)
+            options = [f"--filter=blob:limit={self.blob_limit}"] if self.blob_limit > 0 else []
+            Repo.clone_from(url, tmp, mirror=True, depth=CLONE_DEPTH, multi_options=options)
+            os.replace(tmp, path)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self._touch(path, fetched=time.time())
+        self._record_size(path)
+
+    def _refresh(self, url: str, path: str) -> None:
+        last = self._last_fetch(path)
+        if time.time() - last < self.refresh_s:
+            return
+        try:
+            LOG.debug("Fetching updates for %s", url)
+            from git import Repo
+
+            Repo(path).git.fetch("--prune", "origin")
+            self._touch(path, fetched=time.time())
+            self._record_size(path)
+        except Exception as e:
+            # A stale mirror is still better than no analysis at all.
+            LOG.info("Mirror fetch failed for %s, using cached copy: %s", url, e)
+
+    @staticmethod
+    def _last_fetch(path: str) -> float:
+        try:
+            with open(os.path.join(path, _STAMP), "r", encoding="utf-8") as fh:
+                return float(fh.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def _touch(self, path: str, fetched: Optional[float]) -> None:
+        stamp = os.path.join(path, _STAMP)
+        if fetched is not None:
+            with open(stamp, "w", encoding="utf-8") as fh:
+                fh.write(repr(fetched))
+        else:
+            with contextlib.suppress(OSError):
+                os.utime(stamp)
+
+    @staticmethod
+    def _record_size(path: str) -> int:
+        size = _dir_size(path)
+        with contextlib.suppress(OSError):
+            with open(os.path.join(path, _SIZE), "w", encoding="utf-8") as fh:
+                fh.write(str(size))
+        return size
+
+    def _size_of(self, path: str) -> int:
+        """Recorded size of a mirror; measured (and recorded) if it has none yet."""
+        try:
+            with open(os.path.join(path, _SIZE), "r", encoding="utf-8") as fh:
+                return int(fh.read().strip())
+        except (OSError, ValueError):
+            return self._record_size(path)
+
+    def _entries(self) -> List[Tuple[float, str]]:
+        out: List[Tuple[float, str]] = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not name.endswith(".git") or not os.path.isdir(path):
+                continue
+            try:
+                used = os.path.getmtime(os.path.join(path, _STAMP))
+            except OSError:
+                used = 0.0
+            out.append((used, path))
+        return sorted(out)
+
+    def total_bytes(self) -> int:
+        return sum(self._size_of(p) for _, p in self._entries())
+
+    def _evict(self, keep: str) -> None:
+        """
+        Delete least-recently-used mirrors until the cache fits its budget.
+
+        Mirrors being read or updated are skipped, so the cache can stay over
+        budget until they are released.
+        """
+        entries = self._entries()
+        sizes = {p: self._size_of(p) for _, p in entries}
+        total = sum(sizes.values())
+        for _, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            with self._try_exclusive(path) as acquired:
+                if not acquired:
+                    LOG.debug("Not evicting mirror %s: in use", path)
+                    continue
+                LOG.debug("Evicting mirror %s (%d bytes)", path, sizes[path])
+                shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+
+
+_LFS_POINTER_PREFIX = b"version https://git-lfs.github.com/spec/"
+_LFS_POINTER_MAX = 1024
+
+
+def _lfs_pointer_size(data: bytes) -> Optional[int]:
+    """Real file size recorded in a git-lfs pointer blob, or None."""
+    if not data.startswith(_LFS_POINTER_PREFIX):
+        return None
+    for line in data.decode("utf-8", errors="ignore").splitlines():
+        if line.startswith("size "):
+            try:
+                return int(line[5:].strip())
+            except ValueError:
+                return None
+    return None
+
+
+def head_files(path: str) -> List[Tuple[str, Optional[int]]]:
+    """
+    List (repo-relative path, size in bytes) for every file at HEAD of a bare repo.
+
+    Sizes come from metadata only: the object header for blobs present
+    locally and the recorded size for git-lfs pointers. Blobs left out by
+    the partial-clone filter are never fetched, so their size is None
+    (unknown; all we know is that it exceeds the filter limit).
+    """
+    from git import Repo
+
+    repo = Repo(path)
+
+    entries: List[Tuple[str, str]] = []
+    for record in repo.git.ls_tree("-r", "-z", "HEAD").split("\0"):
+        if not record:
+            continue
+        meta, name = record.split("\t", 1)
+        _mode, kind, oid = meta.split()
+        if kind == "blob":
+            entries.append((name, oid))
+
+    # `--missing=print` reports promisor (filtered-out) objects as "?<oid>"
+    # instead of fetching them.
+    listing = repo.git.rev_list("--objects", "--missing=print", "--no-walk", "HEAD")
+    missing = {line[1:].strip() for line in listing.splitlines() if line.startswith("?")}
+
+    out: List[Tuple[str, Optional[int]]] = []
+    for name, oid in entries:
+        if oid in missing:
+            out.append((name, None))
+            continue
+        binsha = bytes.fromhex(oid)
+        size = int(repo.odb.info(binsha).size)
+        if size <= _LFS_POINTER_MAX:
+            lfs_size = _lfs_pointer_size(repo.odb.stream(binsha).read())
+            if lfs_size is not None:
+                size = lfs_size
+        out.append((name, size))
+    return out
+
+
+def read_head_file(path: str, filename: str) -> Optional[str]:
+    """Return the text of filename at HEAD of a bare repo, or None."""
+    from git import Repo
+
+    repo = Repo(path)
+    try:
+        blob = repo.head.commit.tree / filename
+        data: bytes = blob.data_stream.read()
+        return data.decode("utf-8", errors="ignore")
+    except (KeyError, ValueError):
+        return None
+
+
+_cache: Optional[CloneCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_clone_cache() -> CloneCache:
+    """Return the process-wide clone cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                root = os.environ.get("REGISTRY_CLONE_CACHE_DIR") or os.path.join(
+                    tempfile.gettempdir(), "registry-clone-cache"
+                )
+                try:
+                    max_bytes = int(
+                        os.environ.get("REGISTRY_CLONE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+                    )
+                except ValueError:
+                    max_bytes = DEFAULT_MAX_BYTES
+                try:
+                    refresh_s = float(
+                        os.environ.get("REGISTRY_CLONE_CACHE_REFRESH_S", DEFAULT_REFRESH_S)
+                    )
+                except ValueError:
+                    refresh_s = DEFAULT_REFRESH_S
+                try:
+                    blob_limit = int(
+                        os.environ.get("REGISTRY_CLONE_BLOB_LIMIT", DEFAULT_BLOB_LIMIT)
+                    )
+                except ValueError:
+                    blob_limit = DEFAULT_BLOB_LIMIT
+                _cache = CloneCache(
+                    root, max_bytes=max_bytes, refresh_s=refresh_s, blob_limit=blob_limit
+                )
+    return _cache
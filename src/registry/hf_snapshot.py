@@ -0,0 +1,250 @@
+"""
+Shared snapshot of a Hugging Face model repo's metadata.
+
+Scoring (fetch_repo_info, README enrichment), lineage and cost all need the
+same Hub metadata for a model. HFRepoSnapshot holds it: model info, card
+data, the file list with sizes and (fetched on first use) the README. One
+model_info call with files_metadata=True fills everything but the README,
+and snapshots are shared through a short-lived cache plus single-flight, so
+one rating costs one Hub metadata round-trip instead of three or four. The
+model info and README behind a snapshot also go through the metadata cache
+(kinds "hf_model_info" and "hf_readme"), so other processes reuse them. A
+README is cached by commit, so one whose commit is unknown is not cached.
+
+hf_dataset_size_bytes() gives the same file-size view of a dataset repo
+(metadata cache kind "hf_dataset_size").
+
+Configuration:
+- HF_SNAPSHOT_TTL_S: seconds a snapshot is reused before refetching (default 300)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .logging_setup import get_logger
+from .metadata_cache import get_metadata_cache
+from .singleflight import shared_fetch
+
+LOG = get_logger(__name__)
+
+DEFAULT_TTL_S = 300.0
+
+# File extensions counted as model weights (HF siblings and git trees).
+WEIGHT_EXTENSIONS = ('.bin', '.pt', '.safetensors', '.h5', '.ckpt', '.pth')
+
+_UNSET = object()
+
+
+def _sibling_size(sibling: Any) -> Optional[int]:
+    """Size of one repo file from Hub metadata (LFS size for LFS files)."""
+    size = getattr(sibling, "size", None)
+    if size is None:
+        lfs = getattr(sibling, "lfs", None)
+        if isinstance(lfs, dict):
+            size = lfs.get("size")
+        elif lfs is not None:
+            size = getattr(lfs, "size", None)
+    return int(size) if size is not None else None
+
+
+def _known_total(sizes: Iterable[Optional[int]]) -> Optional[int]:
+    """Sum of file sizes; None if any size is unknown or nothing has a size."""
+    total = 0
+    for size in sizes:
+        if size is None:
+            return None
+        total += size
+    return total if total > 0 else None
+
+
+def _card_dict(card_data: Any) -> Dict[str, Any]:
+    if card_data is None:
+        return {}
+    if isinstance(card_data, dict):
+        return dict(card_data)
+    try:
+        return dict(card_data.to_dict())
+    except Exception:
+        return {}
+
+
+@dataclass
+class HFRepoSnapshot:
+    """Metadata of one HF model repo at one resolved revision."""
+
+    repo_id: str
+    sha: Optional[str]
+    card_data: Dict[str, Any]
+    files: Tuple[Tuple[str, Optional[int]], ...]
+    downloads: int = 0
+    _readme: Any = field(default=_UNSET, repr=False)
+    _readme_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_fields(cls, repo_id: str, fields: Dict[str, Any]) -> "HFRepoSnapshot":
+        """Build a snapshot from _model_info_fields() output (possibly via the cache)."""
+        return cls(
+            repo_id=repo_id,
+            sha=fields.get("sha"),
+            card_data=dict(fields.get("card_data") or {}),
+            files=tuple((str(name), size) for name, size in fields.get("files") or []),
+            downloads=int(fields.get("downloads") or 0),
+        )
+
+    @property
+    def license(self) -> str:
+        data = self.card_data.get("license", "")
+        if isinstance(data, dict):
+            return str(data.get("id", ""))
+        if isinstance(data, list):
+            return str(data[0]) if data else ""
+        return str(data) if data else ""
+
+    @property
+    def weights_total_bytes(self) -> Optional[int]:
+        """Sum of weight file sizes, or None if any weight file's size is unknown."""
+        return _known_total(
+            size for name, size in self.files if name.endswith(WEIGHT_EXTENSIONS)
+        )
+
+    @property
+    def total_bytes(self) -> Optional[int]:
+        """Sum of all file sizes, or None if any file's size is unknown."""
+        return _known_total(size for _name, size in self.files)
+
+    def readme(self) -> Optional[str]:
+        """
+        README.md text of this revision, downloaded on first call.
+
+        Returns:
+            README text, or None if the repo has none or it can't be fetched
+        """
+        with self._readme_lock:
+            if self._readme is _UNSET:
+                try:
+                    if self.sha is None:
+                        # The branch can move; a long-lived cache entry would go stale.
+                        self._readme = _download_readme(self.repo_id, None)
+                    else:
+                        self._readme = get_metadata_cache().get_or_fetch(
+                            "hf_readme",
+                            f"{self.repo_id}@{self.sha}",
+                            lambda: _download_readme(self.repo_id, self.sha),
+                        )
+                except Exception as e:
+                    LOG.debug("README download failed for %s: %s", self.repo_id, e)
+                    self._readme = None
+            return self._readme  # type: ignore[no-any-return]
+
+
+def _download_readme(repo_id: str, revision: Optional[str]) -> str:
+    from huggingface_hub import hf_hub_download
+
+    path = hf_hub_download(repo_id=repo_id, filename="README.md", revision=revision)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _ttl_s() -> float:
+    try:
+        return float(os.environ.get("HF_SNAPSHOT_TTL_S", DEFAULT_TTL_S))
+    except ValueError:
+        return DEFAULT_TTL_S
+
+
+# (repo_id lowercased, requested revision) -> (fetched_at, snapshot)
+_snapshots: Dict[Tuple[str, Optional[str]], Tuple[float, HFRepoSnapshot]] = {}
+_snapshots_lock = threading.Lock()
+
+
+def _model_info_fields(repo_id: str, revision: Optional[str]) -> Dict[str, Any]:
+    """Fetch model info from the Hub as a JSON-serializable dict."""
+    # Looked up at call time so tests (and callers) can patch huggingface_hub.model_info.
+    import huggingface_hub
+
+    LOG.debug("Fetching HF model info for %s@%s", repo_id, revision or "default")
+    meta = huggingface_hub.model_info(repo_id, revision=revision, files_metadata=True)
+    siblings = getattr(meta, "siblings", None) or []
+    return {
+        "sha": getattr(meta, "sha", None),
+        "card_data": _card_dict(getattr(meta, "card_data", None)),
+        "files": [[str(s.rfilename), _sibling_size(s)] for s in siblings],
+        "downloads": int(getattr(meta, "downloads", 0) or 0),
+    }
+
+
+def _fetch_snapshot(repo_id: str, revision: Optional[str]) -> HFRepoSnapshot:
+    key = f"{repo_id}@{revision or 'default'}"
+    fields = get_metadata_cache().get_or_fetch(
+        "hf_model_info", key, lambda: _model_info_fields(repo_id, revision)
+    )
+    return HFRepoSnapshot.from_fields(repo_id, fields)
+
+
+def get_hf_snapshot(repo_id: str, revision: Optional[str] = None) -> HFRepoSnapshot:
+    """
+    Return the metadata snapshot for an HF model repo.
+
+    Args:
+        repo_id: <org>/<model>
+        revision: Branch, tag or commit sha (None for the default branch)
+
+    Returns:
+        HFRepoSnapshot, shared with other callers within the TTL
+
+    Raises:
+        Whatever huggingface_hub.model_info() raises; failures are not cached
+    """
+    key = (repo_id.lower(), revision)
+    now = time.monotonic()
+    with _snapshots_lock:
+        hit = _snapshots.get(key)
+        if hit is not None and now - hit[0] < _ttl_s():
+            return hit[1]
+
+    resource = f"{repo_id}@{revision}" if revision else repo_id
+    snapshot = shared_fetch("hf_snapshot", resource, lambda: _fetch_snapshot(repo_id, revision))
+    with _snapshots_lock:
+        _snapshots[key] = (time.monotonic(), snapshot)
+    return snapshot
+
+
+def peek_hf_snapshot(repo_id: str, revision: Optional[str] = None) -> Optional[HFRepoSnapshot]:
+    """The cached snapshot for repo_id if one is fresh; never fetches."""
+    with _snapshots_lock:
+        hit = _snapshots.get((repo_id.lower(), revision))
+    if hit is not None and time.monotonic() - hit[0] < _ttl_s():
+        return hit[1]
+    return None
+
+
+def _dataset_size_bytes(repo_id: str) -> Optional[int]:
+    import huggingface_hub
+
+    meta = huggingface_hub.dataset_info(repo_id, files_metadata=True)
+    return _known_total(_sibling_size(s) for s in getattr(meta, "siblings", None) or [])
+
+
+def hf_dataset_size_bytes(repo_id: str) -> Optional[int]:
+    """
+    Total size of an HF dataset repo's files, from Hub metadata.
+
+    Returns:
+        Byte count, or None if the Hub doesn't report every file's size
+
+    Raises:
+        Whatever huggingface_hub.dataset_info() raises; failures are not cached
+    """
+    return get_metadata_cache().get_or_fetch(  # type: ignore[no-any-return]
+        "hf_dataset_size", repo_id, lambda: _dataset_size_bytes(repo_id)
+    )
+
+
+def clear_hf_snapshots() -> None:
+    """Drop all cached snapshots."""
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -0,0 +1,228 @@
+"""
+TTL metadata cache for upstream lookups (Hub model info, dataset info,
+READMEs, GitHub repo analysis).
+
+Two tiers: an in-memory LRU in front of an on-disk SQLite store. The SQLite
+file is shared by every process using the same path (CLI runs, uvicorn
+workers), so a catalog re-rated by another process is mostly served locally.
+Entries expire per kind; concurrent misses for the same entry share one fetch
+through the upstream single-flight group. Values must be JSON-serializable.
+
+Configuration:
+- METADATA_CACHE_PATH: SQLite file (default: <tmp>/registry-metadata-cache.sqlite3);
+  set to an empty string to keep the cache in memory only
+- METADATA_CACHE_MAX_ENTRIES: in-memory LRU capacity (default 1024)
+- METADATA_TTL_<KIND>_S: TTL override for one kind, e.g. METADATA_TTL_HF_README_S
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .logging_setup import get_logger
+from .singleflight import shared_fetch
+
+LOG = get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_S = 3600.0
+
+# Default TTLs per kind. Keys that include a commit sha never go stale, so
+# those kinds keep entries much longer.
+DEFAULT_TTLS: Dict[str, float] = {
+    "hf_model_info": 3600.0,
+    "hf_dataset_info": 6 * 3600.0,
+    "hf_dataset_size": 6 * 3600.0,
+    "hf_readme": 7 * 24 * 3600.0,
+    "repo_analysis": 3600.0,
+    "github_repo_size": 3600.0,
+}
+
+_MISS = object()
+
+
+class MetadataCache:
+    """In-memory LRU over an optional SQLite store, with per-kind TTLs."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._ttls = dict(ttls or {})
+        self._lru: OrderedDict[Tuple[str, str], Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                self._db = self._open(path)
+            except sqlite3.Error as e:
+                LOG.info("Metadata cache store unavailable at %s, using memory only: %s", path, e)
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        return db
+
+    def ttl(self, kind: str) -> float:
+        """TTL in seconds for kind: env override > constructor > DEFAULT_TTLS > DEFAULT_TTL_S."""
+        raw = os.environ.get(f"METADATA_TTL_{kind.upper()}_S")
+        if raw is not None:
+            try:
+                return float(raw)
+            except ValueError:
+                pass
+        return self._ttls.get(kind, DEFAULT_TTLS.get(kind, DEFAULT_TTL_S))
+
+    def _count(self, kind: str, what: str) -> None:
+        per_kind = self._stats.setdefault(kind, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        per_kind[what] += 1
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """
+        Look up an unexpired entry.
+
+        Args:
+            kind: Entry kind, e.g. "hf_model_info"
+            key: Identity of the entry within its kind
+            default: Returned on a miss
+
+        Returns:
+            The cached value, or default
+        """
+        value = self._lookup(kind, key)
+        return default if value is _MISS else value
+
+    def _lookup(self, kind: str, key: str) -> Any:
+        now = time.time()
+        ttl = self.ttl(kind)
+        with self._lock:
+            hit = self._lru.get((kind, key))
+            if hit is not None and now - hit[0] < ttl:
+                self._lru.move_to_end((kind, key))
+                self._count(kind, "memory_hits")
+                return hit[1]
+            row = self._read(kind, key)
+            if row is not None and now - row[0] < ttl:
+                self._remember(kind, key, row[0], row[1])
+                self._count(kind, "disk_hits")
+                return row[1]
+            self._count(kind, "misses")
+            return _MISS
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store value in both tiers."""
+        stored_at = time.time()
+        with self._lock:
+            self._remember(kind, key, stored_at, value)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (kind, key, value, stored_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (kind, key, json.dumps(value), stored_at),
+                    )
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    LOG.debug("Metadata cache write failed for %s/%s: %s", kind, key, e)
+
+    def get_or_fetch(self, kind: str, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for (kind, key), or fetch and store it.
+
+        Concurrent misses for the same entry share one call of fn.
+
+        Raises:
+            Whatever fn() raises; failures are not cached
+        """
+        value = self._lookup(kind, key)
+        if value is not _MISS:
+            return value
+
+        def fetch() -> Any:
+            fetched = fn()
+            self.put(kind, key, fetched)
+            return fetched
+
+        return shared_fetch(f"cache:{kind}", key, fetch)
+
+    def _remember(self, kind: str, key: str, stored_at: float, value: Any) -> None:
+        self._lru[(kind, key)] = (stored_at, value)
+        self._lru.move_to_end((kind, key))
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _read(self, kind: str, key: str) -> Optional[Tuple[float, Any]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT stored_at, value FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            LOG.debug("Metadata cache read failed for %s/%s: %s", kind, key, e)
+            return None
+        if row is None:
+            return None
+        return float(row[0]), json.loads(row[1])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per kind."""
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[MetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the process-wide metadata cache, configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = os.environ.get("METADATA_CACHE_PATH")
+                if path is None:
+                    path = os.path.join(tempfile.gettempdir(), "registry-metadata-cache.sqlite3")
+                try:
+                    max_entries = int(
+                        os.environ.get("METADATA_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+                    )
+                except ValueError:
+                    max_entries = DEFAULT_MAX_ENTRIES
+                _cache = MetadataCache(path or None, max_entries=max_entries)
+    return _cache
+
+
+def reset_metadata_cache() -> None:
+    """Close and forget the process-wide cache (it is recreated from the env on next use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
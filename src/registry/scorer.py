@@ -3,10 +3,16 @@ Orchestrates metric computation and scoring for models.
 """
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
 import time
-from typing import Any, Dict, List
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional
 
+from .hf_snapshot import get_hf_snapshot
 from .logging_setup import get_logger
+from .metadata_cache import get_metadata_cache
 from .metrics import (
     BusFactorMetric,
     CodeQualityMetric,
@@ -19,10 +25,20 @@ from .metrics import (
 )
 from .metrics.base import Metric
 from .models import ModelScore, ResourceCategory
+from .singleflight import shared_fetch
 from .url_parser import classify_url, fetch_repo_info, parse_url
 
 LOG = get_logger(__name__)
 
+# Default wall-clock budget (seconds) for a single metric's compute() call.
+# Override globally with $METRIC_TIMEOUT_S or per metric with
+# $METRIC_TIMEOUT_<NAME>_S (e.g. METRIC_TIMEOUT_BUS_FACTOR_S=5).
+DEFAULT_METRIC_TIMEOUT_S = 30.0
+
+# Bump when scoring logic changes: cached ratings record the version they
+# were computed with and are recomputed under a different one.
+SCORER_VERSION = "1"
+
 
 def enrich_context(repo_info: Dict[str, Any]) -> None:
     """
@@ -34,71 +50,121 @@ def enrich_context(repo_info: Dict[str, Any]) -> None:
 
     Never raises: logs and returns on failure.
     """
+    _enrich_dataset_downloads(repo_info)
+    _enrich_code_signals(repo_info)
+    _enrich_hf_readme(repo_info)
+
+
+def _hf_dataset_repo_id(dataset_link: str) -> str:
+    """Extract <org>/<dataset> from a huggingface.co/datasets/ URL ("" if not one)."""
+    if "huggingface.co/datasets/" not in dataset_link.lower():
+        return ""
+    # huggingface.co/datasets/<repo_id>/...
+    tail = dataset_link.split("huggingface.co/datasets/", 1)[1].strip("/")
+    return "/".join([p for p in tail.split("/") if p][:2]) if "/" in tail else tail
 
-    # 1) Dataset downloads from HF dataset URL
+
+def _hf_model_repo_id(url: str) -> str:
+    """Extract <org>/<model> from a huggingface.co model URL ("" if not one)."""
+    if "huggingface.co" not in url.lower():
+        return ""
+    # Extract repo_id as org/model (ignore /tree/..., /blob/..., etc.)
+    tail = url.split("huggingface.co/", 1)[1].strip("/")
+    parts = [p for p in tail.split("/") if p]
+    return "/".join(parts[:2]) if len(parts) >= 2 else ""
+
+
+def _enrich_dataset_downloads(repo_info: Dict[str, Any]) -> None:
+    """1) Dataset downloads from HF dataset URL."""
     try:
-        dataset_link = str(repo_info.get("dataset_link") or "")
-        if "huggingface.co/datasets/" in dataset_link.lower():
-            from huggingface_hub import dataset_info
-
-            # huggingface.co/datasets/<repo_id>/...
-            tail = dataset_link.split("huggingface.co/datasets/", 1)[1].strip("/")
-            repo_id = "/".join([p for p in tail.split("/") if p][:2]) if "/" in tail else tail
-            if repo_id:
-                ds = dataset_info(repo_id)
-                ds_dict = ds.to_dict() if hasattr(ds, "to_dict") else {}
-                downloads = ds_dict.get("downloads", 0) or 0
-                repo_info["dataset_downloads"] = int(downloads)
+        repo_id = _hf_dataset_repo_id(str(repo_info.get("dataset_link") or ""))
+        if repo_id:
+            repo_info["dataset_downloads"] = get_metadata_cache().get_or_fetch(
+                "hf_dataset_info", repo_id, lambda: _fetch_dataset_downloads(repo_id)
+            )
     except Exception as e:
         LOG.debug("Context enrich: dataset_info failed: %s", e)
 
-    # 2) Code repo signals from GitHub code_link
+
+def _fetch_dataset_downloads(repo_id: str) -> int:
+    """Download count for an HF dataset (raises on Hub errors)."""
+    from huggingface_hub import dataset_info
+
+    ds = dataset_info(repo_id)
+    return int(getattr(ds, "downloads", 0) or 0)
+
+
+def _apply_code_signals(repo_info: Dict[str, Any], code_info: Dict[str, Any]) -> None:
+    """Prefer the code repo's engineering signals for code_quality."""
+    for k in ("has_tests", "has_ci", "lint_ok", "lint_warn", "git_contributors"):
+        if k in code_info:
+            repo_info[k] = code_info[k]
+
+
+def _enrich_code_signals(repo_info: Dict[str, Any]) -> None:
+    """2) Code repo signals from GitHub code_link."""
     try:
         code_link = str(repo_info.get("code_link") or "")
         if "github.com" in code_link.lower():
-            code_info = fetch_repo_info(code_link)
-            # Prefer code repo's engineering signals for code_quality
-            for k in ("has_tests", "has_ci", "lint_ok", "lint_warn", "git_contributors"):
-                if k in code_info:
-                    repo_info[k] = code_info[k]
+            _apply_code_signals(repo_info, fetch_repo_info(code_link))
     except Exception as e:
         LOG.debug("Context enrich: code repo analysis failed: %s", e)
 
-    # 3) HF model README.md via hf_hub_download
+
+def _download_hf_readme(repo_id: str) -> Optional[str]:
+    """README.md for an HF model; None if it can't be fetched."""
     try:
-        url = str(repo_info.get("url") or "")
-        if "huggingface.co" in url.lower() and "hf_readme" in repo_info:
-            from huggingface_hub import hf_hub_download
-
-            # Extract repo_id as org/model (ignore /tree/..., /blob/..., etc.)
-            tail = url.split("huggingface.co/", 1)[1].strip("/")
-            parts = [p for p in tail.split("/") if p]
-            repo_id = "/".join(parts[:2]) if len(parts) >= 2 else ""
-            if repo_id:
-                try:
-                    path = hf_hub_download(repo_id=repo_id, filename="README.md")
-                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        repo_info["hf_readme"] = f.read()
-                except Exception:
-                    # Leave existing hf_readme as-is (may be empty)
-                    pass
+        # Shares the Hub metadata fetch made by fetch_repo_info().
+        return get_hf_snapshot(repo_id).readme()
+    except Exception:
+        return shared_fetch("hf_readme", repo_id, lambda: _download_hf_readme_uncached(repo_id))
+
+
+def _download_hf_readme_uncached(repo_id: str) -> Optional[str]:
+    from huggingface_hub import hf_hub_download
+
+    try:
+        path = hf_hub_download(repo_id=repo_id, filename="README.md")
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except Exception:
+        return None
+
+
+def _enrich_hf_readme(repo_info: Dict[str, Any]) -> None:
+    """3) HF model README.md via hf_hub_download."""
+    try:
+        if "hf_readme" not in repo_info:
+            return
+        repo_id = _hf_model_repo_id(str(repo_info.get("url") or ""))
+        if repo_id:
+            readme = _download_hf_readme(repo_id)
+            # Leave existing hf_readme as-is (may be empty) on failure
+            if readme is not None:
+                repo_info["hf_readme"] = readme
     except Exception as e:
         LOG.debug("Context enrich: hf_hub_download failed: %s", e)
 
 
-def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+def score_model(
+    url: str,
+    related_context: Dict[str, Any],
+    deadlines: Optional[Dict[str, float]] = None,
+) -> ModelScore:
     """
     Score a model URL and return complete ModelScore.
     
     Steps:
     1. Fetch repository metadata
-    2. Compute all metrics in sequence (TODO: parallelize)
+    2. Compute all metrics concurrently, each under its own deadline
     3. Compute weighted net score
     4. Return ModelScore dataclass
     
     Args:
         url: The model URL to score
         related_context: Dictionary with related DATASET and CODE URLs for context
+        deadlines: Optional per-metric timeouts in seconds, keyed by metric name.
+            Metrics not listed fall back to the environment/default timeout.
         
     Returns:
         ModelScore object with all metrics computed
@@ -112,9 +178,8 @@ def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
     # Parse URL to extract name
     parsed = parse_url(url)
     name = parsed.name
-    category: ResourceCategory = "MODEL"
     
-    LOG.debug("Parsed URL - name: %s, category: %s", name, category)
+    LOG.debug("Parsed URL - name: %s, category: %s", name, parsed.category)
     
     # Fetch repository information
     LOG.debug("Fetching repository metadata for %s", url)
@@ -129,6 +194,63 @@ def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
     # Enrich model repo_info with signals from dataset/code context
     enrich_context(repo_info)
     
+    return _score_repo_info(name, repo_info, deadlines, t_start)
+
+
+async def async_score_model(
+    url: str,
+    related_context: Dict[str, Any],
+    deadlines: Optional[Dict[str, float]] = None,
+) -> ModelScore:
+    """
+    Async variant of score_model().
+
+    Upstream metadata is fetched through the asyncio fetch layer (see
+    async_fetch), so many models can be scored on one event loop with
+    per-host concurrency limits. Metric computation itself runs off-loop.
+
+    Args:
+        url: The model URL to score
+        related_context: Dictionary with related DATASET and CODE URLs for context
+        deadlines: Optional per-metric timeouts in seconds, keyed by metric name
+
+    Returns:
+        ModelScore object with all metrics computed
+    """
+    from .async_fetch import async_enrich_context, async_fetch_repo_info
+
+    LOG.info("Scoring MODEL (async): %s", url)
+    t_start = time.perf_counter()
+    name = parse_url(url).name
+
+    repo_info = await async_fetch_repo_info(url)
+    repo_info.update(related_context)
+    await async_enrich_context(repo_info)
+
+    return await asyncio.to_thread(_score_repo_info, name, repo_info, deadlines, t_start)
+
+
+def _score_repo_info(
+    name: str,
+    repo_info: Dict[str, Any],
+    deadlines: Optional[Dict[str, float]],
+    t_start: float,
+) -> ModelScore:
+    """
+    Compute all metrics and the net score for already-enriched repo_info.
+
+    Args:
+        name: Model name for the ModelScore
+        repo_info: Fetched and enriched repository metadata
+        deadlines: Optional per-metric timeouts in seconds
+        t_start: perf_counter() value when scoring started (for logging)
+
+    Returns:
+        ModelScore object with all metrics computed
+    """
+    url = str(repo_info.get("url") or name)
+    category: ResourceCategory = "MODEL"
+
     # Initialize all metrics
     metrics: List[Metric] = [
         RampUpTimeMetric(),
@@ -141,28 +263,11 @@ def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
         CodeQualityMetric(),
     ]
     
-    # Compute all metrics
-    # TODO: Parallelize with ThreadPoolExecutor or asyncio for better performance
-    metric_results: Dict[str, Any] = {}
-    
-    for metric in metrics:
-        try:
-            LOG.debug("Computing metric: %s", metric.name)
-            value, latency_ms = metric.compute(repo_info)
-            metric_results[metric.name] = value
-            metric_results[f"{metric.name}_latency"] = latency_ms
-            
-            # Log metric result
-            if isinstance(value, dict):
-                LOG.debug("Metric %s = %s (latency: %d ms)", metric.name, value, latency_ms)
-            else:
-                LOG.debug("Metric %s = %.3f (latency: %d ms)", metric.name, value, latency_ms)
-                
-        except Exception as e:
-            LOG.error("Metric %s failed for %s: %s", metric.name, url, e)
-            # Metrics should not raise, but handle gracefully
-            metric_results[metric.name] = 0.0 if metric.name != "size_score" else {}
-            metric_results[f"{metric.name}_latency"] = 0
+    # Compute all metrics concurrently; a slow metric degrades to 0.0 instead
+    # of stalling the whole ModelScore.
+    metric_results = _run_metrics_concurrently(
+        metrics, repo_info, _metric_deadlines(metrics, deadlines), url
+    )
     
     # Compute net score with Phase 1 weights
     LOG.debug("Computing net score")
@@ -198,6 +303,149 @@ def score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
     )
 
 
+def _metric_deadlines(
+    metrics: List[Metric], overrides: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """
+    Resolve the timeout (seconds) for each metric.
+
+    Precedence: explicit overrides > $METRIC_TIMEOUT_<NAME>_S > $METRIC_TIMEOUT_S
+    > DEFAULT_METRIC_TIMEOUT_S. Invalid or non-positive values are ignored.
+
+    Args:
+        metrics: Metric objects that will be computed
+        overrides: Optional mapping of metric name to timeout in seconds
+
+    Returns:
+        Dictionary mapping metric name to timeout in seconds
+    """
+    def _positive(raw: Any) -> Optional[float]:
+        try:
+            val = float(raw)
+        except (TypeError, ValueError):
+            return None
+        return val if val > 0 else None
+
+    default = _positive(os.environ.get("METRIC_TIMEOUT_S")) or DEFAULT_METRIC_TIMEOUT_S
+    overrides = overrides or {}
+
+    deadlines: Dict[str, float] = {}
+    for metric in metrics:
+        env_key = f"METRIC_TIMEOUT_{metric.name.upper()}_S"
+        deadlines[metric.name] = (
+            _positive(overrides.get(metric.name))
+            or _positive(os.environ.get(env_key))
+            or default
+        )
+    return deadlines
+
+
+def _degraded_value(metric_name: str) -> Any:
+    """Fallback value for a metric that failed or missed its deadline."""
+    return {} if metric_name == "size_score" else 0.0
+
+
+def _start_daemon(name: str, fn: Callable[..., Any], *args: Any) -> Future[Any]:
+    """
+    Run fn(*args) on a new daemon thread and return a Future for its result.
+
+    Python threads can't be interrupted, so a metric that overruns its
+    deadline keeps running; a daemon thread at least never holds up
+    interpreter exit (ThreadPoolExecutor workers are joined at exit).
+    """
+    fut: Future[Any] = Future()
+
+    def run() -> None:
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+
+    threading.Thread(target=run, name=f"metric-{name}", daemon=True).start()
+    return fut
+
+
+def _run_metrics_concurrently(
+    metrics: List[Metric],
+    repo_info: Dict[str, Any],
+    deadlines: Dict[str, float],
+    url: str = "",
+) -> Dict[str, Any]:
+    """
+    Run every metric's compute() on its own daemon thread.
+
+    Each metric is given its own deadline measured from submission. Metrics
+    that finish in time report their own (score, latency); a metric that
+    raises degrades to 0.0 with latency 0 (as before); a metric that misses
+    its deadline degrades to 0.0 with the real elapsed time as its latency.
+    An overrunning metric is abandoned, not stopped: its thread runs to
+    completion in the background and its result is discarded, but neither
+    the caller nor interpreter exit waits for it. The caller never waits
+    past the largest deadline.
+
+    Args:
+        metrics: Metric objects to compute
+        repo_info: Shared, read-only repository metadata
+        deadlines: Timeout in seconds for each metric name
+        url: Model URL (for log messages only)
+
+    Returns:
+        Dictionary with "<name>" and "<name>_latency" entries for every metric
+    """
+    metric_results: Dict[str, Any] = {}
+    if not metrics:
+        return metric_results
+
+    started: Dict[Future[Any], float] = {}
+    names: Dict[Future[Any], str] = {}
+    for metric in metrics:
+        LOG.debug("Computing metric: %s (deadline %.1fs)", metric.name, deadlines[metric.name])
+        fut = _start_daemon(metric.name, metric.compute, repo_info)
+        started[fut] = time.perf_counter()
+        names[fut] = metric.name
+
+    pending = set(started)
+    while pending:
+        now = time.perf_counter()
+        next_expiry = min(started[f] + deadlines[names[f]] for f in pending)
+        done, pending = wait(
+            pending, timeout=max(0.0, next_expiry - now), return_when=FIRST_COMPLETED
+        )
+
+        for fut in done:
+            name = names[fut]
+            try:
+                value, latency_ms = fut.result()
+                metric_results[name] = value
+                metric_results[f"{name}_latency"] = latency_ms
+
+                # Log metric result
+                if isinstance(value, dict):
+                    LOG.debug("Metric %s = %s (latency: %d ms)", name, value, latency_ms)
+                else:
+                    LOG.debug("Metric %s = %.3f (latency: %d ms)", name, value, latency_ms)
+            except Exception as e:
+                LOG.error("Metric %s failed for %s: %s", name, url, e)
+                # Metrics should not raise, but handle gracefully
+                metric_results[name] = _degraded_value(name)
+                metric_results[f"{name}_latency"] = 0
+
+        now = time.perf_counter()
+        for fut in [f for f in pending if now - started[f] >= deadlines[names[f]]]:
+            name = names[fut]
+            elapsed_ms = int(round((now - started[fut]) * 1000))
+            pending.discard(fut)
+            LOG.warning(
+                "Metric %s exceeded its %.1fs deadline for %s; degrading to 0.0",
+                name, deadlines[name], url,
+            )
+            metric_results[name] = _degraded_value(name)
+            metric_results[f"{name}_latency"] = elapsed_ms
+    return metric_results
+
+
 def _compute_net_score(metric_results: Dict[str, Any]) -> tuple[float, int]:
     """
     Compute weighted net score from individual metrics.
@@ -261,25 +509,26 @@ def _compute_net_score(metric_results: Dict[str, Any]) -> tuple[float, int]:
     return net_score, latency_ms
 
 
-def process_url_list(urls: List[str]) -> List[ModelScore]:
+def process_url_list(urls: List[str], max_workers: Optional[int] = None) -> List[ModelScore]:
     """
     Process a list of URLs and score all MODEL URLs.
     
     Maintains context of most recent DATASET and CODE URLs to provide
-    related context when scoring models.
+    related context when scoring models. The context is snapshotted for
+    each MODEL as the list is read, so scoring models in parallel does not
+    change which dataset/code link each model is scored against. Parallel
+    scoring runs on one event loop through async_score_model(), so upstream
+    fetches overlap under the async fetch layer's per-host limits.
     
     Args:
         urls: List of URLs (can be MODEL, DATASET, or CODE)
+        max_workers: Number of models scored concurrently. Defaults to
+            $SCORER_WORKERS, or 1 (sequential) when unset.
         
     Returns:
-        List of ModelScore objects (only for MODEL URLs)
-        
-    Note:
-        Processes URLs sequentially. TODO: Add parallel processing with
-        ThreadPoolExecutor or asyncio for better throughput.
+        List of ModelScore objects (only for MODEL URLs), in input order
     """
     LOG.info("Processing %d URLs", len(urls))
-    results: List[ModelScore] = []
     
     # Track most recent DATASET and CODE URLs for context
     context: Dict[str, Any] = {
@@ -287,6 +536,9 @@ def process_url_list(urls: List[str]) -> List[ModelScore]:
         "code_link": "",
     }
     
+    # (url, context snapshot) for each MODEL, in input order
+    jobs: List[tuple[str, Dict[str, Any]]] = []
+
     for i, url in enumerate(urls, 1):
         try:
             category = classify_url(url)
@@ -304,25 +556,64 @@ def process_url_list(urls: List[str]) -> List[ModelScore]:
                 LOG.info("Updated context with CODE: %s", url)
                 
             elif category == "MODEL":
-                # Score the model with current context
-                model_score = score_model(url, context)
-                results.append(model_score)
-                LOG.info("Completed scoring for MODEL %d: %s (net_score=%.3f)", 
-                        len(results), model_score.name, model_score.net_score)
+                # Score the model with the context as it is right now
+                jobs.append((url, dict(context)))
                 
         except Exception as e:
             LOG.error("Failed to process URL %s: %s", url, e, exc_info=True)
             # Continue processing remaining URLs
             continue
     
-    LOG.info("Completed processing: %d MODEL URLs scored", len(results))
-    
-    # TODO: Implement parallel processing
-    # Future enhancement: Use ThreadPoolExecutor to score multiple models concurrently
-    # Example:
-    #   with ThreadPoolExecutor(max_workers=4) as executor:
-    #       futures = {executor.submit(score_model, url, ctx): url for url in model_urls}
-    #       for future in as_completed(futures):
-    #           results.append(future.result())
+    workers = _resolve_workers(max_workers)
+    if workers <= 1 or len(jobs) <= 1:
+        scored = [_score_model_safely(url, ctx) for url, ctx in jobs]
+    else:
+        LOG.info("Scoring %d MODEL URLs with %d workers", len(jobs), workers)
+        scored = asyncio.run(_score_models_async(jobs, workers))
     
+    results = [ms for ms in scored if ms is not None]
+    LOG.info("Completed processing: %d MODEL URLs scored", len(results))
     return results
+
+
+def _resolve_workers(max_workers: Optional[int]) -> int:
+    """Resolve the model worker count from the argument or $SCORER_WORKERS."""
+    if max_workers is None:
+        try:
+            max_workers = int(os.environ.get("SCORER_WORKERS", "1"))
+        except ValueError:
+            max_workers = 1
+    return max(1, max_workers)
+
+
+async def _score_models_async(
+    jobs: List[tuple[str, Dict[str, Any]]], workers: int
+) -> List[Optional[ModelScore]]:
+    """Score (url, context) jobs on the running loop, at most workers at a time, in order."""
+    gate = asyncio.Semaphore(workers)
+
+    async def one(url: str, context: Dict[str, Any]) -> Optional[ModelScore]:
+        async with gate:
+            try:
+                model_score = await async_score_model(url, context)
+            except Exception as e:
+                LOG.error("Failed to process URL %s: %s", url, e, exc_info=True)
+                return None
+            LOG.info("Completed scoring for MODEL: %s (net_score=%.3f)",
+                     model_score.name, model_score.net_score)
+            return model_score
+
+    # gather() returns results in submission (= input) order
+    return list(await asyncio.gather(*(one(url, ctx) for url, ctx in jobs)))
+
+
+def _score_model_safely(url: str, context: Dict[str, Any]) -> Optional[ModelScore]:
+    """Score one model, logging and returning None on failure."""
+    try:
+        model_score = score_model(url, context)
+        LOG.info("Completed scoring for MODEL: %s (net_score=%.3f)",
+                 model_score.name, model_score.net_score)
+        return model_score
+    except Exception as e:
+        LOG.error("Failed to process URL %s: %s", url, e, exc_info=True)
+        return None
@@ -0,0 +1,122 @@
+"""
+Single-flight coalescing of concurrent upstream fetches.
+
+When several threads ask for the same resource at the same time, only the
+first (the leader) performs the fetch; the others wait for it and receive
+the same result (or exception). Nothing is cached once the fetch finishes;
+the next caller after that starts a new fetch.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the resource being fetched
+            fn: Zero-argument callable performing the fetch
+
+        Returns:
+            fn()'s result (the same object for every caller that shared it)
+
+        Raises:
+            Whatever fn() raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[no-any-return]
+
+        try:
+            call.result = fn()
+            return call.result  # type: ignore[no-any-return]
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many fetches ran and how many callers joined one."""
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+# Shared instance for upstream fetches (HF Hub, git clones).
+_upstream = SingleFlight()
+
+
+def canonical_resource(url: str) -> str:
+    """
+    Normalize a resource URL so equivalent spellings coalesce.
+
+    Drops the scheme, "www.", trailing slashes and a ".git" suffix, and
+    lowercases (HF and GitHub repo ids are case-insensitive).
+    """
+    s = (url or "").strip().lower()
+    if "://" in s:
+        s = s.split("://", 1)[1]
+    if s.startswith("www."):
+        s = s[4:]
+    s = s.rstrip("/")
+    if s.endswith(".git"):
+        s = s[:-4]
+    return s
+
+
+def shared_fetch(kind: str, resource: str, fn: Callable[[], T]) -> T:
+    """
+    Fetch a resource through the shared single-flight group.
+
+    Args:
+        kind: Type of fetch, e.g. "repo_info", "hf_dataset", "hf_readme"
+        resource: URL or repo id identifying the resource
+        fn: Zero-argument callable performing the fetch
+
+    Returns:
+        fn()'s result, shared with concurrent callers of the same (kind, resource)
+    """
+    key: Tuple[str, str] = (kind, canonical_resource(resource))
+    return _upstream.do(key, fn)
+
+
+def upstream_stats() -> Dict[str, int]:
+    """Counters for the shared upstream single-flight group."""
+    return _upstream.stats()
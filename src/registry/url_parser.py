@@ -1,18 +1,21 @@
 """
 URL parsing and category detection for models, datasets, and code repositories.
 Includes metadata fetching from Hugging Face and GitHub.
+
+GitPython is imported by the functions that use it (huggingface_hub is
+imported lazily by hf_snapshot too), so importing this module is cheap.
 """
 from __future__ import annotations
 
 import logging
 import os
-import tempfile
-from typing import Any, Dict
-
-from git import GitCommandError, Repo
-from huggingface_hub import hf_hub_download, model_info
+from typing import Any, Dict, Optional, Tuple
 
+from .clone_cache import get_clone_cache, head_files, read_head_file
+from .hf_snapshot import WEIGHT_EXTENSIONS, get_hf_snapshot, hf_dataset_size_bytes
+from .metadata_cache import get_metadata_cache
 from .models import ParsedURL, ResourceCategory
+from .singleflight import shared_fetch
 
 LOG = logging.getLogger(__name__)
 
@@ -97,7 +100,17 @@ def fetch_repo_info(url: str) -> Dict[str, Any]:
     Returns:
         Dictionary with repository metadata. Never raises - returns partial
         info on network failure or missing data.
+
+    Note:
+        Concurrent calls for the same repository share one fetch; each
+        caller gets its own copy of the result.
     """
+    info = shared_fetch("repo_info", url, lambda: _fetch_repo_info_uncached(url))
+    return dict(info)
+
+
+def _fetch_repo_info_uncached(url: str) -> Dict[str, Any]:
+    """Do the actual metadata fetch for fetch_repo_info()."""
     info: Dict[str, Any] = {
         "url": url,
         "hf_readme": "",
@@ -128,43 +141,118 @@ def fetch_repo_info(url: str) -> Dict[str, Any]:
     return info
 
 
+def fetch_repo_size(url: str) -> Optional[int]:
+    """
+    Total size in bytes of the files behind an artifact URL.
+
+    Uses metadata only: Hub file listings for HF models and datasets. For
+    GitHub repositories, an already cached analysis of the mirror's HEAD
+    tree, else the size the GitHub API reports; a mirror is never cloned
+    just to size a repo.
+
+    Args:
+        url: Artifact URL
+
+    Returns:
+        Byte count, or None for other hosts or when sizes can't be determined
+    """
+    lower = url.lower()
+    try:
+        if "huggingface.co/datasets/" in lower:
+            tail = url.split("huggingface.co/datasets/", 1)[1].split('?', 1)[0]
+            return hf_dataset_size_bytes("/".join([p for p in tail.split('/') if p][:2]))
+        if "huggingface.co/" in lower:
+            model_id, revision = hf_model_ref(url)
+            return get_hf_snapshot(model_id, revision).total_bytes
+        if "github.com" in lower:
+            analysis = get_metadata_cache().get("repo_analysis", url)
+            total = analysis.get("repo_total_bytes") if analysis else None
+            if total is not None:
+                return int(total)
+            return _github_repo_size_bytes(url)
+    except Exception as e:
+        LOG.info("Size lookup failed for %s: %s", url, e)
+    return None
+
+
+def _github_repo_size_bytes(url: str) -> Optional[int]:
+    """
+    Repository size reported by the GitHub REST API (metadata cache kind
+    "github_repo_size").
+
+    GitHub reports the size of the repository's git storage in KiB; files
+    kept in git-lfs are not counted.
+
+    Raises:
+        requests.RequestException: if the API call fails (not cached)
+    """
+    tail = url.split("github.com/", 1)[1].split('?', 1)[0].split('#', 1)[0]
+    parts = [p for p in tail.split('/') if p]
+    if len(parts) < 2:
+        return None
+    owner, repo = parts[0], parts[1].removesuffix(".git")
+
+    def fetch() -> Optional[int]:
+        import requests
+
+        headers = {"Accept": "application/vnd.github+json"}
+        token = os.environ.get("GITHUB_TOKEN")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        LOG.debug("Fetching GitHub repo size for %s/%s", owner, repo)
+        resp = requests.get(
+            f"https://api.github.com/repos/{owner}/{repo}", headers=headers, timeout=10
+        )
+        resp.raise_for_status()
+        size_kib = resp.json().get("size")
+        return int(size_kib) * 1024 if isinstance(size_kib, int) and size_kib > 0 else None
+
+    return get_metadata_cache().get_or_fetch(  # type: ignore[no-any-return]
+        "github_repo_size", f"{owner}/{repo}".lower(), fetch
+    )
+
+
+def hf_model_ref(url: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a Hugging Face model URL into (repo_id, revision).
+
+    huggingface.co/org/model/tree/<rev>/... pins a revision; any other URL
+    refers to the default branch (revision None).
+    """
+    tail = url.split('huggingface.co/', 1)[1].split('?', 1)[0].split('#', 1)[0]
+    parts = [p for p in tail.split('/') if p]
+    repo_id = "/".join(parts[:2])
+    revision = parts[3] if len(parts) >= 4 and parts[2] in ("tree", "blob", "resolve") else None
+    return repo_id, revision
+
+
 def _fetch_huggingface_info(url: str, info: Dict[str, Any]) -> None:
     """
     Fetch metadata from Hugging Face Hub.
     
+    Reads the shared HFRepoSnapshot, so scoring, lineage and cost for the
+    same model reuse one Hub metadata call.
+
     Args:
         url: Hugging Face URL
         info: Dictionary to populate with metadata
     """
     try:
-        # Extract model ID
-        model_id = url.split('huggingface.co/', 1)[1].strip('/')
-        
-        LOG.debug("Fetching HF model info for %s", model_id)
-        hf_meta = model_info(model_id)
-        meta_dict = hf_meta.to_dict()
+        model_id, revision = hf_model_ref(url)
+        snapshot = get_hf_snapshot(model_id, revision)
         
         # Extract README
-        try:
-            info["hf_readme"] = (
-                meta_dict.get("cardData", {}).get("README", "")
-                or meta_dict.get("modelId", "")
-                or ""
-            )
-        except Exception:
-            info["hf_readme"] = ""
+        info["hf_readme"] = snapshot.card_data.get("README", "") or model_id
         
         # Extract license
-        license_data = meta_dict.get("license", {})
-        if isinstance(license_data, dict):
-            info["license"] = license_data.get("id", "")
-        else:
-            info["license"] = str(license_data) if license_data else ""
+        info["license"] = snapshot.license
         
         # Extract download count (if available)
-        info["dataset_downloads"] = meta_dict.get("downloads", 0)
+        info["dataset_downloads"] = snapshot.downloads
+
+        # Weight sizes from the Hub's per-file metadata (no weights downloaded)
+        info["weights_total_bytes"] = snapshot.weights_total_bytes
         
-        # TODO: Extract file sizes from model card or API
         # TODO: Detect example code in model card
         
     except Exception as e:
@@ -173,68 +261,98 @@ def _fetch_huggingface_info(url: str, info: Dict[str, Any]) -> None:
 
 def _fetch_github_info(url: str, info: Dict[str, Any]) -> None:
     """
-    Clone and analyze a GitHub repository.
+    Analyze a GitHub repository from its cached bare mirror.
+
+    The mirror is cloned once and then updated incrementally (see
+    clone_cache); files are read from the HEAD tree, so no working copy is
+    checked out. Successful analyses are kept in the metadata cache (kind
+    "repo_analysis"), so re-rating the same repo skips the mirror entirely.
     
     Args:
         url: GitHub repository URL
         info: Dictionary to populate with metadata
     """
+    from git import GitCommandError
+
     try:
-        tmpd = tempfile.mkdtemp(prefix="modelrepo_")
-        LOG.debug("Cloning %s into %s", url, tmpd)
-        
-        # Shallow clone for efficiency
-        Repo.clone_from(url, tmpd, depth=20)
-        repo = Repo(tmpd)
-        
-        # Count unique contributors
-        contributors = set()
-        for commit in repo.iter_commits(max_count=200):
-            try:
-                contributors.add(commit.author.email)
-            except Exception:
-                continue
-        info["git_contributors"] = len(contributors)
-        
-        # Analyze repository contents
-        total_weights = 0
-        has_tests = False
-        has_ci = False
-        
-        for root, _, files in os.walk(tmpd):
-            for f in files:
-                # Detect model weight files
-                if f.endswith(('.bin', '.pt', '.safetensors', '.h5', '.ckpt', '.pth')):
-                    try:
-                        total_weights += os.path.getsize(os.path.join(root, f))
-                    except Exception:
-                        continue
-                
-                # Detect test files
-                if f.startswith('test_') or f.endswith('_test.py') or 'test' in root.lower():
-                    has_tests = True
-                
-                # Detect CI/CD configuration
-                if (f.endswith('.yml') or f.endswith('.yaml')) and ('.github' in root or 'workflows' in root):
-                    has_ci = True
-                
-                # Detect README
-                if f.lower() == 'readme.md' or f.lower() == 'readme':
-                    try:
-                        with open(os.path.join(root, f), 'r', encoding='utf-8', errors='ignore') as rf:
-                            info["hf_readme"] = rf.read()
-                    except Exception:
-                        pass
-        
-        info["weights_total_bytes"] = total_weights if total_weights > 0 else None
-        info["has_tests"] = has_tests
-        info["has_ci"] = has_ci
-        
-        # TODO: Run linter and set lint_ok/lint_warn
-        # TODO: Detect dataset links in README
-        # TODO: Detect example code files
-        
+        analysis = get_metadata_cache().get_or_fetch(
+            "repo_analysis", url, lambda: _analyze_github_repo(url)
+        )
+        info.update(analysis)
     except GitCommandError as e:
         LOG.info("Git clone failed for %s: %s", url, e)
     except Exception as e:
         LOG.debug("GitHub repo analysis error for %s: %s", url, e)
+
+
+def _analyze_github_repo(url: str) -> Dict[str, Any]:
+    """
+    Compute the GitHub-derived fields of fetch_repo_info() for url.
+
+    Raises:
+        GitCommandError: if the repository can't be mirrored
+    """
+    with get_clone_cache().reading(url) as mirror_path:
+        return _inspect_mirror(mirror_path)
+
+
+def _inspect_mirror(mirror_path: str) -> Dict[str, Any]:
+    """GitHub-derived fields of fetch_repo_info() from a bare mirror."""
+    from git import Repo
+
+    info: Dict[str, Any] = {}
+    repo = Repo(mirror_path)
+
+    # Count unique contributors
+    contributors = set()
+    for commit in repo.iter_commits(max_count=200):
+        try:
+            contributors.add(commit.author.email)
+        except Exception:
+            continue
+    info["git_contributors"] = len(contributors)
+
+    # Analyze repository contents; a total is unknown (None) if any file in
+    # it has an unknown size (a large blob the partial clone left out).
+    total_weights: Optional[int] = 0
+    total_bytes: Optional[int] = 0
+    has_tests = False
+    has_ci = False
+    readme_path = ""
+
+    for path, size in head_files(mirror_path):
+        root, f = os.path.split(path)
+        if total_bytes is not None:
+            total_bytes = None if size is None else total_bytes + size
+
+        # Detect model weight files
+        if f.endswith(WEIGHT_EXTENSIONS) and total_weights is not None:
+            total_weights = None if size is None else total_weights + size
+
+        # Detect test files
+        if f.startswith('test_') or f.endswith('_test.py') or 'test' in root.lower():
+            has_tests = True
+
+        # Detect CI/CD configuration
+        if f.endswith(('.yml', '.yaml')) and ('.github' in root or 'workflows' in root):
+            has_ci = True
+
+        # Detect README (prefer the one closest to the repo root)
+        if f.lower() == 'readme.md' or f.lower() == 'readme':
+            if not readme_path or path.count('/') < readme_path.count('/'):
+                readme_path = path
+
+    if readme_path:
+        readme = read_head_file(mirror_path, readme_path)
+        if readme is not None:
+            info["hf_readme"] = readme
+
+    info["weights_total_bytes"] = total_weights or None
+    info["repo_total_bytes"] = total_bytes
+    info["has_tests"] = has_tests
+    info["has_ci"] = has_ci
+
+    # TODO: Run linter and set lint_ok/lint_warn
+    # TODO: Detect dataset links in README
+    # TODO: Detect example code files
+    return info
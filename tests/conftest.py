@@ -4,7 +4,8 @@ Pytest configuration and shared fixtures.
 from __future__ import annotations
 
 import os
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, Iterator
 
 import pytest
 
@@ -19,6 +20,56 @@ def disable_logging(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("LOG_LEVEL", "0")
 
 
+@pytest.fixture(autouse=True)
+def clear_hf_snapshots() -> None:
+    """
+    Start every test without cached Hugging Face metadata.
+
+    Tests patch huggingface_hub.model_info; a snapshot cached by an earlier
+    test would hide the patch.
+    """
+    from src.registry.hf_snapshot import clear_hf_snapshots as clear
+
+    clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_metadata_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """
+    Give every test its own empty metadata cache.
+
+    The SQLite store lives in the test's tmp_path, so nothing cached by one
+    test (or by a developer's earlier runs) can hide a patched upstream.
+    """
+    from src.registry.metadata_cache import reset_metadata_cache
+
+    monkeypatch.setenv("METADATA_CACHE_PATH", str(tmp_path / "metadata-cache.sqlite3"))
+    reset_metadata_cache()
+    yield
+    reset_metadata_cache()
+
+
+@pytest.fixture(autouse=True)
+def disable_rate_on_ingest(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Don't start background ratings when API tests ingest models.
+
+    Tests that exercise the rating job pipeline re-enable it explicitly.
+    """
+    monkeypatch.setenv("RATE_ON_INGEST", "0")
+
+
+@pytest.fixture
+def admin_auth() -> Dict[str, Any]:
+    """
+    PUT /authenticate body for the spec's default admin user.
+    """
+    return {
+        "user": {"name": "ece30861defaultadminuser", "is_admin": True},
+        "secret": {"password": "correcthorsebatterystaple123(!__+@**(A'\"`;DROP TABLE artifacts;"},
+    }
+
+
 @pytest.fixture
 def sample_context() -> Dict[str, Any]:
     """
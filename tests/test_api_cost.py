@@ -0,0 +1,109 @@
+"""
+Tests for /artifact/{type}/{id}/cost over the dependency DAG.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+
+_MB = 1024 * 1024
+
+
+def test_dependency_cost_counts_shared_dependencies_once(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    sizes: Dict[str, int] = {
+        "https://example.com/cost/cost-data": 100 * _MB,
+        "https://example.com/cost/cost-base": 400 * _MB,
+        "https://example.com/cost/cost-ft": 500 * _MB,
+    }
+    calls = []
+
+    def fake_size(url: str) -> Optional[int]:
+        calls.append(url)
+        return sizes.get(url)
+
+    monkeypatch.setattr("src.api.main.fetch_repo_size", fake_size)
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+
+    def post(kind: str, url: str, **metadata: str) -> str:
+        body = {"url": url, "metadata": metadata}
+        return client.post(f"/artifact/{kind}", json=body, headers=h).json()["metadata"]["id"]
+
+    data = post("dataset", "https://example.com/cost/cost-data")
+    base = post(
+        "model", "https://example.com/cost/cost-base", datasets="https://example.com/cost/cost-data"
+    )
+    # ft depends on data directly and through base; data is counted once.
+    ft = post(
+        "model",
+        "https://example.com/cost/cost-ft",
+        base_model="https://example.com/cost/cost-base",
+        datasets="https://example.com/cost/cost-data",
+    )
+
+    alone = client.get(f"/artifact/model/{ft}/cost", headers=h).json()
+    assert alone == {ft: {"total_cost": 500.0}}
+
+    cost = client.get(f"/artifact/model/{ft}/cost?dependency=true", headers=h).json()
+    assert cost == {
+        ft: {"standalone_cost": 500.0, "total_cost": 1000.0},
+        base: {"standalone_cost": 400.0, "total_cost": 500.0},
+        data: {"standalone_cost": 100.0, "total_cost": 100.0},
+    }
+    assert list(cost)[0] == ft
+
+    # Repeat queries are served from the memo.
+    n = len(calls)
+    client.get(f"/artifact/model/{ft}/cost?dependency=true", headers=h)
+    assert len(calls) == n
+
+    # Re-pointing a dependency at a smaller repo invalidates the totals that include it.
+    sizes["https://example.com/cost/cost-base2"] = 50 * _MB
+    upd = {"metadata": {"id": base, "name": "cost-base", "type": "model"}}
+    upd["data"] = {"url": "https://example.com/cost/cost-base2"}
+    assert client.put(f"/artifacts/model/{base}", json=upd, headers=h).status_code == 200
+    cost = client.get(f"/artifact/model/{ft}/cost?dependency=true", headers=h).json()
+    # ft's base_model URL still resolves to base by its leaf name.
+    assert cost[ft] == {"standalone_cost": 500.0, "total_cost": 650.0}
+    assert cost[base] == {"standalone_cost": 50.0, "total_cost": 150.0}
+
+
+def test_cost_lookup_runs_off_the_loop_and_unknown_sizes_are_retried(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    import asyncio
+
+    sizes: Dict[str, Optional[int]] = {"https://example.com/cost/flaky-model": None}
+    on_loop = []
+
+    def fake_size(url: str) -> Optional[int]:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(url)
+        except RuntimeError:
+            pass
+        return sizes.get(url)
+
+    monkeypatch.setattr("src.api.main.fetch_repo_size", fake_size)
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    body = {"url": "https://example.com/cost/flaky-model"}
+    mid = client.post("/artifact/model", json=body, headers=h).json()["metadata"]["id"]
+
+    # Lookup failed: a fallback estimate, not remembered.
+    first = client.get(f"/artifact/model/{mid}/cost", headers=h).json()
+    assert first[mid]["total_cost"] != 300.0
+
+    sizes["https://example.com/cost/flaky-model"] = 300 * _MB
+    assert client.get(f"/artifact/model/{mid}/cost", headers=h).json() == {
+        mid: {"total_cost": 300.0}
+    }
+    assert on_loop == []
@@ -40,15 +40,15 @@ def test_lineage_uses_real_ingested_base_model_id_when_present(monkeypatch: pyte
 
     class _FakeInfo:
         def __init__(self, repo_id: str) -> None:
-            self._repo_id = repo_id
-
-        def to_dict(self) -> dict:
+            self.sha = None
+            self.siblings: list = []
             # base_model must match the ingested artifact name exactly.
-            if self._repo_id == "org/model-b":
-                return {"cardData": {"base_model": "org/model-a"}}
-            return {"cardData": {}}
+            if repo_id == "org/model-b":
+                self.card_data = {"base_model": "org/model-a"}
+            else:
+                self.card_data = {}
 
-    def _fake_model_info(repo_id: str) -> _FakeInfo:
+    def _fake_model_info(repo_id: str, **kwargs: object) -> _FakeInfo:
         return _FakeInfo(repo_id)
 
     monkeypatch.setattr("huggingface_hub.model_info", _fake_model_info)
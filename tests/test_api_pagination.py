@@ -0,0 +1,71 @@
+"""
+Tests for cursor pagination of POST /artifacts.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+
+
+def _create(client: TestClient, h: Dict[str, str], name: str) -> str:
+    r = client.post("/artifact/dataset", json={"url": f"https://example.com/org/{name}"}, headers=h)
+    return str(r.json()["metadata"]["id"])
+
+
+def test_cursor_pages_are_stable_across_inserts(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    monkeypatch.setenv("ARTIFACTS_PAGE_SIZE", "2")
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    names = ["page-b", "page-c", "page-d", "page-e"]
+    for n in names:
+        _create(client, h, n)
+    queries = [{"name": n} for n in ["page-a"] + names]
+
+    first = client.post("/artifacts", json=queries, headers=h)
+    assert [m["name"] for m in first.json()] == ["page-b", "page-c"]
+    cursor = first.headers["offset"]
+    assert cursor != "0"
+
+    # An insert before the cursor neither shifts nor duplicates later pages.
+    _create(client, h, "page-a")
+    seen: List[str] = []
+    while cursor != "0":
+        r = client.post("/artifacts", params={"offset": cursor}, json=queries, headers=h)
+        seen += [m["name"] for m in r.json()]
+        cursor = r.headers["offset"]
+    assert seen == ["page-d", "page-e"]
+
+
+def test_legacy_integer_offset_and_bad_cursor(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    monkeypatch.setenv("ARTIFACTS_PAGE_SIZE", "2")
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    names = ["legacy-a", "legacy-b", "legacy-c"]
+    for n in names:
+        _create(client, h, n)
+    queries = [{"name": n} for n in names]
+
+    r = client.post("/artifacts", params={"offset": "1"}, json=queries, headers=h)
+    assert [m["name"] for m in r.json()] == ["legacy-b", "legacy-c"]
+    assert r.headers["offset"] == "0"
+
+    # Past the end, a legacy offset starts over (at the end, the page is empty).
+    r = client.post("/artifacts", params={"offset": "7"}, json=queries, headers=h)
+    assert [m["name"] for m in r.json()] == ["legacy-a", "legacy-b"]
+    assert r.headers["offset"] == "2"
+    r = client.post("/artifacts", params={"offset": "3"}, json=queries, headers=h)
+    assert r.json() == []
+    assert r.headers["offset"] == "0"
+
+    bad = client.post("/artifacts", params={"offset": "not-a-cursor"}, json=queries, headers=h)
+    assert bad.status_code == 400
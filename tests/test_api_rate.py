@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import rating_executor
+from src.api.main import app
+from src.registry.models import ModelScore
+
+
+def _fake_model_score(url: str) -> ModelScore:
+    return ModelScore(
+        name=url.rsplit("/", 1)[-1],
+        category="MODEL",
+        ramp_up_time=0.5, ramp_up_time_latency=1,
+        bus_factor=0.5, bus_factor_latency=1,
+        performance_claims=0.5, performance_claims_latency=1,
+        license=1.0, license_latency=1,
+        size_score={"raspberry_pi": 1.0, "jetson_nano": 1.0, "desktop_pc": 1.0, "aws_server": 1.0},
+        size_score_latency=1,
+        dataset_and_code_score=0.5, dataset_and_code_score_latency=1,
+        dataset_quality=0.5, dataset_quality_latency=1,
+        code_quality=0.5, code_quality_latency=1,
+        net_score=0.6, net_score_latency=1,
+    )
+
+
+def _slow_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+    time.sleep(1.0)
+    return _fake_model_score(url)
+
+
+def _ingest_model(client: TestClient, tok: str, url: str) -> str:
+    resp = client.post("/artifact/model", json={"url": url}, headers={"X-Authorization": tok})
+    return resp.json()["metadata"]["id"]
+
+
+def test_rate_does_not_block_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    monkeypatch.setattr("src.api.main.score_model", _slow_score_model)
+
+    with TestClient(app) as client:
+        tok = client.put("/authenticate", json=admin_auth).json()
+        mid = _ingest_model(client, tok, "https://huggingface.co/org/slow-rate-model")
+
+        rate_resp: Dict[str, Any] = {}
+
+        def rate() -> None:
+            r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+            rate_resp["status"] = r.status_code
+            rate_resp["body"] = r.json()
+
+        t = threading.Thread(target=rate)
+        t.start()
+        time.sleep(0.2)
+
+        t0 = time.perf_counter()
+        health = client.get("/health")
+        health_elapsed = time.perf_counter() - t0
+        t.join()
+
+    assert health.status_code == 200
+    assert health_elapsed < 0.5
+    assert rate_resp["status"] == 200
+    assert rate_resp["body"]["net_score"] == pytest.approx(0.6)
+
+
+def test_rate_returns_503_when_queue_is_full(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    monkeypatch.setattr("src.api.main.score_model", _slow_score_model)
+    monkeypatch.setattr(rating_executor, "_executor", rating_executor.RatingExecutor(1, 1))
+
+    with TestClient(app) as client:
+        tok = client.put("/authenticate", json=admin_auth).json()
+        ids = [
+            _ingest_model(client, tok, "https://huggingface.co/org/busy-rate-model-1"),
+            _ingest_model(client, tok, "https://huggingface.co/org/busy-rate-model-2"),
+        ]
+
+        statuses = []
+
+        def rate(mid: str) -> None:
+            r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+            statuses.append(r.status_code)
+
+        threads = [threading.Thread(target=rate, args=(mid,)) for mid in ids]
+        for t in threads:
+            t.start()
+            time.sleep(0.2)
+        for t in threads:
+            t.join()
+
+    assert sorted(statuses) == [200, 503]
+
+
+def test_ingest_queues_rating_job_and_rate_serves_stored_result(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    calls = []
+
+    def counting_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        calls.append(url)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", counting_score_model)
+    monkeypatch.setenv("RATE_ON_INGEST", "1")
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    mid = _ingest_model(client, tok, "https://huggingface.co/org/queued-rate-model")
+
+    for _ in range(50):
+        status = client.get(
+            f"/artifact/model/{mid}/rate/status", headers={"X-Authorization": tok}
+        ).json()
+        if status["state"] == "done":
+            break
+        time.sleep(0.02)
+    assert status["state"] == "done"
+
+    for _ in range(3):
+        r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+        assert r.status_code == 200
+    assert calls == ["https://huggingface.co/org/queued-rate-model"]
+
+
+def test_ingest_queues_a_rating_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    from src.api import main
+
+    gate = threading.Event()
+
+    def gated_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        gate.wait(5)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", gated_score_model)
+    # Shipped default: ingest queues the rating (conftest turns it off).
+    monkeypatch.delenv("RATE_ON_INGEST")
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    mid = _ingest_model(client, tok, "https://example.com/org/default-ingest-rated")
+    job = main._rating_jobs.get(mid)
+    assert job is not None and job.state in ("queued", "running")
+
+    gate.set()
+    r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+    assert r.status_code == 200
+    assert main._rating_jobs.get(mid) is job
+
+
+def test_deferred_ingest_returns_202_and_rate_404_until_rated(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    gate = threading.Event()
+
+    def gated_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        gate.wait(5)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", gated_score_model)
+    monkeypatch.setenv("RATE_ON_INGEST", "1")
+    monkeypatch.setenv("RATE_DEFERRED", "1")
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    resp = client.post(
+        "/artifact/model",
+        json={"url": "https://huggingface.co/org/deferred-rate-model"},
+        headers={"X-Authorization": tok},
+    )
+    assert resp.status_code == 202
+    mid = resp.json()["metadata"]["id"]
+
+    rate = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+    assert rate.status_code == 404
+
+    gate.set()
+    for _ in range(50):
+        r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+        if r.status_code == 200:
+            break
+        time.sleep(0.02)
+    assert r.status_code == 200
+
+
+def test_rate_cache_is_invalidated_by_context_changes(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    contexts = []
+
+    def recording_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        contexts.append(dict(related_context))
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", recording_score_model)
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+    mid = _ingest_model(client, tok, "https://example.com/org/cached-rate-model")
+
+    for _ in range(3):
+        assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    assert len(contexts) == 1
+
+    # A newer dataset changes the injected context, so the next /rate re-scores.
+    dataset_url = "https://huggingface.co/datasets/org/cached-rate-dataset"
+    client.post("/artifact/dataset", json={"url": dataset_url}, headers=h)
+    assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    assert len(contexts) == 2
+    assert contexts[-1]["dataset_link"] == dataset_url
+
+
+def test_rate_cache_is_invalidated_by_new_upstream_revision(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    calls = []
+    revision = ["a" * 40]
+
+    def counting_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        calls.append(url)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", counting_score_model)
+    monkeypatch.setattr("src.api.main._upstream_revision", lambda url: revision[0])
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+    mid = _ingest_model(client, tok, "https://huggingface.co/org/revisioned-rate-model")
+
+    client.get(f"/artifact/model/{mid}/rate", headers=h)
+    client.get(f"/artifact/model/{mid}/rate", headers=h)
+    assert len(calls) == 1
+
+    revision[0] = "b" * 40
+    client.get(f"/artifact/model/{mid}/rate", headers=h)
+    assert len(calls) == 2
+
+
+def test_rate_rechecks_upstream_revision_after_snapshot_expires(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    import huggingface_hub
+
+    from src.registry.hf_snapshot import clear_hf_snapshots, get_hf_snapshot
+
+    calls = []
+    sha = ["a" * 40]
+
+    def fake_model_info(repo_id: str, **kwargs: Any) -> Any:
+        return SimpleNamespace(sha=sha[0], card_data=None, siblings=[], downloads=0)
+
+    def snapshot_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        calls.append(get_hf_snapshot("org/expiring-revision-model").sha)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr(huggingface_hub, "model_info", fake_model_info)
+    monkeypatch.setattr("src.api.main.score_model", snapshot_score_model)
+    monkeypatch.setenv("METADATA_TTL_HF_MODEL_INFO_S", "0")
+
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    mid = _ingest_model(
+        client, h["X-Authorization"], "https://huggingface.co/org/expiring-revision-model"
+    )
+    assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    # Snapshot expired, upstream unchanged: the rating is still current.
+    clear_hf_snapshots()
+    assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    assert calls == ["a" * 40]
+
+    # Snapshot expired and upstream moved on: fetched again and re-scored.
+    clear_hf_snapshots()
+    sha[0] = "b" * 40
+    assert client.get(f"/artifact/model/{mid}/rate", headers=h).status_code == 200
+    assert calls == ["a" * 40, "b" * 40]
+
+
+def test_rate_waiter_follows_superseding_job(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    import asyncio
+
+    from src.api import main
+
+    gate = threading.Event()
+
+    def gated_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        gate.wait(5)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", gated_score_model)
+    monkeypatch.setattr(rating_executor, "_executor", rating_executor.RatingExecutor(1, 4))
+    monkeypatch.setenv("RATE_ON_INGEST", "0")
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    mid = _ingest_model(client, tok, "https://example.com/org/superseded-rate-model")
+    # Occupy the only worker so the model's jobs stay queued.
+    main._rating_jobs.submit("supersede-blocker", gate.wait, 5)
+
+    async def waiters() -> None:
+        first = asyncio.ensure_future(main.model_rate(mid, x_authorization=tok))
+        await asyncio.sleep(0.1)
+        superseded = main._rating_jobs.get(mid)
+        # A newer dataset changes the rating key; the next /rate replaces the queued job.
+        client.post(
+            "/artifact/dataset",
+            json={"url": "https://example.com/datasets/superseding-dataset"},
+            headers={"X-Authorization": tok},
+        )
+        second = asyncio.ensure_future(main.model_rate(mid, x_authorization=tok))
+        await asyncio.sleep(0.1)
+        assert superseded is not None and superseded.future is not None
+        assert superseded.future.cancelled()
+        gate.set()
+        ratings = await asyncio.gather(first, second)
+        assert [r.name for r in ratings] == ["superseded-rate-model"] * 2
+
+    asyncio.run(waiters())
+    main._rating_jobs.discard("supersede-blocker")
+
+
+def test_rate_client_disconnect_does_not_cancel_shared_job(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    import asyncio
+
+    from src.api import main
+
+    gate = threading.Event()
+
+    def gated_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        gate.wait(5)
+        return _fake_model_score(url)
+
+    monkeypatch.setattr("src.api.main.score_model", gated_score_model)
+    monkeypatch.setattr(rating_executor, "_executor", rating_executor.RatingExecutor(1, 4))
+    monkeypatch.setenv("RATE_ON_INGEST", "0")
+
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    mid = _ingest_model(client, tok, "https://example.com/org/disconnect-rate-model")
+    # Occupy the only worker so the model's job stays queued.
+    main._rating_jobs.submit("disconnect-blocker", gate.wait, 5)
+
+    async def disconnecting_client() -> None:
+        waiter = asyncio.ensure_future(main.model_rate(mid, x_authorization=tok))
+        await asyncio.sleep(0.1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(disconnecting_client())
+    job = main._rating_jobs.get(mid)
+    assert job is not None and job.future is not None and not job.future.cancelled()
+
+    gate.set()
+    r = client.get(f"/artifact/model/{mid}/rate", headers={"X-Authorization": tok})
+    assert r.status_code == 200
+    main._rating_jobs.discard("disconnect-blocker")
+
+
+def test_deferred_failed_rating_is_dropped_on_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    from src.api import main
+
+    dropped_on = []
+    real_drop = main._drop_unrated_artifact
+
+    def recording_drop(artifact_id: str) -> None:
+        dropped_on.append(threading.current_thread().name)
+        real_drop(artifact_id)
+
+    def failing_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr("src.api.main.score_model", failing_score_model)
+    monkeypatch.setattr("src.api.main._drop_unrated_artifact", recording_drop)
+    monkeypatch.setenv("RATE_ON_INGEST", "1")
+    monkeypatch.setenv("RATE_DEFERRED", "1")
+
+    with TestClient(app) as client:
+        h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+        resp = client.post(
+            "/artifact/model", json={"url": "https://example.com/org/failing-deferred"}, headers=h
+        )
+        assert resp.status_code == 202
+        mid = resp.json()["metadata"]["id"]
+        for _ in range(100):
+            if client.get(f"/artifacts/model/{mid}", headers=h).status_code == 404:
+                break
+            time.sleep(0.02)
+        assert client.get(f"/artifacts/model/{mid}", headers=h).status_code == 404
+    assert dropped_on and not dropped_on[0].startswith("rating")
+
+
+def test_deferred_ingest_with_full_queue_is_rejected(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    monkeypatch.setattr("src.api.main.score_model", _slow_score_model)
+    monkeypatch.setattr(rating_executor, "_executor", rating_executor.RatingExecutor(1, 1))
+    # Shipped default: ingest queues the rating (conftest turns it off).
+    monkeypatch.delenv("RATE_ON_INGEST")
+    monkeypatch.setenv("RATE_DEFERRED", "1")
+
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    first = client.post(
+        "/artifact/model", json={"url": "https://example.com/org/full-queue-1"}, headers=h
+    )
+    second = client.post(
+        "/artifact/model", json={"url": "https://example.com/org/full-queue-2"}, headers=h
+    )
+    assert (first.status_code, second.status_code) == (202, 503)
+    # The rejected artifact was not kept, so the client can simply retry.
+    found = client.post("/artifact/byRegEx", json={"regex": "full-queue-2"}, headers=h)
+    assert found.status_code == 404
@@ -0,0 +1,173 @@
+"""
+Tests for the artifact store's secondary indexes.
+"""
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from fastapi.testclient import TestClient
+
+from src.api.artifact_index import ArtifactIndex, required_literals
+from src.api.main import app
+
+
+@dataclass(frozen=True)
+class _A:
+    id: str
+    type: str
+    name: str
+    url: str
+    created_at_ms: int = 0
+
+
+def test_index_lookups_follow_add_and_remove() -> None:
+    idx = ArtifactIndex()
+    a = _A("1", "model", "bert", "https://huggingface.co/Org/bert")
+    b = _A("2", "dataset", "bert", "https://huggingface.co/datasets/org/bert")
+    c = _A("3", "model", "albert", "https://huggingface.co/org/albert")
+    for x in (a, b, c):
+        idx.add(x)
+
+    assert idx.ids_by_name("bert") == ["1", "2"]
+    assert idx.ids_by_type("model") == ["1", "3"]
+    assert idx.id_by_url("model", "https://huggingface.co/org/BERT ") == "1"
+    assert idx.id_by_url("dataset", "https://huggingface.co/org/bert") is None
+    assert idx.ids_by_leaf("dataset", "bert") == ["2"]
+    assert list(idx.ordered()) == [
+        ("albert", "model", "3"),
+        ("bert", "dataset", "2"),
+        ("bert", "model", "1"),
+    ]
+    assert list(idx.ordered(["model"])) == [("albert", "model", "3"), ("bert", "model", "1")]
+    assert list(idx.ordered(after=("bert", "dataset", "2"))) == [("bert", "model", "1")]
+    assert [e[2] for e in idx.ordered(after=("b", "", ""))] == ["2", "1"]
+
+    idx.remove(a)
+    assert idx.ids_by_name("bert") == ["2"]
+    assert idx.id_by_url("model", a.url) is None
+    assert len(idx) == 2
+
+
+def test_latest_by_type_survives_deletes_and_replacements() -> None:
+    idx = ArtifactIndex()
+    old = _A("1", "dataset", "squad", "https://example.com/d/squad", created_at_ms=10)
+    new = _A("2", "dataset", "glue", "https://example.com/d/glue", created_at_ms=20)
+    tie = _A("3", "dataset", "mnli", "https://example.com/d/mnli", created_at_ms=20)
+    for x in (old, new, tie):
+        idx.add(x)
+    assert idx.latest("dataset") == "2"
+    assert idx.latest("code") is None
+
+    # Updates keep created_at_ms and the insertion rank of the replaced entry.
+    renamed = _A("2", "dataset", "glue2", "https://example.com/d/glue2", created_at_ms=20)
+    idx.add(renamed, seq=idx.remove(new))
+    assert idx.latest("dataset") == "2"
+
+    idx.remove(renamed)
+    assert idx.latest("dataset") == "3"
+    idx.remove(tie)
+    assert idx.latest("dataset") == "1"
+    idx.remove(old)
+    assert idx.latest("dataset") is None
+
+
+def test_resolve_identifier_priority() -> None:
+    idx = ArtifactIndex()
+    leaf_only = _A("1", "model", "other/bert", "https://example.com/x/other-bert")
+    by_url = _A("2", "model", "bert-copy", "https://huggingface.co/Google/BERT/tree/main")
+    by_name = _A("3", "model", "google/bert", "https://example.com/y/z")
+    partial = _A("4", "model", "m", "https://huggingface.co/google/bert-large")
+    for x in (leaf_only, by_url, by_name, partial):
+        idx.add(x)
+
+    # Name and URL-path matches outrank leaf matches; the earliest ingest wins.
+    assert idx.resolve_identifier("model", "google/bert") == "2"
+    idx.remove(by_url)
+    assert idx.resolve_identifier("model", "Google/Bert ") == "3"
+    # URL path runs are whole segments, so "bert-large" resolves to its own artifact.
+    assert idx.resolve_identifier("model", "bert-large") == "4"
+    assert idx.resolve_identifier("model", "acme/bert") == "1"
+    assert idx.resolve_identifier("dataset", "google/bert") is None
+    assert idx.resolve_identifier("model", "") is None
+
+
+def test_endpoints_see_created_updated_and_deleted_artifacts(admin_auth: Dict[str, Any]) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+
+    created = client.post(
+        "/artifact/code", json={"url": "https://github.com/idx-org/idx-tool"}, headers=h
+    ).json()
+    aid = created["metadata"]["id"]
+
+    listed = client.post("/artifacts", json=[{"name": "idx-tool"}], headers=h).json()
+    assert [m["id"] for m in listed] == [aid]
+
+    body = {
+        "metadata": {"name": "idx-tool-renamed", "id": aid, "type": "code"},
+        "data": {"url": "https://github.com/idx-org/idx-tool-renamed"},
+    }
+    assert client.put(f"/artifacts/code/{aid}", json=body, headers=h).status_code == 200
+    assert client.get("/artifact/byName/idx-tool", headers=h).status_code == 404
+    renamed = client.get("/artifact/byName/idx-tool-renamed", headers=h).json()
+    assert [m["id"] for m in renamed] == [aid]
+
+    wildcard = client.post("/artifacts", json=[{"name": "*", "types": ["code"]}], headers=h).json()
+    assert aid in [m["id"] for m in wildcard]
+    assert wildcard == sorted(wildcard, key=lambda m: (m["name"], m["type"], m["id"]))
+
+    assert client.delete(f"/artifacts/code/{aid}", headers=h).status_code == 200
+    assert client.get("/artifact/byName/idx-tool-renamed", headers=h).status_code == 404
+
+
+def test_required_literals_only_keeps_mandatory_runs() -> None:
+    assert required_literals("Bert.*Base") == ["bert", "base"]
+    assert required_literals("ab*cdef") == ["cdef"]
+    assert required_literals("bert|gpt") == []
+    assert required_literals("(bert)-base") == ["-base"]
+    assert required_literals("[") == []
+    assert required_literals(r"bert\.base-v\d+") == ["bert.base-v"]
+    assert required_literals("x[a|b]yzw(c|d)efg") == ["yzw", "efg"]
+    assert required_literals("abcd{0,2}e+xyz") == ["abc", "xyz"]
+    assert required_literals("(?x) bert base") == []
+
+
+def test_regex_candidates_narrow_by_trigrams() -> None:
+    idx = ArtifactIndex()
+    idx.add(_A("1", "model", "bert-base", "https://huggingface.co/org/bert-base"))
+    idx.add(_A("2", "model", "gpt2", "https://huggingface.co/org/gpt2"))
+    # KELVIN SIGN folds to "k" under IGNORECASE, so non-ASCII text always qualifies.
+    idx.add(_A("3", "model", "\u212aeras-model", "https://example.com/\u212aeras"))
+
+    assert idx.regex_candidates(["bert"]) == {"1", "3"}
+    assert idx.regex_candidates(["gpt", "bert"]) == {"3"}
+    assert idx.regex_candidates([]) is None
+
+    # Once built, the postings follow adds and removes; pickles leave them out.
+    bert_large = _A("4", "model", "bert-large", "https://huggingface.co/org/bert-large")
+    idx.add(bert_large)
+    idx.remove(_A("1", "model", "bert-base", "https://huggingface.co/org/bert-base"))
+    assert idx.regex_candidates(["bert"]) == {"3", "4"}
+    clone = pickle.loads(pickle.dumps(idx))
+    assert clone._by_trigram is None
+    assert clone.regex_candidates(["bert"]) == {"3", "4"}
+
+
+def test_regex_search_uses_prefilter_and_full_regex(admin_auth: Dict[str, Any]) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+    ids = {}
+    for name in ("trigram-alpha", "trigram-beta"):
+        created = client.post(
+            "/artifact/model", json={"url": f"https://example.com/org/{name}"}, headers=h
+        ).json()
+        ids[name] = created["metadata"]["id"]
+
+    hits = client.post("/artifact/byRegEx", json={"regex": "TRIGRAM-al.ha$"}, headers=h).json()
+    assert [m["id"] for m in hits] == [ids["trigram-alpha"]]
+    miss = client.post("/artifact/byRegEx", json={"regex": "trigram-gamma"}, headers=h)
+    assert miss.status_code == 404
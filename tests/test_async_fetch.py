@@ -0,0 +1,72 @@
+"""
+Tests for the asyncio fetch layer (per-host concurrency and enrichment).
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+
+import pytest
+
+from src.registry import async_fetch
+
+
+def test_async_fetch_overlaps_calls_and_respects_host_limit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Calls to one host never exceed the limit; different hosts overlap freely."""
+    lock = threading.Lock()
+    in_flight: Dict[str, int] = {}
+    peak: Dict[str, int] = {}
+
+    def fake_fetch(url: str) -> Dict[str, Any]:
+        host = async_fetch._host_of(url)
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+        time.sleep(0.1)
+        with lock:
+            in_flight[host] -= 1
+        return {"url": url}
+
+    monkeypatch.setattr(async_fetch, "fetch_repo_info", fake_fetch)
+    monkeypatch.setenv("FETCH_HOST_CONCURRENCY", "2")
+
+    urls = [f"https://github.com/org/repo{i}" for i in range(6)]
+    urls += [f"https://huggingface.co/org/model{i}" for i in range(2)]
+
+    async def run() -> list:
+        return await asyncio.gather(*(async_fetch.async_fetch_repo_info(u) for u in urls))
+
+    t0 = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - t0
+
+    assert [r["url"] for r in results] == urls
+    assert peak["github.com"] == 2
+    assert peak["huggingface.co"] == 2
+    # 6 github calls at 2-wide = 3 rounds; sequential would be 8 rounds.
+    assert elapsed < 0.6
+
+
+def test_async_enrich_context_applies_code_signals(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Code repo signals are merged; non-HF URLs never hit the Hub."""
+    def fake_fetch(url: str) -> Dict[str, Any]:
+        return {"url": url, "has_tests": True, "has_ci": True, "git_contributors": 4}
+
+    monkeypatch.setattr(async_fetch, "fetch_repo_info", fake_fetch)
+
+    repo_info: Dict[str, Any] = {
+        "url": "https://example.com/org/model",
+        "hf_readme": "",
+        "code_link": "https://github.com/org/code",
+        "dataset_link": "",
+    }
+    asyncio.run(async_fetch.async_enrich_context(repo_info))
+
+    assert repo_info["has_tests"] is True
+    assert repo_info["has_ci"] is True
+    assert repo_info["git_contributors"] == 4
+    assert repo_info["hf_readme"] == ""
@@ -0,0 +1,194 @@
+"""
+Tests for the persistent bare-mirror clone cache.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from git import Actor, Repo
+
+from src.registry import clone_cache, url_parser
+from src.registry.clone_cache import CloneCache, head_files
+from src.registry.metadata_cache import get_metadata_cache
+
+AUTHOR = Actor("Dev One", "dev1@example.com")
+
+
+def _make_upstream(path: Path) -> Repo:
+    repo = Repo.init(path)
+    (path / "README.md").write_text("# Upstream\nExample quickstart.\n")
+    (path / "tests").mkdir()
+    (path / "tests" / "test_model.py").write_text("def test_x():\n    pass\n")
+    (path / "model.safetensors").write_bytes(b"\0" * 4096)
+    repo.index.add(["README.md", "tests/test_model.py", "model.safetensors"])
+    repo.index.commit("initial", author=AUTHOR, committer=AUTHOR)
+    return repo
+
+
+def _commit_file(repo: Repo, name: str, data: str) -> None:
+    Path(repo.working_tree_dir, name).write_text(data)
+    repo.index.add([name])
+    repo.index.commit(f"add {name}", author=AUTHOR, committer=AUTHOR)
+
+
+def test_mirror_is_reused_and_fetched_incrementally(tmp_path: Path) -> None:
+    upstream = _make_upstream(tmp_path / "upstream")
+    url = (tmp_path / "upstream").as_uri()
+    cache = CloneCache(str(tmp_path / "cache"), refresh_s=0)
+
+    path = cache.mirror(url)
+    assert Repo(path).bare
+    assert "README.md" in dict(head_files(path))
+
+    _commit_file(upstream, "NEW.md", "new\n")
+    assert cache.mirror(url) == path
+    assert "NEW.md" in dict(head_files(path))
+
+
+def test_fetch_github_info_reads_from_mirror(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _make_upstream(tmp_path / "upstream")
+    cache = CloneCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(url_parser, "get_clone_cache", lambda: cache)
+
+    info: Dict[str, Any] = {}
+    url_parser._fetch_github_info((tmp_path / "upstream").as_uri(), info)
+
+    assert info["git_contributors"] == 1
+    assert info["has_tests"] is True
+    assert info["weights_total_bytes"] == 4096
+    assert info["hf_readme"].startswith("# Upstream")
+    # Nothing is checked out: the cache only holds bare mirrors.
+    assert all(name.endswith((".git", ".lock")) for name in os.listdir(cache.root))
+
+
+def test_least_recently_used_mirror_is_evicted(tmp_path: Path) -> None:
+    for name in ("a", "b"):
+        _make_upstream(tmp_path / name)
+    cache = CloneCache(str(tmp_path / "cache"))
+
+    first = cache.mirror((tmp_path / "a").as_uri())
+    cache.max_bytes = cache.total_bytes()
+    second = cache.mirror((tmp_path / "b").as_uri())
+
+    assert not os.path.exists(first)
+    assert os.path.isdir(second)
+
+
+def test_mirror_in_use_is_not_evicted(tmp_path: Path) -> None:
+    for name in ("a", "b"):
+        _make_upstream(tmp_path / name)
+    cache = CloneCache(str(tmp_path / "cache"))
+
+    with cache.reading((tmp_path / "a").as_uri()) as first:
+        cache.max_bytes = cache.total_bytes()
+        second = cache.mirror((tmp_path / "b").as_uri())
+        # Over budget, but the LRU mirror is being read: it stays.
+        assert "README.md" in dict(head_files(first))
+    assert os.path.isdir(second)
+
+    cache.mirror((tmp_path / "b").as_uri())
+    assert not os.path.exists(first)
+
+
+def test_eviction_check_uses_recorded_mirror_sizes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for name in ("a", "b"):
+        _make_upstream(tmp_path / name)
+    cache = CloneCache(str(tmp_path / "cache"))
+    cache.mirror((tmp_path / "a").as_uri())
+    second = cache.mirror((tmp_path / "b").as_uri())
+
+    walked: List[str] = []
+    real_dir_size = clone_cache._dir_size
+    monkeypatch.setattr(
+        clone_cache, "_dir_size", lambda p: walked.append(p) or real_dir_size(p)
+    )
+    # Up to date: nothing is cloned or fetched, so no mirror is measured.
+    assert cache.mirror((tmp_path / "b").as_uri()) == second
+    assert walked == []
+
+    cache.refresh_s = 0
+    cache.mirror((tmp_path / "b").as_uri())
+    assert walked == [second]
+
+
+def test_unknown_blob_size_makes_totals_unknown(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    upstream = _make_upstream(tmp_path / "upstream")
+    upstream.git.config("uploadpack.allowFilter", "true")
+    cache = CloneCache(str(tmp_path / "cache"), blob_limit=1024)
+    monkeypatch.setattr(url_parser, "get_clone_cache", lambda: cache)
+
+    info = url_parser._analyze_github_repo((tmp_path / "upstream").as_uri())
+
+    # model.safetensors (4 KiB) was left out of the clone: don't undercount it.
+    assert info["weights_total_bytes"] is None
+    assert info["repo_total_bytes"] is None
+    assert info["has_tests"] is True
+
+
+def test_partial_clone_sizes_files_without_downloading_large_blobs(tmp_path: Path) -> None:
+    upstream = _make_upstream(tmp_path / "upstream")
+    upstream.git.config("uploadpack.allowFilter", "true")
+    pointer = (
+        "version https://git-lfs.github.com/spec/v1\n"
+        "oid sha256:" + "ab" * 32 + "\n"
+        "size 123456789\n"
+    )
+    _commit_file(upstream, "pytorch_model.bin", pointer)
+    cache = CloneCache(str(tmp_path / "cache"), blob_limit=1024)
+
+    path = cache.mirror((tmp_path / "upstream").as_uri())
+    files = dict(head_files(path))
+
+    big_oid = upstream.head.commit.tree["model.safetensors"].hexsha
+    missing = Repo(path).git.rev_list("--objects", "--missing=print", "--no-walk", "HEAD")
+    assert f"?{big_oid}" in missing.splitlines()
+    # Filtered-out blobs have an unknown size ...
+    assert files["model.safetensors"] is None
+    # ... and git-lfs pointers report the size of the real file.
+    assert files["pytorch_model.bin"] == 123456789
+    assert files["README.md"] == len("# Upstream\nExample quickstart.\n")
+    # Listing sizes did not lazily fetch the big blob.
+    assert f"?{big_oid}" in Repo(path).git.rev_list(
+        "--objects", "--missing=print", "--no-walk", "HEAD"
+    ).splitlines()
+
+
+def test_github_repo_size_never_clones(monkeypatch: pytest.MonkeyPatch) -> None:
+    def no_clones() -> CloneCache:
+        raise AssertionError("sizing a repo must not mirror it")
+
+    class _Response:
+        def raise_for_status(self) -> None:
+            pass
+
+        def json(self) -> Dict[str, Any]:
+            return {"full_name": "org/sized-tool", "size": 250}
+
+    api_calls: List[str] = []
+
+    def fake_get(url: str, **kwargs: Any) -> _Response:
+        api_calls.append(url)
+        return _Response()
+
+    monkeypatch.setattr(url_parser, "get_clone_cache", no_clones)
+    monkeypatch.setattr("requests.get", fake_get)
+
+    url = "https://github.com/org/sized-tool"
+    assert url_parser.fetch_repo_size(url) == 250 * 1024
+    assert url_parser.fetch_repo_size(url + ".git") == 250 * 1024
+    assert api_calls == ["https://api.github.com/repos/org/sized-tool"]
+
+    # An analysis already cached from a rating is used as-is.
+    get_metadata_cache().put("repo_analysis", url, {"repo_total_bytes": 4096})
+    assert url_parser.fetch_repo_size(url) == 4096
+    assert len(api_calls) == 1
@@ -0,0 +1,176 @@
+"""
+Tests for the shared Hugging Face repo snapshot and weight sizing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.registry import hf_snapshot, scorer, url_parser
+
+
+@dataclass
+class _Sibling:
+    rfilename: str
+    size: Optional[int] = None
+    lfs: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _FakeInfo:
+    id: str
+    sha: str
+    siblings: List[_Sibling] = field(default_factory=list)
+    card_data: Dict[str, Any] = field(default_factory=dict)
+    downloads: int = 0
+
+
+class _StubHub:
+    """Answers model_info() calls from a fixed listing and records them."""
+
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    def __call__(
+        self, repo_id: str, revision: Optional[str] = None, files_metadata: bool = False
+    ) -> _FakeInfo:
+        self.calls.append({"repo_id": repo_id, "revision": revision, "files": files_metadata})
+        return _FakeInfo(
+            id=repo_id,
+            sha="a" * 40,
+            siblings=[
+                _Sibling("README.md", size=2_000),
+                _Sibling("config.json", size=500),
+                _Sibling("model.safetensors", size=None, lfs={"size": 300_000_000}),
+                _Sibling("pytorch_model.bin", size=200_000_000),
+            ],
+            card_data={"license": "apache-2.0", "base_model": "org/base"},
+            downloads=42,
+        )
+
+
+@pytest.fixture
+def stub_hub(monkeypatch: pytest.MonkeyPatch) -> _StubHub:
+    hub = _StubHub()
+    monkeypatch.setattr("huggingface_hub.model_info", hub)
+    return hub
+
+
+def test_weights_total_bytes_sums_weight_siblings(stub_hub: _StubHub) -> None:
+    info: Dict[str, Any] = {}
+    url_parser._fetch_huggingface_info("https://huggingface.co/org/sized-model", info)
+
+    assert info["weights_total_bytes"] == 500_000_000
+    assert info["license"] == "apache-2.0"
+    assert info["dataset_downloads"] == 42
+    assert stub_hub.calls == [{"repo_id": "org/sized-model", "revision": None, "files": True}]
+
+
+def test_unknown_file_size_makes_totals_unknown() -> None:
+    snapshot = hf_snapshot.HFRepoSnapshot(
+        repo_id="org/partly-sized",
+        sha="a" * 40,
+        card_data={},
+        files=(("README.md", 2_000), ("model.safetensors", None), ("model.bin", 100)),
+    )
+
+    # One weight file has no size: a partial sum would undercount it.
+    assert snapshot.weights_total_bytes is None
+    assert snapshot.total_bytes is None
+
+
+def test_scoring_and_lineage_share_one_hub_call(
+    stub_hub: _StubHub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    downloads: List[str] = []
+
+    def fake_download(repo_id: str, filename: str, revision: Optional[str] = None) -> str:
+        downloads.append(repo_id)
+        raise OSError("offline")
+
+    monkeypatch.setattr("huggingface_hub.hf_hub_download", fake_download)
+
+    url = "https://huggingface.co/org/shared-model"
+    info: Dict[str, Any] = {}
+    url_parser._fetch_huggingface_info(url, info)
+    scorer._download_hf_readme("org/shared-model")
+    scorer._download_hf_readme("org/shared-model")
+    card = hf_snapshot.get_hf_snapshot("org/shared-model").card_data
+
+    assert card["base_model"] == "org/base"
+    assert len(stub_hub.calls) == 1
+    # The README is fetched once per snapshot, even when the download fails.
+    assert downloads == ["org/shared-model"]
+
+
+def test_failed_fetch_is_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    def failing(repo_id: str, **kwargs: Any) -> _FakeInfo:
+        raise OSError("hub down")
+
+    monkeypatch.setattr("huggingface_hub.model_info", failing)
+    with pytest.raises(OSError):
+        hf_snapshot.get_hf_snapshot("org/flaky-model")
+
+    hub = _StubHub()
+    monkeypatch.setattr("huggingface_hub.model_info", hub)
+    assert hf_snapshot.get_hf_snapshot("org/flaky-model").sha == "a" * 40
+
+
+def test_tree_url_pins_revision() -> None:
+    assert url_parser.hf_model_ref("https://huggingface.co/org/m/tree/v1.0") == ("org/m", "v1.0")
+    assert url_parser.hf_model_ref("https://huggingface.co/org/m/") == ("org/m", None)
+
+
+def test_fetch_repo_size_for_models_and_datasets(
+    stub_hub: _StubHub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    dataset_calls: List[str] = []
+
+    def fake_dataset_info(repo_id: str, files_metadata: bool = False) -> _FakeInfo:
+        dataset_calls.append(repo_id)
+        return _FakeInfo(id=repo_id, sha="b" * 40, siblings=[_Sibling("train.parquet", size=7_000)])
+
+    monkeypatch.setattr("huggingface_hub.dataset_info", fake_dataset_info)
+
+    assert url_parser.fetch_repo_size("https://huggingface.co/org/sized-model") == 500_002_500
+    url = "https://huggingface.co/datasets/org/sized-data/tree/main"
+    assert url_parser.fetch_repo_size(url) == 7_000
+    assert url_parser.fetch_repo_size(url) == 7_000
+    assert dataset_calls == ["org/sized-data"]
+    assert url_parser.fetch_repo_size("https://example.com/org/unknown") is None
+
+
+def test_lineage_card_reads_pinned_revision(stub_hub: _StubHub) -> None:
+    from src.api import main
+
+    card = main._lineage_card("https://huggingface.co/org/pinned-model/tree/v1.0/config.json")
+
+    assert card["base_model"] == "org/base"
+    assert stub_hub.calls == [{"repo_id": "org/pinned-model", "revision": "v1.0", "files": True}]
+
+
+def test_readme_is_cached_by_commit_only(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    downloads: List[Optional[str]] = []
+
+    def fake_download(repo_id: str, filename: str, revision: Optional[str] = None) -> str:
+        downloads.append(revision)
+        (tmp_path / filename).write_text("# Readme model\n")
+        return str(tmp_path / filename)
+
+    monkeypatch.setattr("huggingface_hub.hf_hub_download", fake_download)
+
+    def snapshot(sha: Optional[str]) -> hf_snapshot.HFRepoSnapshot:
+        return hf_snapshot.HFRepoSnapshot(
+            repo_id="org/readme-model", sha=sha, card_data={}, files=()
+        )
+
+    for sha in ("c" * 40, "c" * 40, None, None):
+        assert snapshot(sha).readme() == "# Readme model\n"
+
+    # Pinned to a commit: cached. Default branch: it may move, so refetched.
+    assert downloads == ["c" * 40, None, None]
@@ -0,0 +1,53 @@
+"""
+Import-time budget of the API and the CLI.
+
+Cold starts (a new Lambda container, a CLI run) pay for every module the
+entry point imports. GitPython, huggingface_hub and the scorer with its
+metrics are only needed to rate or analyze a repo, so importing the entry
+points must not load them.
+"""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+# Seconds our own modules may spend importing (children excluded); generous,
+# so only a real regression (e.g. work moved to module level) trips it.
+_OWN_SELF_TIME_BUDGET_S = 0.5
+
+
+def _import(module: str) -> Tuple[List[str], float]:
+    """Import module in a fresh interpreter: (loaded modules, own self time in s)."""
+    script = f"import json, sys\nimport {module}\nprint(json.dumps(sorted(sys.modules)))\n"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=_ROOT, capture_output=True, text=True, check=True, timeout=120,
+    )
+    self_us = 0
+    for line in proc.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented name>"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip().startswith("src."):
+            self_us += int(parts[0].split(":")[1])
+    return json.loads(proc.stdout.strip().splitlines()[-1]), self_us / 1e6
+
+
+@pytest.mark.parametrize(
+    "module, lazy",
+    [
+        ("src.api.main", ("git", "huggingface_hub", "src.registry.scorer", "src.registry.metrics")),
+        # The CLI exists to score, so only the network/VCS clients are deferred.
+        ("src.registry.cli", ("git", "huggingface_hub")),
+    ],
+)
+def test_entry_points_defer_heavy_imports(module: str, lazy: Tuple[str, ...]) -> None:
+    modules, own_self_s = _import(module)
+    assert [m for m in modules if m in lazy or m.startswith(tuple(f"{x}." for x in lazy))] == []
+    assert own_self_s < _OWN_SELF_TIME_BUDGET_S
@@ -0,0 +1,160 @@
+"""
+Tests for the lineage graph engine and multi-hop /lineage.
+"""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.lineage_graph import LineageGraph
+from src.api.main import app
+
+
+def _edge(src: str, dst: str, relationship: str = "base_model") -> dict:
+    return {"from_node_artifact_id": src, "to_node_artifact_id": dst, "relationship": relationship}
+
+
+def test_walks_are_depth_limited_in_both_directions() -> None:
+    g = LineageGraph()
+    g.add_edge("base", "ft1", "base_model")
+    g.add_edge("ft1", "ft2", "base_model")
+    g.add_edge("data", "ft2", "fine_tuning_dataset")
+
+    assert g.ancestors("ft2") == {"ft1": 1, "data": 1, "base": 2}
+    assert g.ancestors("ft2", max_depth=1) == {"ft1": 1, "data": 1}
+    assert g.descendants("base") == {"ft1": 1, "ft2": 2}
+    assert g.in_edges("ft2") == [
+        ("ft1", "ft2", "base_model"),
+        ("data", "ft2", "fine_tuning_dataset"),
+    ]
+
+
+def test_cycles_are_rejected() -> None:
+    g = LineageGraph()
+    assert g.add_edge("a", "b", "base_model")
+    assert g.add_edge("b", "c", "base_model")
+    assert not g.add_edge("c", "a", "base_model")
+    assert not g.add_edge("a", "a", "base_model")
+    assert g.set_parents("a", [("c", "base_model"), ("x", "base_model")]) == [("c", "base_model")]
+    assert g.parents("a") == [("x", "base_model")]
+
+
+def test_ancestor_closure_is_invalidated_below_changed_edges() -> None:
+    g = LineageGraph()
+    g.add_edge("base", "ft1", "base_model")
+    g.add_edge("ft1", "ft2", "base_model")
+    g.add_edge("other", "sibling", "base_model")
+    assert g.ancestor_closure("ft2") == {"ft1", "base"}
+    sibling = g.ancestor_closure("sibling")
+
+    g.set_parents("ft1", [("base2", "base_model")])
+    assert g.ancestor_closure("ft2") == {"ft1", "base2"}
+    # Unrelated memos survive.
+    assert g.ancestor_closure("sibling") is sibling
+
+    g.remove_node("ft1")
+    assert g.ancestor_closure("ft2") == frozenset()
+    assert "base2" not in g
+
+
+def test_lineage_endpoint_follows_base_model_chains(admin_auth: Dict[str, Any]) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+
+    base_url = "https://example.com/lineage-chain/base"
+    base = client.post("/artifact/model", json={"url": base_url}, headers=h).json()
+    ft1_url = "https://example.com/lineage-chain/ft1"
+    ft1 = client.post(
+        "/artifact/model", json={"url": ft1_url, "metadata": {"base_model": base_url}}, headers=h
+    ).json()
+    ft2 = client.post(
+        "/artifact/model",
+        json={"url": "https://example.com/lineage-chain/ft2", "metadata": {"base_model": ft1_url}},
+        headers=h,
+    ).json()
+    base_id, ft1_id, ft2_id = (x["metadata"]["id"] for x in (base, ft1, ft2))
+
+    direct = client.get(f"/artifact/model/{ft2_id}/lineage", headers=h).json()
+    assert {n["artifact_id"] for n in direct["nodes"]} == {ft1_id, ft2_id}
+    assert direct["edges"] == [_edge(ft1_id, ft2_id)]
+
+    full = client.get(f"/artifact/model/{ft2_id}/lineage?depth=0", headers=h).json()
+    assert {n["artifact_id"] for n in full["nodes"]} == {base_id, ft1_id, ft2_id}
+    assert _edge(base_id, ft1_id) in full["edges"]
+    assert len(full["edges"]) == 2
+
+
+def test_impact_lists_transitive_dependents_and_tracks_ingests(admin_auth: Dict[str, Any]) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+
+    def post(kind: str, url: str, **metadata: str) -> str:
+        body = {"url": url, "metadata": metadata}
+        return client.post(f"/artifact/{kind}", json=body, headers=h).json()["metadata"]["id"]
+
+    data_url = "https://example.com/impact/data"
+    model_url = "https://example.com/impact/model"
+    late_url = "https://example.com/impact/late-base"
+    data_id = post("dataset", data_url)
+    model_id = post("model", model_url, datasets=data_url)
+    ft_id = post("model", "https://example.com/impact/ft", base_model=model_url)
+    # Depends on a base model that is not registered yet.
+    orphan_id = post("model", "https://example.com/impact/orphan", base_model=late_url)
+
+    impact = client.get(f"/artifact/dataset/{data_id}/impact", headers=h).json()
+    assert [(d["artifact_id"], d["depth"]) for d in impact["dependents"]] == [
+        (model_id, 1),
+        (ft_id, 2),
+    ]
+    one_hop = client.get(f"/artifact/dataset/{data_id}/impact?depth=1", headers=h).json()
+    assert [d["artifact_id"] for d in one_hop["dependents"]] == [model_id]
+
+    # Ingesting the missing base resolves the orphan's external dependency.
+    late_id = post("model", late_url)
+    impact = client.get(f"/artifact/model/{late_id}/impact", headers=h).json()
+    assert [d["artifact_id"] for d in impact["dependents"]] == [orphan_id]
+
+    client.delete(f"/artifacts/model/{model_id}", headers=h)
+    impact = client.get(f"/artifact/dataset/{data_id}/impact", headers=h).json()
+    assert impact["dependents"] == []
+    assert client.get("/artifact/dataset/missing/impact", headers=h).status_code == 404
+
+
+def test_lineage_queries_fetch_card_data_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    import asyncio
+
+    on_loop = []
+
+    def fake_model_info(repo_id: str, **kwargs: Any) -> Any:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(repo_id)
+        except RuntimeError:
+            pass
+        card = {"base_model": "org/offloop-base"} if repo_id.endswith("-ft") else {}
+        return SimpleNamespace(sha=None, card_data=card, siblings=[], downloads=0)
+
+    monkeypatch.setattr("huggingface_hub.model_info", fake_model_info)
+    client = TestClient(app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+
+    def post(url: str) -> str:
+        resp = client.post("/artifact/model", json={"url": url}, headers=h)
+        return str(resp.json()["metadata"]["id"])
+
+    base_id = post("https://huggingface.co/org/offloop-base")
+    ft_id = post("https://huggingface.co/org/offloop-base-ft")
+
+    impact = client.get(f"/artifact/model/{base_id}/impact", headers=h).json()
+    assert [d["artifact_id"] for d in impact["dependents"]] == [ft_id]
+    lineage = client.get(f"/artifact/model/{ft_id}/lineage", headers=h).json()
+    assert base_id in {n["artifact_id"] for n in lineage["nodes"]}
+    assert on_loop == []
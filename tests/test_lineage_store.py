@@ -0,0 +1,62 @@
+"""
+Tests for the indexed lineage store in src/api/lineage.py.
+"""
+from __future__ import annotations
+
+from src.api import lineage
+
+
+def test_subgraph_uses_both_directions_and_depth() -> None:
+    lineage.clear_lineage()
+    for aid, name in (("1", "org/base"), ("2", "org/ft"), ("3", "org/ft2"), ("4", "org/data")):
+        lineage.add_artifact_node(aid, "model", name)
+    lineage.add_lineage_edge("1", "2", "base_model")
+    lineage.add_lineage_edge("1", "2", "base_model")
+    lineage.add_lineage_edge("2", "3", "base_model")
+    lineage.add_lineage_edge("4", "1", "fine_tuning_dataset")
+
+    one = lineage.build_lineage_subgraph("2")
+    assert {n["artifact_id"] for n in one["nodes"]} == {"1", "2", "3"}
+    assert len(one["edges"]) == 2
+
+    full = lineage.build_lineage_subgraph("2", depth=0)
+    assert {n["artifact_id"] for n in full["nodes"]} == {"1", "2", "3", "4"}
+    assert len(full["edges"]) == 3
+
+    assert lineage.find_artifact_by_name("org/ft") == "2"
+    lineage.add_artifact_node("2", "model", "org/renamed")
+    assert lineage.find_artifact_by_name("org/ft") is None
+    assert lineage.find_artifact_by_name("org/renamed") == "2"
+    lineage.clear_lineage()
+
+
+def test_subgraph_follows_ancestors_and_descendants_separately() -> None:
+    lineage.clear_lineage()
+    for aid in ("data", "base", "ft", "sibling", "child", "grandchild"):
+        lineage.add_artifact_node(aid, "model", f"org/{aid}")
+    lineage.add_lineage_edge("data", "base", "fine_tuning_dataset")
+    lineage.add_lineage_edge("base", "ft", "base_model")
+    lineage.add_lineage_edge("base", "sibling", "base_model")
+    lineage.add_lineage_edge("ft", "child", "base_model")
+    lineage.add_lineage_edge("child", "grandchild", "base_model")
+
+    sub = lineage.build_lineage_subgraph("ft", depth=2)
+    # A sibling shares an ancestor but is neither an ancestor nor a descendant.
+    assert {n["artifact_id"] for n in sub["nodes"]} == {"data", "base", "ft", "child", "grandchild"}
+    assert len(sub["edges"]) == 4
+
+    full = lineage.build_lineage_subgraph("ft", depth=0)
+    assert "sibling" not in {n["artifact_id"] for n in full["nodes"]}
+    lineage.clear_lineage()
+
+
+def test_bulk_edge_load_is_linear() -> None:
+    lineage.clear_lineage()
+    n = 100_000
+    for i in range(n):
+        lineage.add_lineage_edge(str(i), str(i + 1), "base_model")
+    lineage.add_artifact_node("500", "model", "m")
+    assert len(lineage.lineage_edges) == n
+    sub = lineage.build_lineage_subgraph("500")
+    assert len(sub["edges"]) == 2
+    lineage.clear_lineage()
@@ -0,0 +1,70 @@
+"""
+Tests for the TTL/LRU metadata cache and its shared SQLite store.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.registry import metadata_cache
+from src.registry.metadata_cache import MetadataCache
+
+
+def test_entries_expire_per_kind(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now[0])
+    cache = MetadataCache(None, ttls={"short": 10.0, "long": 100.0})
+    cache.put("short", "k", 1)
+    cache.put("long", "k", 2)
+
+    now[0] += 50
+    assert cache.get("short", "k") is None
+    assert cache.get("long", "k") == 2
+
+    monkeypatch.setenv("METADATA_TTL_LONG_S", "20")
+    assert cache.get("long", "k") is None
+
+
+def test_memory_tier_is_lru_bounded() -> None:
+    cache = MetadataCache(None, max_entries=2)
+    cache.put("kind", "a", 1)
+    cache.put("kind", "b", 2)
+    cache.get("kind", "a")
+    cache.put("kind", "c", 3)
+
+    assert cache.get("kind", "b") is None
+    assert cache.get("kind", "a") == 1
+    assert cache.get("kind", "c") == 3
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path: Path) -> None:
+    path = str(tmp_path / "shared.sqlite3")
+    calls: List[str] = []
+
+    def fetch() -> dict:
+        calls.append("fetch")
+        return {"downloads": 7}
+
+    first = MetadataCache(path)
+    assert first.get_or_fetch("hf_dataset_info", "org/ds", fetch) == {"downloads": 7}
+    # A second process (here: a second instance) reads it from disk.
+    second = MetadataCache(path)
+    assert second.get_or_fetch("hf_dataset_info", "org/ds", fetch) == {"downloads": 7}
+    assert second.get_or_fetch("hf_dataset_info", "org/ds", fetch) == {"downloads": 7}
+
+    assert calls == ["fetch"]
+    assert first.stats()["hf_dataset_info"] == {"memory_hits": 0, "disk_hits": 0, "misses": 1}
+    assert second.stats()["hf_dataset_info"] == {"memory_hits": 1, "disk_hits": 1, "misses": 0}
+
+
+def test_failed_fetch_is_not_cached() -> None:
+    cache = MetadataCache(None)
+
+    def failing() -> int:
+        raise OSError("upstream down")
+
+    with pytest.raises(OSError):
+        cache.get_or_fetch("kind", "k", failing)
+    assert cache.get_or_fetch("kind", "k", lambda: 5) == 5
@@ -0,0 +1,108 @@
+"""
+Tests for out-of-process regex evaluation with a wall-clock budget.
+"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import regex_sandbox
+from src.api.main import app
+from src.api.regex_sandbox import RegexCatalog, RegexSandbox, RegexTimeout, RegexWorkerError
+
+
+_EVIL = "(a+)+$"
+_VICTIM = "a" * 40 + "!"
+
+
+@pytest.fixture
+def sandbox(monkeypatch: pytest.MonkeyPatch) -> Iterator[RegexSandbox]:
+    box = RegexSandbox(timeout_s=0.5, workers=1)
+    monkeypatch.setattr(regex_sandbox, "_sandbox", box)
+    yield box
+    box.shutdown()
+
+
+def test_catastrophic_pattern_is_cut_off_and_worker_replaced(sandbox: RegexSandbox) -> None:
+    catalog = RegexCatalog()
+    catalog.put("1", (_VICTIM,))
+    t0 = time.monotonic()
+    with pytest.raises(RegexTimeout):
+        sandbox.search(_EVIL, re.IGNORECASE, catalog)
+    assert time.monotonic() - t0 < 5
+
+    catalog.put("1", ("BERT-base",))
+    catalog.put("2", ("gpt2",))
+    assert sandbox.search("bert", re.IGNORECASE, catalog) == ["1"]
+
+
+def test_worker_catalog_follows_changes(sandbox: RegexSandbox) -> None:
+    catalog = RegexCatalog()
+    catalog.put("1", ("bert-base",))
+    catalog.put("2", ("bert-large",))
+    assert sorted(sandbox.search("bert", re.IGNORECASE, catalog)) == ["1", "2"]
+    assert sandbox.search("bert", re.IGNORECASE, catalog, ids=["2"]) == ["2"]
+
+    catalog.remove("1")
+    catalog.put("3", ("distilbert",))
+    assert sorted(sandbox.search("bert", re.IGNORECASE, catalog)) == ["2", "3"]
+    catalog.reset([("4", ("roberta",))])
+    assert sandbox.search("bert", re.IGNORECASE, catalog) == ["4"]
+
+
+def _kill_idle_worker(box: RegexSandbox) -> None:
+    """Kill the idle worker behind the pool's back, as a crash would."""
+    worker = box._idle.get()
+    assert worker is not None
+    worker.proc.kill()
+    worker.proc.join(timeout=5)
+    worker.proc.is_alive = lambda: True  # type: ignore[method-assign]
+    box._idle.put(worker)
+
+
+def test_dead_worker_fails_one_search_and_is_replaced(sandbox: RegexSandbox) -> None:
+    catalog = RegexCatalog()
+    catalog.put("1", ("bert-base",))
+    assert sandbox.search("bert", re.IGNORECASE, catalog) == ["1"]
+
+    _kill_idle_worker(sandbox)
+    with pytest.raises(RegexWorkerError):
+        sandbox.search("bert", re.IGNORECASE, catalog)
+    assert sandbox.search("bert", re.IGNORECASE, catalog) == ["1"]
+
+
+def test_regex_endpoint_returns_400_on_budget_overrun(
+    sandbox: RegexSandbox,
+    admin_auth: Dict[str, Any],
+) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+    client.post("/artifact/code", json={"url": f"https://example.com/org/{_VICTIM}"}, headers=h)
+
+    slow = client.post("/artifact/byRegEx", json={"regex": _EVIL}, headers=h)
+    assert slow.status_code == 400
+
+    ok = client.post("/artifact/byRegEx", json={"regex": "a{40}!"}, headers=h)
+    assert ok.status_code == 200
+    assert _VICTIM in [m["name"] for m in ok.json()]
+
+
+def test_regex_endpoint_returns_503_when_worker_dies(
+    sandbox: RegexSandbox,
+    admin_auth: Dict[str, Any],
+) -> None:
+    client = TestClient(app)
+    tok = client.put("/authenticate", json=admin_auth).json()
+    h = {"X-Authorization": tok}
+    client.post("/artifact/code", json={"url": "https://example.com/org/sandbox-crash"}, headers=h)
+    search = {"regex": "sandbox-crash"}
+    assert client.post("/artifact/byRegEx", json=search, headers=h).status_code == 200
+
+    _kill_idle_worker(sandbox)
+    assert client.post("/artifact/byRegEx", json=search, headers=h).status_code == 503
+    assert client.post("/artifact/byRegEx", json=search, headers=h).status_code == 200
@@ -0,0 +1,157 @@
+"""
+Tests for concurrent metric execution and per-metric deadlines in the scorer.
+"""
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from src.registry.scorer import score_model
+
+METRIC_CLASSES = [
+    "src.registry.metrics.ramp_up_time.RampUpTimeMetric",
+    "src.registry.metrics.bus_factor.BusFactorMetric",
+    "src.registry.metrics.performance_claims.PerformanceClaimsMetric",
+    "src.registry.metrics.license_metric.LicenseMetric",
+    "src.registry.metrics.dataset_and_code_score.DatasetAndCodeScoreMetric",
+    "src.registry.metrics.dataset_quality.DatasetQualityMetric",
+    "src.registry.metrics.code_quality.CodeQualityMetric",
+]
+
+# Non-HF URL so enrich_context() never reaches the network.
+MODEL_URL = "https://example.com/org/model"
+
+
+def _fake_fetch_repo_info(url: str) -> Dict[str, Any]:
+    return {"url": url, "hf_readme": "", "license": "", "git_contributors": 1}
+
+
+def _patch_all(monkeypatch: pytest.MonkeyPatch, delay_s: float) -> None:
+    def slow_compute(self: Any, repo_info: Dict[str, Any]) -> tuple[float, int]:
+        time.sleep(delay_s)
+        return 0.5, int(delay_s * 1000)
+
+    def slow_size_compute(self: Any, repo_info: Dict[str, Any]) -> tuple[Dict[str, float], int]:
+        time.sleep(delay_s)
+        return {"raspberry_pi": 0.5, "jetson_nano": 0.5, "desktop_pc": 0.5, "aws_server": 0.5}, 1
+
+    monkeypatch.setattr("src.registry.scorer.fetch_repo_info", _fake_fetch_repo_info)
+    for cls in METRIC_CLASSES:
+        monkeypatch.setattr(f"{cls}.compute", slow_compute)
+    monkeypatch.setattr(
+        "src.registry.metrics.size_score.SizeScoreMetric.compute", slow_size_compute
+    )
+
+
+def test_metrics_run_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Eight 0.3s metrics should take roughly one metric's time, not the sum."""
+    _patch_all(monkeypatch, delay_s=0.3)
+
+    t0 = time.perf_counter()
+    result = score_model(MODEL_URL, {})
+    elapsed = time.perf_counter() - t0
+
+    assert elapsed < 8 * 0.3 / 2
+    assert result.bus_factor == 0.5
+    assert result.size_score["desktop_pc"] == 0.5
+
+
+def test_metric_missing_deadline_degrades_to_zero(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A metric past its deadline returns 0.0 with its real latency; others are kept."""
+    _patch_all(monkeypatch, delay_s=0.0)
+
+    def stuck_compute(self: Any, repo_info: Dict[str, Any]) -> tuple[float, int]:
+        time.sleep(2.0)
+        return 1.0, 2000
+
+    monkeypatch.setattr("src.registry.metrics.bus_factor.BusFactorMetric.compute", stuck_compute)
+
+    t0 = time.perf_counter()
+    result = score_model(MODEL_URL, {}, deadlines={"bus_factor": 0.2})
+    elapsed = time.perf_counter() - t0
+
+    assert elapsed < 1.5
+    assert result.bus_factor == 0.0
+    assert 200 <= result.bus_factor_latency < 1500
+    assert result.ramp_up_time == 0.5
+
+
+def test_overrunning_metric_does_not_delay_exit() -> None:
+    """An abandoned metric thread must not keep the process (e.g. the CLI) alive."""
+    script = (
+        "import time\n"
+        "from src.registry import scorer\n"
+        "from src.registry.metrics.bus_factor import BusFactorMetric\n"
+        "scorer.fetch_repo_info = lambda url: {'url': url, 'hf_readme': '', 'license': ''}\n"
+        "BusFactorMetric.compute = lambda self, info: (time.sleep(30), (1.0, 0))[1]\n"
+        f"scorer.score_model({MODEL_URL!r}, {{}}, deadlines={{'bus_factor': 0.2}})\n"
+    )
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1],
+        check=True, timeout=20,
+    )
+    assert time.perf_counter() - t0 < 10
+
+
+def test_metric_deadline_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """$METRIC_TIMEOUT_<NAME>_S sets a per-metric deadline."""
+    _patch_all(monkeypatch, delay_s=0.0)
+
+    def stuck_compute(self: Any, repo_info: Dict[str, Any]) -> tuple[float, int]:
+        time.sleep(2.0)
+        return 1.0, 2000
+
+    monkeypatch.setattr("src.registry.metrics.license_metric.LicenseMetric.compute", stuck_compute)
+    monkeypatch.setenv("METRIC_TIMEOUT_LICENSE_S", "0.2")
+
+    result = score_model(MODEL_URL, {})
+
+    assert result.license == 0.0
+    assert result.license_latency >= 200
+
+
+def test_process_url_list_parallel_keeps_order_and_context(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Parallel scoring emits results in input order with each model's own context snapshot."""
+    from src.registry import scorer
+    from src.registry.models import ModelScore
+
+    seen: Dict[str, Dict[str, Any]] = {}
+
+    async def fake_score_model(url: str, related_context: Dict[str, Any]) -> ModelScore:
+        # Later models finish first to prove ordering isn't completion order.
+        await asyncio.sleep(0.05 if url.endswith("m1") else 0.0)
+        seen[url] = dict(related_context)
+        zero = {k: 0 for k in (
+            "ramp_up_time", "bus_factor", "performance_claims", "license",
+            "dataset_and_code_score", "dataset_quality", "code_quality", "net_score",
+        )}
+        latencies = {f"{k}_latency": 0 for k in zero}
+        return ModelScore(
+            name=url.rsplit("/", 1)[-1], category="MODEL", size_score={},
+            size_score_latency=0, **zero, **latencies,
+        )
+
+    monkeypatch.setattr(scorer, "async_score_model", fake_score_model)
+
+    urls = [
+        "https://huggingface.co/datasets/org/d1",
+        "https://huggingface.co/org/m1",
+        "https://github.com/org/c1",
+        "https://huggingface.co/org/m2",
+        "https://huggingface.co/datasets/org/d2",
+        "https://huggingface.co/org/m3",
+    ]
+    results = scorer.process_url_list(urls, max_workers=4)
+
+    assert [r.name for r in results] == ["m1", "m2", "m3"]
+    assert seen["https://huggingface.co/org/m1"]["code_link"] == ""
+    assert seen["https://huggingface.co/org/m2"]["dataset_link"].endswith("/d1")
+    assert seen["https://huggingface.co/org/m2"]["code_link"].endswith("/c1")
+    assert seen["https://huggingface.co/org/m3"]["dataset_link"].endswith("/d2")
@@ -0,0 +1,84 @@
+"""
+Tests for single-flight coalescing of upstream fetches.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import pytest
+
+from src.registry import url_parser
+from src.registry.singleflight import SingleFlight, canonical_resource
+
+
+def test_concurrent_callers_share_one_execution() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    def fetch() -> str:
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=10) as ex:
+        results = list(ex.map(lambda _: flight.do("k", fetch), range(10)))
+
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.stats()["shared"] == 9
+
+
+def test_errors_propagate_to_all_waiters_and_are_not_cached() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def boom() -> str:
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call() -> None:
+        try:
+            flight.do("k", boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == ["upstream down"] * 3
+    assert flight.do("k", lambda: "recovered") == "recovered"
+
+
+def test_canonical_resource_merges_equivalent_urls() -> None:
+    assert canonical_resource("https://GitHub.com/Org/Repo.git") == canonical_resource(
+        "http://www.github.com/org/repo/"
+    )
+
+
+def test_fetch_repo_info_coalesces_and_copies(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def slow_fetch(url: str) -> Dict[str, Any]:
+        calls.append(url)
+        time.sleep(0.2)
+        return {"url": url, "has_tests": True}
+
+    monkeypatch.setattr(url_parser, "_fetch_repo_info_uncached", slow_fetch)
+
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        results = list(ex.map(url_parser.fetch_repo_info, ["https://github.com/org/shared"] * 5))
+
+    assert len(calls) == 1
+    results[0]["has_tests"] = False
+    assert all(r["has_tests"] for r in results[1:])
@@ -0,0 +1,203 @@
+"""
+Tests for registry snapshots and warm starts.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.artifact_index import ArtifactIndex
+from src.api.lineage_graph import LineageGraph
+from src.api.rating_jobs import RatingJob, RatingJobs
+from src.api.snapshot import detached, read_snapshot, write_snapshot
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class _Indexed:
+    id: str
+    type: str
+    name: str
+    url: str
+    created_at_ms: int
+
+
+def test_snapshot_round_trip_and_rejects_bad_files(tmp_path: Path) -> None:
+    path = tmp_path / "state.snap"
+    size = write_snapshot(str(path), {"artifacts": [1, 2, 3], "shared": ({"a"},) * 2})
+    assert size == path.stat().st_size
+
+    state = read_snapshot(str(path))
+    assert state is not None and state["artifacts"] == [1, 2, 3]
+    # Shared references survive, so memos keyed by identity stay valid.
+    assert state["shared"][0] is state["shared"][1]
+
+    data = path.read_bytes()
+    (tmp_path / "magic.snap").write_bytes(b"X" + data[1:])
+    (tmp_path / "version.snap").write_bytes(data[:8] + b"\x63\x00\x00\x00" + data[12:])
+    (tmp_path / "short.snap").write_bytes(data[: len(data) // 2])
+    (tmp_path / "empty.snap").write_bytes(b"")
+    for name in ("magic", "version", "short", "empty", "missing"):
+        assert read_snapshot(str(tmp_path / f"{name}.snap")) is None
+
+
+def test_rating_jobs_export_and_restore_finished_jobs() -> None:
+    jobs = RatingJobs()
+    jobs.restore([RatingJob("1", state="done", result={"net_score": 0.5}, key=("u",))])
+    exported = jobs.export()
+    assert [(j.artifact_id, j.result, j.key, j.future) for j in exported] == [
+        ("1", {"net_score": 0.5}, ("u",), None)
+    ]
+    fresh = RatingJobs()
+    fresh.restore(exported)
+    assert fresh.get("1") is not None and fresh.get("1").state == "done"  # type: ignore[union-attr]
+
+
+def test_warm_start_restores_artifacts_and_indexes(
+    tmp_path: Path,
+    admin_auth: Dict[str, Any],
+) -> None:
+    client = TestClient(main.app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    data_url = "https://example.com/snapshot/snap-data"
+    data = client.post("/artifact/dataset", json={"url": data_url}, headers=h).json()
+    model = client.post(
+        "/artifact/model",
+        json={"url": "https://example.com/snapshot/snap-model", "metadata": {"datasets": data_url}},
+        headers=h,
+    ).json()
+    model_id = model["metadata"]["id"]
+    client.get(f"/artifact/model/{model_id}/lineage", headers=h)
+
+    path = tmp_path / "registry.snap"
+    write_snapshot(str(path), main._snapshot_state())
+
+    script = (
+        "import json\n"
+        "from src.api import main as m\n"
+        "a = m._artifacts_by_id[%r]\n"
+        "print(json.dumps({'name': a.name,"
+        " 'by_name': m._artifact_index.ids_by_name('snap-model'),"
+        " 'parents': m._lineage_graph.parents(a.id),"
+        " 'stale': a.id in m._lineage_stale}))\n"
+    ) % model_id
+    env = dict(os.environ, REGISTRY_SNAPSHOT_PATH=str(path), REGISTRY_STORE="memory")
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=_ROOT, env=env, capture_output=True, text=True,
+        check=True, timeout=120,
+    ).stdout
+    restored = json.loads(out.strip().splitlines()[-1])
+    assert restored["name"] == "snap-model"
+    assert restored["by_name"] == [model_id]
+    assert restored["parents"] == [[data["metadata"]["id"], "fine_tuning_dataset"]]
+    assert restored["stale"] is False
+
+
+def test_periodic_snapshots_are_written_off_the_request_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    path = tmp_path / "periodic.snap"
+    monkeypatch.setenv("REGISTRY_SNAPSHOT_PATH", str(path))
+    monkeypatch.setenv("REGISTRY_SNAPSHOT_INTERVAL_S", "0.05")
+    writers: List[str] = []
+    real_write = main.write_snapshot
+
+    def recording_write(target: str, state: Dict[str, Any]) -> int:
+        writers.append(threading.current_thread().name)
+        return real_write(target, state)
+
+    monkeypatch.setattr(main, "write_snapshot", recording_write)
+
+    with TestClient(main.app) as client:
+        h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+        body = {"url": "https://example.com/snapshot/periodic-model"}
+        model_id = client.post("/artifact/model", json=body, headers=h).json()["metadata"]["id"]
+        state = None
+        for _ in range(100):
+            client.get("/health")
+            state = read_snapshot(str(path))
+            if state is not None and any(row[0] == model_id for row in state["artifacts"]):
+                break
+            time.sleep(0.05)
+        assert state is not None and any(row[0] == model_id for row in state["artifacts"])
+        # Pickled and written on the snapshot thread, never on the event loop.
+        assert writers and all(name.startswith("snapshot") for name in writers)
+
+
+def test_snapshot_copy_is_detached_from_live_state() -> None:
+    index = ArtifactIndex()
+    index.add(_Indexed("1", "model", "detach-a", "https://example.com/detach-a", 1))
+    graph = LineageGraph()
+    graph.add_edge("1", "2", "base_model")
+    waiting = {("model", "detach-a"): {"1"}}
+
+    copies = detached(index), detached(graph), detached(waiting)
+    index.add(_Indexed("3", "model", "detach-b", "https://example.com/detach-b", 2))
+    graph.add_edge("1", "3", "base_model")
+    waiting[("model", "detach-a")].add("3")
+
+    index_copy, graph_copy, waiting_copy = copies
+    assert index_copy.ids_by_name("detach-a") == ["1"]
+    assert index_copy.ids_by_name("detach-b") == []
+    assert graph_copy.children("1") == [("2", "base_model")]
+    assert waiting_copy == {("model", "detach-a"): {"1"}}
+
+
+def test_lambda_invocation_finishes_its_snapshot_write(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    client = TestClient(main.app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    body = {"url": "https://example.com/snapshot/lambda-model"}
+    model_id = client.post("/artifact/model", json=body, headers=h).json()["metadata"]["id"]
+
+    path = tmp_path / "lambda.snap"
+    monkeypatch.setenv("REGISTRY_SNAPSHOT_PATH", str(path))
+    monkeypatch.setenv("REGISTRY_SNAPSHOT_INTERVAL_S", "0")
+    real_write = main.write_snapshot
+
+    def slow_write(target: str, state: Dict[str, Any]) -> int:
+        time.sleep(0.3)
+        return real_write(target, state)
+
+    monkeypatch.setattr(main, "write_snapshot", slow_write)
+    event = {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": "/health",
+        "rawQueryString": "",
+        "headers": {"host": "registry.example.com"},
+        "requestContext": {
+            "http": {"method": "GET", "path": "/health", "sourceIp": "127.0.0.1",
+                     "protocol": "HTTP/1.1"},
+        },
+        "isBase64Encoded": False,
+    }
+    # Mangum runs on the thread's event loop, as in a fresh Lambda runtime.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        response = main.lambda_handler(event, None)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    assert response["statusCode"] == 200
+    # No shutdown hook runs on Lambda: the write finished inside the invocation.
+    state = read_snapshot(str(path))
+    assert state is not None and any(row[0] == model_id for row in state["artifacts"])
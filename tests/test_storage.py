@@ -0,0 +1,130 @@
+"""
+Tests for the artifact storage backends.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.storage import Change, DuplicateArtifact, SQLiteArtifactStore, StoredArtifact
+
+
+def _a(aid: str, name: str = "m", created: int = 1) -> StoredArtifact:
+    return StoredArtifact(aid, "model", name, f"https://example.com/{name}", created, {"k": [1]})
+
+
+def test_sqlite_store_persists_and_batches(tmp_path: Path) -> None:
+    path = str(tmp_path / "registry.sqlite3")
+    store = SQLiteArtifactStore(path)
+    store.put_many([_a("1", "one", 1), _a("2", "two", 2), _a("3", "three", 3)])
+    store.put(_a("2", "two-renamed", 2))
+    assert store.remove("3") == _a("3", "three", 3)
+    store.close()
+
+    reopened = SQLiteArtifactStore(path)
+    assert list(reopened.by_id) == ["1", "2"]
+    assert reopened.by_id["2"].name == "two-renamed"
+    assert reopened.by_id["1"].metadata == {"k": [1]}
+    journal = reopened._db.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal == "wal"
+    reopened.close()
+
+
+def test_sqlite_stores_see_each_others_writes(tmp_path: Path) -> None:
+    path = str(tmp_path / "shared.sqlite3")
+    a, b = SQLiteArtifactStore(path), SQLiteArtifactStore(path)
+    assert b.sync() == []
+
+    a.put(_a("1", "one"))
+    a.put(_a("2", "two"))
+    assert b.sync() == [(None, _a("1", "one")), (None, _a("2", "two"))]
+    assert b.sync() == []
+
+    a.put(_a("1", "uno"))
+    a.remove("2")
+    assert b.sync() == [(_a("1", "one"), _a("1", "uno")), (_a("2", "two"), None)]
+    assert list(b.by_id) == ["1"]
+
+    # b's own writes come back through the log and are skipped.
+    b.put(_a("3", "three"))
+    a.put(_a("4", "four"))
+    assert a.sync() == [(None, _a("3", "three"))]
+    assert b.sync() == [(None, _a("4", "four"))]
+
+    a.clear()
+    assert b.sync() is None
+    assert b.by_id == {}
+    a.close()
+    b.close()
+
+
+def test_sqlite_store_rejects_a_second_artifact_for_one_type_and_url(tmp_path: Path) -> None:
+    path = str(tmp_path / "unique.sqlite3")
+    a, b = SQLiteArtifactStore(path), SQLiteArtifactStore(path)
+    a.put(_a("1", "same"))
+    # b hasn't synced, so only the database can catch the duplicate.
+    with pytest.raises(DuplicateArtifact):
+        b.put(_a("2", "same"))
+    assert "2" not in b.by_id
+    # Rewriting an artifact under its own id is still an update.
+    b.put(_a("1", "same", created=5))
+    assert a.sync() == [(_a("1", "same"), _a("1", "same", created=5))]
+    a.close()
+    b.close()
+
+
+def test_api_maps_concurrent_duplicate_ingest_to_409(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    class _Raced:
+        """A shared store where another worker already ingested the URL."""
+
+        by_id = main._artifacts_by_id
+
+        def sync(self) -> Optional[List[Change]]:
+            return []
+
+        def put(self, a: StoredArtifact) -> None:
+            raise DuplicateArtifact(a.url)
+
+    client = TestClient(app=main.app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    monkeypatch.setattr(main, "_store", _Raced())
+    body = {"url": "https://example.com/raced-model"}
+    assert client.post("/artifact/model", json=body, headers=h).status_code == 409
+
+
+def test_api_indexes_follow_synced_changes(
+    monkeypatch: pytest.MonkeyPatch,
+    admin_auth: Dict[str, Any],
+) -> None:
+    pending: List[Change] = []
+
+    class _Peer:
+        """Stands in for a shared store that another worker just wrote to."""
+
+        by_id = main._artifacts_by_id
+
+        def sync(self) -> Optional[List[Change]]:
+            out = list(pending)
+            pending.clear()
+            for _old, new in out:
+                if new is not None:
+                    self.by_id[new.id] = new
+            return out
+
+    client = TestClient(app=main.app)
+    h = {"X-Authorization": client.put("/authenticate", json=admin_auth).json()}
+    monkeypatch.setattr(main, "_store", _Peer())
+    new = StoredArtifact("9900000001", "model", "synced-model", "https://example.com/s", 1, {})
+    pending.append((None, new))
+
+    hits = client.get("/artifact/byName/synced-model", headers=h).json()
+    assert [m["id"] for m in hits] == ["9900000001"]
+    main._index_remove(new)
+    del main._artifacts_by_id[new.id]